@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
 import json
 from collections import deque
 from datetime import UTC, datetime
@@ -24,6 +23,7 @@ from app.models.boards import Board
 from app.models.tasks import Task
 from app.schemas.activity_events import ActivityEventRead, ActivityTaskCommentFeedItemRead
 from app.schemas.pagination import DefaultLimitOffsetPage
+from app.services.change_bus import ENTITY_ACTIVITY, change_bus
 from app.services.organizations import (
     OrganizationContext,
     get_active_membership,
@@ -246,40 +246,45 @@ async def stream_task_comment_feed(
 
     async def event_generator() -> AsyncIterator[dict[str, str]]:
         last_seen = since_dt
-        while True:
-            if await request.is_disconnected():
-                break
-            async with async_session_maker() as stream_session:
-                if board_id is not None:
-                    rows = await _fetch_task_comment_events(
-                        stream_session,
-                        last_seen,
-                        board_id=board_id,
-                    )
-                elif allowed_ids:
-                    rows = await _fetch_task_comment_events(stream_session, last_seen)
-                    rows = [row for row in rows if row[1].board_id in allowed_ids]
-                else:
-                    rows = []
-            for event, task, board, agent in rows:
-                event_id = event.id
-                if event_id in seen_ids:
-                    continue
-                seen_ids.add(event_id)
-                seen_queue.append(event_id)
-                if len(seen_queue) > SSE_SEEN_MAX:
-                    oldest = seen_queue.popleft()
-                    seen_ids.discard(oldest)
-                last_seen = max(event.created_at, last_seen)
-                payload = {
-                    "comment": _feed_item(
-                        event,
-                        task,
-                        board,
-                        agent,
-                    ).model_dump(mode="json"),
-                }
-                yield {"event": "comment", "data": json.dumps(payload)}
-            await asyncio.sleep(STREAM_POLL_SECONDS)
+        with change_bus.subscribe(
+            board_ids={board_id} if board_id is not None else allowed_ids,
+            entities={ENTITY_ACTIVITY},
+        ) as changes:
+            while True:
+                if await request.is_disconnected():
+                    break
+                changes.clear()
+                async with async_session_maker() as stream_session:
+                    if board_id is not None:
+                        rows = await _fetch_task_comment_events(
+                            stream_session,
+                            last_seen,
+                            board_id=board_id,
+                        )
+                    elif allowed_ids:
+                        rows = await _fetch_task_comment_events(stream_session, last_seen)
+                        rows = [row for row in rows if row[1].board_id in allowed_ids]
+                    else:
+                        rows = []
+                for event, task, board, agent in rows:
+                    event_id = event.id
+                    if event_id in seen_ids:
+                        continue
+                    seen_ids.add(event_id)
+                    seen_queue.append(event_id)
+                    if len(seen_queue) > SSE_SEEN_MAX:
+                        oldest = seen_queue.popleft()
+                        seen_ids.discard(oldest)
+                    last_seen = max(event.created_at, last_seen)
+                    payload = {
+                        "comment": _feed_item(
+                            event,
+                            task,
+                            board,
+                            agent,
+                        ).model_dump(mode="json"),
+                    }
+                    yield {"event": "comment", "data": json.dumps(payload)}
+                await changes.wait(STREAM_POLL_SECONDS)
 
     return EventSourceResponse(event_generator(), ping=15)
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
 import json
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
@@ -38,10 +37,11 @@ from app.services.approval_task_links import (
     replace_approval_task_links,
     task_counts_for_board,
 )
+from app.services.change_bus import ENTITY_APPROVAL, change_bus
 from app.services.openclaw.gateway_dispatch import GatewayDispatchService
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator, Sequence
+    from collections.abc import AsyncGenerator, Sequence
 
     from fastapi_pagination.limit_offset import LimitOffsetPage
     from sqlmodel.ext.asyncio.session import AsyncSession
@@ -321,30 +321,27 @@ async def list_approvals(
     return await paginate(session, statement.statement, transformer=_transform)
 
 
-@router.get("/stream")
-async def stream_approvals(
+async def approval_event_stream(
     request: Request,
-    board: Board = BOARD_READ_DEP,
-    _actor: ActorContext = ACTOR_DEP,
-    since: str | None = SINCE_QUERY,
-) -> EventSourceResponse:
-    """Stream approval updates for a board using server-sent events."""
-    since_dt = _parse_since(since) or utcnow()
+    board_id: UUID,
+    *,
+    since_dt: datetime,
+) -> AsyncGenerator[dict[str, str], None]:
+    """Yield approval updates of a board as SSE messages for one client."""
     last_seen = since_dt
-
-    async def event_generator() -> AsyncIterator[dict[str, str]]:
-        nonlocal last_seen
+    with change_bus.subscribe(board_ids={board_id}, entities={ENTITY_APPROVAL}) as changes:
         while True:
             if await request.is_disconnected():
                 break
+            changes.clear()
             async with async_session_maker() as session:
-                approvals = await _fetch_approval_events(session, board.id, last_seen)
+                approvals = await _fetch_approval_events(session, board_id, last_seen)
                 approval_reads = await _approval_reads(session, approvals)
                 pending_approvals_count = int(
                     (
                         await session.exec(
                             select(func.count(col(Approval.id)))
-                            .where(col(Approval.board_id) == board.id)
+                            .where(col(Approval.board_id) == board_id)
                             .where(col(Approval.status) == "pending"),
                         )
                     ).one(),
@@ -356,7 +353,7 @@ async def stream_approvals(
                 }
                 counts_by_task_id = await task_counts_for_board(
                     session,
-                    board_id=board.id,
+                    board_id=board_id,
                     task_ids=task_ids,
                 )
             for approval, approval_read in zip(approvals, approval_reads, strict=True):
@@ -381,9 +378,22 @@ async def stream_approvals(
                 elif task_counts:
                     payload["task_counts"] = task_counts
                 yield {"event": "approval", "data": json.dumps(payload)}
-            await asyncio.sleep(STREAM_POLL_SECONDS)
+            await changes.wait(STREAM_POLL_SECONDS)
 
-    return EventSourceResponse(event_generator(), ping=15)
+
+@router.get("/stream")
+async def stream_approvals(
+    request: Request,
+    board: Board = BOARD_READ_DEP,
+    _actor: ActorContext = ACTOR_DEP,
+    since: str | None = SINCE_QUERY,
+) -> EventSourceResponse:
+    """Stream approval updates for a board using server-sent events."""
+    since_dt = _parse_since(since) or utcnow()
+    return EventSourceResponse(
+        approval_event_stream(request, board.id, since_dt=since_dt),
+        ping=15,
+    )
 
 
 @router.post("", response_model=ApprovalRead)
@@ -0,0 +1,203 @@
+"""Multiplexed board event stream combining every per-board SSE feed on one connection."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sse_starlette.sse import EventSourceResponse
+
+from app.api.approvals import approval_event_stream
+from app.api.board_group_memory import group_memory_event_stream
+from app.api.board_memory import board_memory_event_stream
+from app.api.deps import ActorContext, get_board_for_actor_read, require_admin_or_agent
+from app.api.tasks import task_event_stream
+from app.core.time import utcnow
+from app.db.session import get_session
+from app.services.openclaw.provisioning_db import AgentLifecycleService
+from app.services.organizations import get_active_membership, is_org_admin
+from app.services.stream_hub import RESYNC_EVENT, multiplex, resync_message
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.models.boards import Board
+
+router = APIRouter(prefix="/boards/{board_id}/events", tags=["board-events"])
+
+EVENT_TASKS = "tasks"
+EVENT_APPROVALS = "approvals"
+EVENT_MEMORY = "memory"
+EVENT_GROUP_MEMORY = "group_memory"
+EVENT_AGENTS = "agents"
+EVENT_TYPES = (EVENT_TASKS, EVENT_APPROVALS, EVENT_MEMORY, EVENT_GROUP_MEMORY, EVENT_AGENTS)
+# SSE ``event:`` name sent for each stream type.
+EVENT_NAMES = {
+    EVENT_TASKS: "task",
+    EVENT_APPROVALS: "approval",
+    EVENT_MEMORY: "memory",
+    EVENT_GROUP_MEMORY: "group_memory",
+    EVENT_AGENTS: "agent",
+}
+
+TYPES_QUERY = Query(
+    default=None,
+    description=(
+        f"Comma-separated stream types to include: {', '.join(EVENT_TYPES)}. Defaults to "
+        "all types the caller may read (`agents` only for organization admins)."
+    ),
+)
+SINCE_QUERY = Query(default=None)
+IS_CHAT_QUERY = Query(default=None, description="Filter board and group memory by chat flag.")
+DELTA_QUERY = Query(
+    default=False,
+    description="Send each task in full once, then only changed fields (`task_delta`).",
+)
+BOARD_READ_DEP = Depends(get_board_for_actor_read)
+ACTOR_DEP = Depends(require_admin_or_agent)
+SESSION_DEP = Depends(get_session)
+
+
+def _parse_since(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    normalized = value.strip()
+    if not normalized:
+        return None
+    normalized = normalized.replace("Z", "+00:00")
+    try:
+        parsed = datetime.fromisoformat(normalized)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        return parsed.astimezone(UTC).replace(tzinfo=None)
+    return parsed
+
+
+def parse_event_types(value: str | None, *, agents_allowed: bool) -> list[str]:
+    """Return the requested stream types in canonical order.
+
+    Without a selection this is every type the caller may read: ``agents`` is left out unless
+    ``agents_allowed``.
+    """
+    if value is None or not value.strip():
+        return [
+            event_type for event_type in EVENT_TYPES if agents_allowed or event_type != EVENT_AGENTS
+        ]
+    requested = {part.strip() for part in value.split(",") if part.strip()}
+    unknown = requested - set(EVENT_TYPES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Unknown event types: {', '.join(sorted(unknown))}",
+        )
+    return [event_type for event_type in EVENT_TYPES if event_type in requested]
+
+
+def encode_cursor(cursor: dict[str, int]) -> str:
+    """Encode the last sequence delivered per stream as one SSE id (``tasks:12,memory:5``)."""
+    return ",".join(f"{event_type}:{seq}" for event_type, seq in sorted(cursor.items()))
+
+
+def decode_cursor(value: str | None) -> dict[str, int]:
+    """Parse a ``Last-Event-ID`` written by :func:`encode_cursor`; ignore anything else."""
+    cursor: dict[str, int] = {}
+    for part in (value or "").split(","):
+        event_type, _, seq = part.strip().partition(":")
+        if event_type in EVENT_NAMES and seq.isdigit():
+            cursor[event_type] = int(seq)
+    return cursor
+
+
+async def _can_stream_agents(
+    session: AsyncSession,
+    *,
+    board: Board,
+    actor: ActorContext,
+) -> bool:
+    # Same rule as ``GET /agents/stream``: organization admins only.
+    if actor.user is None:
+        return False
+    member = await get_active_membership(session, actor.user)
+    if member is None or member.organization_id != board.organization_id:
+        return False
+    return is_org_admin(member)
+
+
+async def _board_events(
+    streams: dict[str, AsyncGenerator[dict[str, str], None]],
+    cursor: dict[str, int],
+) -> AsyncGenerator[dict[str, str], None]:
+    async for event_type, message in multiplex(streams):
+        if message.get("event") == RESYNC_EVENT:
+            # One feed dropped this client for falling behind; the connection ends with it.
+            yield resync_message(encode_cursor(cursor) or None)
+            continue
+        event = {"event": EVENT_NAMES[event_type], "data": message["data"]}
+        if "id" in message:
+            cursor[event_type] = int(message["id"])
+            event["id"] = encode_cursor(cursor)
+        yield event
+
+
+@router.get("")
+async def stream_board_events(
+    request: Request,
+    board: Board = BOARD_READ_DEP,
+    actor: ActorContext = ACTOR_DEP,
+    session: AsyncSession = SESSION_DEP,
+    types: str | None = TYPES_QUERY,
+    since: str | None = SINCE_QUERY,
+    is_chat: bool | None = IS_CHAT_QUERY,
+    delta: bool = DELTA_QUERY,
+) -> EventSourceResponse:
+    """Stream task, approval, memory, group memory and agent events of a board on one connection.
+
+    Each event's SSE ``id`` holds the last sequence delivered for every sequenced stream, so a
+    reconnect with ``Last-Event-ID`` resumes all of them; approvals and agents resume from
+    ``since``. Agent events are included by default for organization admins only; other
+    callers get 403 when they request them explicitly.
+    """
+    agents_allowed = await _can_stream_agents(session, board=board, actor=actor)
+    selected = parse_event_types(types, agents_allowed=agents_allowed)
+    if EVENT_AGENTS in selected and not agents_allowed:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    since_dt = _parse_since(since) or utcnow()
+    cursor = decode_cursor(request.headers.get("last-event-id"))
+    streams: dict[str, AsyncGenerator[dict[str, str], None]] = {}
+    if EVENT_TASKS in selected:
+        streams[EVENT_TASKS] = task_event_stream(
+            request,
+            board.id,
+            since_dt=since_dt,
+            resume_after=cursor.get(EVENT_TASKS),
+            delta=delta,
+        )
+    if EVENT_APPROVALS in selected:
+        streams[EVENT_APPROVALS] = approval_event_stream(request, board.id, since_dt=since_dt)
+    if EVENT_MEMORY in selected:
+        streams[EVENT_MEMORY] = board_memory_event_stream(
+            request,
+            board.id,
+            since_dt=since_dt,
+            is_chat=is_chat,
+            resume_after=cursor.get(EVENT_MEMORY),
+        )
+    if EVENT_GROUP_MEMORY in selected and board.board_group_id is not None:
+        streams[EVENT_GROUP_MEMORY] = group_memory_event_stream(
+            request,
+            board.board_group_id,
+            since_dt=since_dt,
+            is_chat=is_chat,
+            resume_after=cursor.get(EVENT_GROUP_MEMORY),
+        )
+    if EVENT_AGENTS in selected:
+        streams[EVENT_AGENTS] = AgentLifecycleService(session).agent_events(
+            request=request,
+            board_id=board.id,
+            since_dt=since_dt,
+            allowed_ids={board.id},
+        )
+    return EventSourceResponse(_board_events(streams, cursor), ping=15)
@@ -33,6 +33,7 @@ from app.models.boards import Board
 from app.models.users import User
 from app.schemas.board_group_memory import BoardGroupMemoryCreate, BoardGroupMemoryRead
 from app.schemas.pagination import DefaultLimitOffsetPage
+from app.services.change_bus import ENTITY_BOARD_GROUP_MEMORY
 from app.services.mentions import extract_mentions, matches_agent_mention
 from app.services.openclaw.gateway_dispatch import GatewayDispatchService
 from app.services.organizations import (
@@ -41,9 +42,16 @@ from app.services.organizations import (
     member_all_boards_read,
     member_all_boards_write,
 )
+from app.services.stream_hub import (
+    StreamCursor,
+    StreamEvent,
+    StreamFetch,
+    last_event_id,
+    stream_hub,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator
+    from collections.abc import AsyncGenerator, AsyncIterator
 
     from fastapi_pagination.limit_offset import LimitOffsetPage
     from sqlmodel.ext.asyncio.session import AsyncSession
@@ -139,8 +147,10 @@ def _serialize_memory(memory: BoardGroupMemory) -> dict[str, object]:
 async def _fetch_memory_events(
     session: AsyncSession,
     board_group_id: UUID,
-    since: datetime,
+    since: datetime | None,
     is_chat: bool | None = None,
+    *,
+    after_seq: int | None = None,
 ) -> list[BoardGroupMemory]:
     statement = (
         BoardGroupMemory.objects.filter_by(board_group_id=board_group_id)
@@ -150,9 +160,14 @@ async def _fetch_memory_events(
     )
     if is_chat is not None:
         statement = statement.filter(col(BoardGroupMemory.is_chat) == is_chat)
-    statement = statement.filter(col(BoardGroupMemory.created_at) >= since).order_by(
-        col(BoardGroupMemory.created_at),
-    )
+    if after_seq is not None:
+        statement = statement.filter(col(BoardGroupMemory.seq) > after_seq).order_by(
+            col(BoardGroupMemory.seq)
+        )
+    elif since is not None:
+        statement = statement.filter(col(BoardGroupMemory.created_at) >= since).order_by(
+            col(BoardGroupMemory.created_at),
+        )
     return await statement.all(session)
 
 
@@ -370,6 +385,51 @@ async def list_board_group_memory(
     return await paginate(session, statement.statement)
 
 
+def _memory_stream_fetch(group_id: UUID, is_chat: bool | None) -> StreamFetch:
+    async def fetch(cursor: StreamCursor) -> list[StreamEvent]:
+        async with async_session_maker() as session:
+            memories = await _fetch_memory_events(
+                session,
+                group_id,
+                cursor.since,
+                is_chat=is_chat,
+                after_seq=cursor.after_seq,
+            )
+        return [
+            StreamEvent(
+                id=memory.id,
+                seq=memory.seq,
+                created_at=memory.created_at,
+                event="memory",
+                data=json.dumps({"memory": _serialize_memory(memory)}),
+            )
+            for memory in memories
+        ]
+
+    return fetch
+
+
+def group_memory_event_stream(
+    request: Request,
+    group_id: UUID,
+    *,
+    since_dt: datetime,
+    is_chat: bool | None,
+    resume_after: int | None,
+) -> AsyncGenerator[dict[str, str], None]:
+    """Return the shared memory event stream of a board group for one client."""
+    return stream_hub.stream(
+        request,
+        ("board_group_memory", group_id, is_chat),
+        fetch=_memory_stream_fetch(group_id, is_chat),
+        since=since_dt,
+        resume_after=resume_after,
+        board_ids={group_id},
+        entities={ENTITY_BOARD_GROUP_MEMORY},
+        poll_seconds=STREAM_POLL_SECONDS,
+    )
+
+
 @group_router.get("/stream")
 async def stream_board_group_memory(
     request: Request,
@@ -380,27 +440,16 @@ async def stream_board_group_memory(
 ) -> EventSourceResponse:
     """Stream memory entries for a board group via server-sent events."""
     since_dt = _parse_since(since) or utcnow()
-    last_seen = since_dt
-
-    async def event_generator() -> AsyncIterator[dict[str, str]]:
-        nonlocal last_seen
-        while True:
-            if await request.is_disconnected():
-                break
-            async with async_session_maker() as s:
-                memories = await _fetch_memory_events(
-                    s,
-                    group.id,
-                    last_seen,
-                    is_chat=is_chat,
-                )
-            for memory in memories:
-                last_seen = max(memory.created_at, last_seen)
-                payload = {"memory": _serialize_memory(memory)}
-                yield {"event": "memory", "data": json.dumps(payload)}
-            await asyncio.sleep(STREAM_POLL_SECONDS)
-
-    return EventSourceResponse(event_generator(), ping=15)
+    return EventSourceResponse(
+        group_memory_event_stream(
+            request,
+            group.id,
+            since_dt=since_dt,
+            is_chat=is_chat,
+            resume_after=last_event_id(request),
+        ),
+        ping=15,
+    )
 
 
 @group_router.post("", response_model=BoardGroupMemoryRead)
@@ -532,28 +581,21 @@ async def stream_board_group_memory_for_board(
     """Stream linked-group memory via SSE for near-real-time coordination."""
     group_id = board.board_group_id
     since_dt = _parse_since(since) or utcnow()
-    last_seen = since_dt
 
     async def event_generator() -> AsyncIterator[dict[str, str]]:
-        nonlocal last_seen
-        while True:
-            if await request.is_disconnected():
-                break
-            if group_id is None:
-                await asyncio.sleep(2)
-                continue
-            async with async_session_maker() as session:
-                memories = await _fetch_memory_events(
-                    session,
-                    group_id,
-                    last_seen,
-                    is_chat=is_chat,
-                )
-            for memory in memories:
-                last_seen = max(memory.created_at, last_seen)
-                payload = {"memory": _serialize_memory(memory)}
-                yield {"event": "memory", "data": json.dumps(payload)}
-            await asyncio.sleep(STREAM_POLL_SECONDS)
+        if group_id is None:
+            # Not in a group yet: keep the connection open without events.
+            while not await request.is_disconnected():
+                await asyncio.sleep(STREAM_POLL_SECONDS)
+            return
+        async for item in group_memory_event_stream(
+            request,
+            group_id,
+            since_dt=since_dt,
+            is_chat=is_chat,
+            resume_after=last_event_id(request),
+        ):
+            yield item
 
     return EventSourceResponse(event_generator(), ping=15)
 
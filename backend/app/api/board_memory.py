@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
 import json
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
@@ -27,12 +26,20 @@ from app.models.agents import Agent
 from app.models.board_memory import BoardMemory
 from app.schemas.board_memory import BoardMemoryCreate, BoardMemoryRead
 from app.schemas.pagination import DefaultLimitOffsetPage
+from app.services.change_bus import ENTITY_BOARD_MEMORY
 from app.services.mentions import extract_mentions, matches_agent_mention
 from app.services.openclaw.gateway_dispatch import GatewayDispatchService
 from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
+from app.services.stream_hub import (
+    StreamCursor,
+    StreamEvent,
+    StreamFetch,
+    last_event_id,
+    stream_hub,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator
+    from collections.abc import AsyncGenerator
 
     from fastapi_pagination.limit_offset import LimitOffsetPage
     from sqlmodel.ext.asyncio.session import AsyncSession
@@ -77,8 +84,10 @@ def _serialize_memory(memory: BoardMemory) -> dict[str, object]:
 async def _fetch_memory_events(
     session: AsyncSession,
     board_id: UUID,
-    since: datetime,
+    since: datetime | None,
     is_chat: bool | None = None,
+    *,
+    after_seq: int | None = None,
 ) -> list[BoardMemory]:
     statement = (
         BoardMemory.objects.filter_by(board_id=board_id)
@@ -88,12 +97,62 @@ async def _fetch_memory_events(
     )
     if is_chat is not None:
         statement = statement.filter(col(BoardMemory.is_chat) == is_chat)
-    statement = statement.filter(col(BoardMemory.created_at) >= since).order_by(
-        col(BoardMemory.created_at),
-    )
+    if after_seq is not None:
+        statement = statement.filter(col(BoardMemory.seq) > after_seq).order_by(
+            col(BoardMemory.seq)
+        )
+    elif since is not None:
+        statement = statement.filter(col(BoardMemory.created_at) >= since).order_by(
+            col(BoardMemory.created_at),
+        )
     return await statement.all(session)
 
 
+def _memory_stream_fetch(board_id: UUID, is_chat: bool | None) -> StreamFetch:
+    async def fetch(cursor: StreamCursor) -> list[StreamEvent]:
+        async with async_session_maker() as session:
+            memories = await _fetch_memory_events(
+                session,
+                board_id,
+                cursor.since,
+                is_chat=is_chat,
+                after_seq=cursor.after_seq,
+            )
+        return [
+            StreamEvent(
+                id=memory.id,
+                seq=memory.seq,
+                created_at=memory.created_at,
+                event="memory",
+                data=json.dumps({"memory": _serialize_memory(memory)}),
+            )
+            for memory in memories
+        ]
+
+    return fetch
+
+
+def board_memory_event_stream(
+    request: Request,
+    board_id: UUID,
+    *,
+    since_dt: datetime,
+    is_chat: bool | None,
+    resume_after: int | None,
+) -> AsyncGenerator[dict[str, str], None]:
+    """Return the shared memory event stream of a board for one client."""
+    return stream_hub.stream(
+        request,
+        ("board_memory", board_id, is_chat),
+        fetch=_memory_stream_fetch(board_id, is_chat),
+        since=since_dt,
+        resume_after=resume_after,
+        board_ids={board_id},
+        entities={ENTITY_BOARD_MEMORY},
+        poll_seconds=STREAM_POLL_SECONDS,
+    )
+
+
 async def _send_control_command(
     *,
     session: AsyncSession,
@@ -248,27 +307,16 @@ async def stream_board_memory(
 ) -> EventSourceResponse:
     """Stream board memory events over server-sent events."""
     since_dt = _parse_since(since) or utcnow()
-    last_seen = since_dt
-
-    async def event_generator() -> AsyncIterator[dict[str, str]]:
-        nonlocal last_seen
-        while True:
-            if await request.is_disconnected():
-                break
-            async with async_session_maker() as session:
-                memories = await _fetch_memory_events(
-                    session,
-                    board.id,
-                    last_seen,
-                    is_chat=is_chat,
-                )
-            for memory in memories:
-                last_seen = max(memory.created_at, last_seen)
-                payload = {"memory": _serialize_memory(memory)}
-                yield {"event": "memory", "data": json.dumps(payload)}
-            await asyncio.sleep(STREAM_POLL_SECONDS)
-
-    return EventSourceResponse(event_generator(), ping=15)
+    return EventSourceResponse(
+        board_memory_event_stream(
+            request,
+            board.id,
+            since_dt=since_dt,
+            is_chat=is_chat,
+            resume_after=last_event_id(request),
+        ),
+        ping=15,
+    )
 
 
 @router.post("", response_model=BoardMemoryRead)
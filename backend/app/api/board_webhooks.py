@@ -30,7 +30,8 @@ from app.schemas.board_webhooks import (
 from app.schemas.common import OkResponse
 from app.schemas.pagination import DefaultLimitOffsetPage
 from app.services.openclaw.gateway_dispatch import GatewayDispatchService
-from app.services.webhooks.queue import QueuedInboundDelivery, enqueue_webhook_delivery
+from app.services.webhooks.ingest_buffer import webhook_ingest_buffer
+from app.services.webhooks.queue import QueuedInboundDelivery, enqueue_webhook_delivery_async
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -468,7 +469,6 @@ async def ingest_board_webhook(
         source_ip=request.client.host if request.client else None,
         content_type=content_type,
     )
-    session.add(payload)
     memory = BoardMemory(
         board_id=board.id,
         content=_webhook_memory_content(webhook=webhook, payload=payload),
@@ -480,6 +480,26 @@ async def ingest_board_webhook(
         source="webhook",
         is_chat=False,
     )
+    if settings.webhook_ingest_buffered:
+        if webhook_ingest_buffer.submit(payload, memory):
+            logger.info(
+                "webhook.ingest.buffered",
+                extra={
+                    "payload_id": str(payload.id),
+                    "board_id": str(board.id),
+                    "webhook_id": str(webhook.id),
+                },
+            )
+            return BoardWebhookIngestResponse(
+                board_id=board.id,
+                webhook_id=webhook.id,
+                payload_id=payload.id,
+            )
+        logger.warning(
+            "webhook.ingest.buffer_unavailable",
+            extra={"board_id": str(board.id), "webhook_id": str(webhook.id)},
+        )
+    session.add(payload)
     session.add(memory)
     await session.commit()
     logger.info(
@@ -492,7 +512,7 @@ async def ingest_board_webhook(
         },
     )
 
-    enqueued = enqueue_webhook_delivery(
+    enqueued = await enqueue_webhook_delivery_async(
         QueuedInboundDelivery(
             board_id=board.id,
             webhook_id=webhook.id,
@@ -7,13 +7,14 @@ from datetime import datetime, timedelta
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import DateTime, case
+from sqlalchemy import ColumnElement, DateTime, and_, case
 from sqlalchemy import cast as sql_cast
-from sqlalchemy import func
+from sqlalchemy import func, or_
 from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import require_org_member
+from app.api.deps import require_admin_auth, require_org_member
+from app.core.auth import AuthContext
 from app.core.time import utcnow
 from app.db.session import get_session
 from app.models.activity_events import ActivityEvent
@@ -32,7 +33,10 @@ from app.schemas.metrics import (
     DashboardWipRangeSeries,
     DashboardWipSeriesSet,
 )
+from app.schemas.queue_stats import QueueStats
+from app.services.agent_presence import agent_presence_buffer
 from app.services.organizations import OrganizationContext, list_accessible_board_ids
+from app.services.queue_stats import collect_queue_stats
 
 router = APIRouter(prefix="/metrics", tags=["metrics"])
 
@@ -43,6 +47,8 @@ BOARD_ID_QUERY = Query(default=None)
 GROUP_ID_QUERY = Query(default=None)
 SESSION_DEP = Depends(get_session)
 ORG_MEMBER_DEP = Depends(require_org_member)
+ADMIN_AUTH_DEP = Depends(require_admin_auth)
+QUEUE_RATE_WINDOW_QUERY = Query(default=300, ge=60, le=3600)
 
 
 @dataclass(frozen=True)
@@ -358,14 +364,25 @@ async def _active_agents(
     range_spec: RangeSpec,
     board_ids: list[UUID],
 ) -> int:
-    statement = select(func.count()).where(
+    if not board_ids:
+        return 0
+    seen_in_range: ColumnElement[bool] = and_(
         col(Agent.last_seen_at).is_not(None),
         col(Agent.last_seen_at) >= range_spec.start,
         col(Agent.last_seen_at) <= range_spec.end,
     )
-    if not board_ids:
-        return 0
-    statement = statement.where(col(Agent.board_id).in_(board_ids))
+    # Presence recorded by this process but not flushed yet counts as well.
+    pending = agent_presence_buffer.seen_between(
+        range_spec.start,
+        range_spec.end,
+        board_ids=board_ids,
+    )
+    if pending:
+        seen_in_range = or_(seen_in_range, col(Agent.id).in_(pending))
+    statement = select(func.count()).where(
+        seen_in_range,
+        col(Agent.board_id).in_(board_ids),
+    )
     result = (await session.exec(statement)).one()
     return int(result)
 
@@ -482,3 +499,12 @@ async def dashboard_metrics(
         error_rate=error_rate,
         wip=wip,
     )
+
+
+@router.get("/queue", response_model=QueueStats)
+async def queue_metrics(
+    rate_window_seconds: int = QUEUE_RATE_WINDOW_QUERY,
+    _auth: AuthContext = ADMIN_AUTH_DEP,
+) -> QueueStats:
+    """Return queue depth, scheduled lag, throughput and handler latency for operators."""
+    return await collect_queue_stats(rate_window_seconds=rate_window_seconds)
@@ -0,0 +1,80 @@
+"""Admin endpoints for inspecting and replaying dead-lettered queue envelopes."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from fastapi_pagination import create_page, resolve_params
+
+from app.api.deps import require_admin_auth
+from app.core.auth import AuthContext
+from app.schemas.pagination import DefaultLimitOffsetPage
+from app.schemas.queue_dead_letters import (
+    DeadLetterRead,
+    DeadLetterReplayRequest,
+    DeadLetterReplayResponse,
+)
+from app.services.queue_dead_letters import DeadLetter, page_dead_letters, replay_dead_letters
+
+if TYPE_CHECKING:
+    from fastapi_pagination.bases import AbstractParams
+    from fastapi_pagination.limit_offset import LimitOffsetPage
+
+router = APIRouter(prefix="/queue/dead-letters", tags=["queue"])
+ADMIN_AUTH_DEP = Depends(require_admin_auth)
+TASK_TYPE_QUERY = Query(default=None)
+BOARD_ID_QUERY = Query(default=None)
+
+
+def _to_read(letter: DeadLetter) -> DeadLetterRead:
+    return DeadLetterRead(
+        id=letter.id,
+        queue_name=letter.queue_name,
+        task_type=letter.task.task_type,
+        attempts=letter.task.attempts,
+        created_at=letter.task.created_at,
+        dead_at=letter.dead_at,
+        last_error=letter.last_error,
+        payload=letter.task.payload,
+        history=list(letter.task.history),
+    )
+
+
+@router.get("", response_model=DefaultLimitOffsetPage[DeadLetterRead])
+async def list_queue_dead_letters(
+    task_type: str | None = TASK_TYPE_QUERY,
+    board_id: UUID | None = BOARD_ID_QUERY,
+    _auth: AuthContext = ADMIN_AUTH_DEP,
+) -> LimitOffsetPage[DeadLetterRead]:
+    """List dead-lettered envelopes, newest first, optionally filtered by task type or board."""
+    params: AbstractParams = resolve_params()
+    raw_params = params.to_raw_params().as_limit_offset()
+    letters, total = await asyncio.to_thread(
+        page_dead_letters,
+        offset=raw_params.offset or 0,
+        limit=raw_params.limit or 200,
+        task_type=task_type,
+        board_id=str(board_id) if board_id is not None else None,
+    )
+    page = create_page([_to_read(letter) for letter in letters], total=total, params=params)
+    return DefaultLimitOffsetPage[DeadLetterRead].model_validate(page)
+
+
+@router.post("/replay", response_model=DeadLetterReplayResponse)
+async def replay_queue_dead_letters(
+    payload: DeadLetterReplayRequest,
+    _auth: AuthContext = ADMIN_AUTH_DEP,
+) -> DeadLetterReplayResponse:
+    """Schedule matching dead letters back onto their queue at ``rate_per_second``."""
+    replayed = await asyncio.to_thread(
+        replay_dead_letters,
+        rate_per_second=payload.rate_per_second,
+        task_type=payload.task_type,
+        board_id=str(payload.board_id) if payload.board_id is not None else None,
+        ids=set(payload.ids) if payload.ids is not None else None,
+        limit=payload.limit,
+    )
+    return DeadLetterReplayResponse(replayed=replayed)
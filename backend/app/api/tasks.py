@@ -2,9 +2,8 @@
 
 from __future__ import annotations
 
-import asyncio
 import json
-from collections import deque
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, cast
@@ -56,11 +55,24 @@ from app.services.approval_task_links import (
     load_task_ids_by_approval,
     pending_approval_conflicts_by_task,
 )
+from app.services.change_bus import (
+    ENTITY_ACTIVITY,
+    ENTITY_TASK_STATE,
+    ChangeNotification,
+    publish_changes,
+)
 from app.services.mentions import extract_mentions, matches_agent_mention
 from app.services.openclaw.gateway_dispatch import GatewayDispatchService
 from app.services.openclaw.gateway_rpc import GatewayConfig as GatewayClientConfig
 from app.services.openclaw.gateway_rpc import OpenClawGatewayError
 from app.services.organizations import require_board_access
+from app.services.stream_hub import (
+    StreamCursor,
+    StreamEvent,
+    StreamFetch,
+    last_event_id,
+    stream_hub,
+)
 from app.services.tags import (
     TagState,
     load_tag_state,
@@ -75,9 +87,10 @@ from app.services.task_dependencies import (
     replace_task_dependencies,
     validate_dependency_update,
 )
+from app.services.task_stream_cache import TaskPayload, task_stream_cache
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator, Sequence
+    from collections.abc import AsyncGenerator, Mapping, Sequence
 
     from fastapi_pagination.limit_offset import LimitOffsetPage
     from sqlmodel.ext.asyncio.session import AsyncSession
@@ -95,13 +108,19 @@ TASK_EVENT_TYPES = {
     "task.status_changed",
     "task.comment",
 }
-SSE_SEEN_MAX = 2000
+STREAM_POLL_SECONDS = 2
 TASK_SNIPPET_MAX_LEN = 500
 TASK_SNIPPET_TRUNCATED_LEN = 497
 TASK_EVENT_ROW_LEN = 2
+# Tasks whose last sent state a delta-mode connection remembers; older ones are resent whole.
+TASK_DELTA_MAX_TASKS = 1000
 BOARD_READ_DEP = Depends(get_board_for_actor_read)
 ACTOR_DEP = Depends(require_admin_or_agent)
 SINCE_QUERY = Query(default=None)
+DELTA_QUERY = Query(
+    default=False,
+    description="Send each task in full once, then only changed fields (`task_delta`).",
+)
 STATUS_QUERY = Query(default=None, alias="status")
 BOARD_WRITE_DEP = Depends(get_board_for_user_write)
 SESSION_DEP = Depends(get_session)
@@ -478,6 +497,15 @@ async def _reconcile_dependents_for_dependency_toggle(
     )
     if not dependent_ids:
         return
+    # Dependents' blocked state changes without their rows changing; drop their cached
+    # stream payloads.
+    await session.run_sync(
+        publish_changes,
+        {
+            ChangeNotification(board_id, ENTITY_TASK_STATE, dependent_id)
+            for dependent_id in dependent_ids
+        },
+    )
 
     dependents = list(
         await session.exec(
@@ -533,7 +561,9 @@ async def _reconcile_dependents_for_dependency_toggle(
 async def _fetch_task_events(
     session: AsyncSession,
     board_id: UUID,
-    since: datetime,
+    since: datetime | None,
+    *,
+    after_seq: int | None = None,
 ) -> list[tuple[ActivityEvent, Task | None]]:
     task_ids = list(
         await session.exec(select(Task.id).where(col(Task.board_id) == board_id)),
@@ -545,9 +575,15 @@ async def _fetch_task_events(
         .outerjoin(Task, col(ActivityEvent.task_id) == col(Task.id))
         .where(col(ActivityEvent.task_id).in_(task_ids))
         .where(col(ActivityEvent.event_type).in_(TASK_EVENT_TYPES))
-        .where(col(ActivityEvent.created_at) >= since)
-        .order_by(asc(col(ActivityEvent.created_at)))
     )
+    if after_seq is not None:
+        statement = statement.where(col(ActivityEvent.seq) > after_seq).order_by(
+            asc(col(ActivityEvent.seq)),
+        )
+    elif since is not None:
+        statement = statement.where(col(ActivityEvent.created_at) >= since).order_by(
+            asc(col(ActivityEvent.created_at)),
+        )
     result = await session.execute(statement)
     return _coerce_task_event_rows(list(result.tuples().all()))
 
@@ -1296,6 +1332,7 @@ def _task_event_payload(
     dep_status: dict[UUID, str],
     tag_state_by_task_id: dict[UUID, TagState],
     custom_field_values_by_task_id: dict[UUID, TaskCustomFieldValues] | None = None,
+    task_payloads: dict[UUID, TaskPayload] | None = None,
 ) -> dict[str, object]:
     resolved_custom_field_values_by_task_id = custom_field_values_by_task_id or {}
     payload: dict[str, object] = {
@@ -1308,6 +1345,9 @@ def _task_event_payload(
     if task is None:
         payload["task"] = None
         return payload
+    if task_payloads is not None and task.id in task_payloads:
+        payload["task"] = task_payloads[task.id]
+        return payload
 
     tag_state = tag_state_by_task_id.get(task.id, TagState())
     dep_list = deps_map.get(task.id, [])
@@ -1337,40 +1377,37 @@ def _task_event_payload(
     return payload
 
 
-async def _task_event_generator(
-    *,
-    request: Request,
-    board_id: UUID,
-    since_dt: datetime,
-) -> AsyncIterator[dict[str, str]]:
-    last_seen = since_dt
-    seen_ids: set[UUID] = set()
-    seen_queue: deque[UUID] = deque()
-
-    while True:
-        if await request.is_disconnected():
-            break
-
+def _task_stream_fetch(board_id: UUID) -> StreamFetch:
+    async def fetch(cursor: StreamCursor) -> list[StreamEvent]:
+        snapshot = task_stream_cache.snapshot(board_id)
         async with async_session_maker() as session:
-            rows = await _fetch_task_events(session, board_id, last_seen)
+            rows = await _fetch_task_events(
+                session,
+                board_id,
+                cursor.since,
+                after_seq=cursor.after_seq,
+            )
+            task_payloads: dict[UUID, TaskPayload] = {}
+            for _event, task in rows:
+                if task is None or task.id in task_payloads:
+                    continue
+                cached = task_stream_cache.get(task.id, task.updated_at)
+                if cached is not None:
+                    task_payloads[task.id] = cached
+            # Only tasks missing from the cache are hydrated from the database.
             deps_map, dep_status, tag_state_by_task_id, custom_field_values_by_task_id = (
                 await _stream_task_state(
                     session,
                     board_id=board_id,
-                    rows=rows,
+                    rows=[
+                        (event, task)
+                        for event, task in rows
+                        if task is None or task.id not in task_payloads
+                    ],
                 )
             )
-
+        events: list[StreamEvent] = []
         for event, task in rows:
-            if event.id in seen_ids:
-                continue
-            seen_ids.add(event.id)
-            seen_queue.append(event.id)
-            if len(seen_queue) > SSE_SEEN_MAX:
-                oldest = seen_queue.popleft()
-                seen_ids.discard(oldest)
-            last_seen = max(event.created_at, last_seen)
-
             payload = _task_event_payload(
                 event,
                 task,
@@ -1378,9 +1415,100 @@ async def _task_event_generator(
                 dep_status=dep_status,
                 tag_state_by_task_id=tag_state_by_task_id,
                 custom_field_values_by_task_id=custom_field_values_by_task_id,
+                task_payloads=task_payloads,
+            )
+            task_payload = payload.get("task")
+            if task is not None and isinstance(task_payload, dict) and task.id not in task_payloads:
+                task_payloads[task.id] = task_payload
+                task_stream_cache.put(
+                    snapshot,
+                    board_id=board_id,
+                    task_id=task.id,
+                    updated_at=task.updated_at,
+                    payload=task_payload,
+                )
+            events.append(
+                StreamEvent(
+                    id=event.id,
+                    seq=event.seq,
+                    created_at=event.created_at,
+                    event="task",
+                    data=json.dumps(payload),
+                    payload=payload,
+                    # Each task event carries the full current task; comments do not.
+                    coalesce_key=(
+                        ("task", task.id)
+                        if task is not None and event.event_type != "task.comment"
+                        else None
+                    ),
+                ),
             )
-            yield {"event": "task", "data": json.dumps(payload)}
-        await asyncio.sleep(2)
+        return events
+
+    return fetch
+
+
+class TaskDeltaEncoder:
+    """Per-connection delta mode: send a task in full once, then only its changed fields.
+
+    A delta event replaces ``task`` with ``task_delta``: the task ``id``, the ``version``
+    (``updated_at``) it brings the client to, the ``base_version`` it applies on, and the
+    changed ``fields``. A client whose copy is not at ``base_version`` should refetch the task.
+    """
+
+    def __init__(self, max_tasks: int = TASK_DELTA_MAX_TASKS) -> None:
+        self._max_tasks = max_tasks
+        self._sent: OrderedDict[object, Mapping[str, object]] = OrderedDict()
+
+    def __call__(self, event: StreamEvent) -> dict[str, str]:
+        message = event.as_sse()
+        payload = event.payload
+        task = payload.get("task") if payload is not None else None
+        if payload is None or not isinstance(task, dict):
+            return message
+        task_id = task.get("id")
+        previous = self._sent.pop(task_id, None)
+        # Payload objects are shared between connections and never mutated.
+        self._sent[task_id] = task
+        if len(self._sent) > self._max_tasks:
+            self._sent.popitem(last=False)
+        if previous is None:
+            return message
+        delta_payload = {key: value for key, value in payload.items() if key != "task"}
+        delta_payload["task_delta"] = {
+            "id": task_id,
+            "version": task.get("updated_at"),
+            "base_version": previous.get("updated_at"),
+            "fields": {
+                key: value
+                for key, value in task.items()
+                if key not in previous or previous[key] != value
+            },
+        }
+        message["data"] = json.dumps(delta_payload)
+        return message
+
+
+def task_event_stream(
+    request: Request,
+    board_id: UUID,
+    *,
+    since_dt: datetime,
+    resume_after: int | None,
+    delta: bool = False,
+) -> AsyncGenerator[dict[str, str], None]:
+    """Return the shared task/comment event stream of a board for one client."""
+    return stream_hub.stream(
+        request,
+        ("tasks", board_id),
+        fetch=_task_stream_fetch(board_id),
+        since=since_dt,
+        resume_after=resume_after,
+        board_ids={board_id},
+        entities={ENTITY_ACTIVITY},
+        poll_seconds=STREAM_POLL_SECONDS,
+        encode=TaskDeltaEncoder() if delta else None,
+    )
 
 
 @router.get("/stream")
@@ -1389,14 +1517,17 @@ async def stream_tasks(
     board: Board = BOARD_READ_DEP,
     _actor: ActorContext = ACTOR_DEP,
     since: str | None = SINCE_QUERY,
+    delta: bool = DELTA_QUERY,
 ) -> EventSourceResponse:
     """Stream task and task-comment events as SSE payloads."""
     since_dt = _parse_since(since) or utcnow()
     return EventSourceResponse(
-        _task_event_generator(
-            request=request,
-            board_id=board.id,
+        task_event_stream(
+            request,
+            board.id,
             since_dt=since_dt,
+            resume_after=last_event_id(request),
+            delta=delta,
         ),
         ping=15,
     )
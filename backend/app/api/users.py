@@ -32,6 +32,7 @@ from app.models.tasks import Task
 from app.models.users import User
 from app.schemas.common import OkResponse
 from app.schemas.users import UserRead, UserUpdate
+from app.services.organization_access_cache import organization_access_cache
 
 if TYPE_CHECKING:
     from sqlmodel.ext.asyncio.session import AsyncSession
@@ -195,6 +196,7 @@ async def _delete_organization_tree(
         col(Organization.id) == organization_id,
         commit=False,
     )
+    organization_access_cache.invalidate(session, organization_id=organization_id)
 
 
 @router.get("/me", response_model=UserRead)
@@ -288,5 +290,6 @@ async def delete_me(
         col(User.id) == user.id,
         commit=False,
     )
+    organization_access_cache.invalidate(session, user_id=user.id)
     await session.commit()
     return OkResponse()
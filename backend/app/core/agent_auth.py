@@ -6,8 +6,16 @@ Key ideas:
 - Agents authenticate with an opaque token presented as `X-Agent-Token: <token>`.
 - For convenience, some deployments may also allow `Authorization: Bearer <token>`
   for agents (controlled by caller/dependency).
+- Tokens are located by an indexed SHA-256 lookup key and then verified against their
+  PBKDF2 hash, so each request costs one row fetch and at most one PBKDF2 verify.
+  Agents minted before lookup keys existed are found by a PBKDF2 scan that backfills
+  their key (see `AGENT_TOKEN_LEGACY_SCAN_ENABLED`). The scan switches itself off for the
+  process once no agent is left without a key.
+- Verified tokens are cached per process (`verified_agent_tokens`), so a repeat
+  request only loads the agent by primary key and checks its token hash is unchanged.
 - To reduce write-amplification, we only touch `Agent.last_seen_at` at a fixed
-  interval and we avoid touching it for safe/read-only HTTP methods.
+  interval, and the touch is buffered in memory and written in bulk by
+  `agent_presence_buffer` instead of with the request.
 
 This is intentionally separate from user authentication (Clerk/local bearer token)
 so we can evolve agent policy independently.
@@ -20,16 +28,25 @@ from datetime import timedelta
 from typing import TYPE_CHECKING, Literal
 
 from fastapi import Depends, Header, HTTPException, Request, status
+from sqlalchemy import ColumnElement, func, update
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.agent_tokens import verify_agent_token
+from app.core.agent_tokens import (
+    agent_token_lookup_key,
+    verified_agent_tokens,
+    verify_agent_token_async,
+)
+from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.time import utcnow
-from app.db.session import get_session
+from app.db.session import async_session_maker, get_session
 from app.models.agents import Agent
+from app.services.agent_presence import agent_presence_buffer
 
 if TYPE_CHECKING:
-    from sqlmodel.ext.asyncio.session import AsyncSession
+    from sqlalchemy.ext.asyncio import async_sessionmaker
 
 logger = get_logger(__name__)
 
@@ -38,6 +55,28 @@ _SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 SESSION_DEP = Depends(get_session)
 
 
+class _LegacyTokenScan:
+    """Per-process switch that retires the legacy scan once every agent has a lookup key.
+
+    Tokens are always minted with a lookup key, so once none is missing none will be again.
+    """
+
+    def __init__(self) -> None:
+        self.exhausted = False
+
+    @property
+    def enabled(self) -> bool:
+        return settings.agent_token_legacy_scan_enabled and not self.exhausted
+
+    def exhaust(self) -> None:
+        if not self.exhausted:
+            self.exhausted = True
+            logger.info("agent.auth.legacy_scan_disabled reason=all_agents_have_lookup_keys")
+
+
+legacy_token_scan = _LegacyTokenScan()
+
+
 @dataclass
 class AgentAuthContext:
     """Authenticated actor payload for agent-originated requests."""
@@ -47,17 +86,102 @@ class AgentAuthContext:
 
 
 async def _find_agent_for_token(session: AsyncSession, token: str) -> Agent | None:
-    agents = list(
-        await session.exec(
-            select(Agent).where(col(Agent.agent_token_hash).is_not(None)),
-        ),
+    cached = verified_agent_tokens.get(token)
+    if cached is not None:
+        agent = await session.get(Agent, cached.agent_id)
+        # A deleted agent or a rotated token (on any replica) invalidates the entry.
+        if agent is not None and agent.agent_token_hash == cached.token_hash:
+            return agent
+        verified_agent_tokens.invalidate_agent(cached.agent_id)
+    agent = await _verify_agent_for_token(session, token)
+    if agent is not None and agent.agent_token_hash:
+        verified_agent_tokens.put(token, agent_id=agent.id, token_hash=agent.agent_token_hash)
+    return agent
+
+
+async def _verify_agent_for_token(session: AsyncSession, token: str) -> Agent | None:
+    lookup_key = agent_token_lookup_key(token)
+    agent = (
+        await session.exec(select(Agent).where(col(Agent.agent_token_lookup) == lookup_key))
+    ).first()
+    if agent is not None:
+        if agent.agent_token_hash and await verify_agent_token_async(
+            token,
+            agent.agent_token_hash,
+        ):
+            return agent
+        return None
+    if not legacy_token_scan.enabled:
+        return None
+    return await _find_legacy_agent_for_token(session, token, lookup_key=lookup_key)
+
+
+def _legacy_agents_filter() -> tuple[ColumnElement[bool], ...]:
+    return (
+        col(Agent.agent_token_hash).is_not(None),
+        col(Agent.agent_token_lookup).is_(None),
     )
+
+
+async def check_legacy_token_scan(
+    session_maker: async_sessionmaker[AsyncSession] | None = None,
+) -> None:
+    """Switch the legacy token scan off at startup when no agent still needs it."""
+    if not legacy_token_scan.enabled:
+        return
+    try:
+        async with (session_maker or async_session_maker)() as session:
+            remaining = (
+                await session.exec(
+                    select(func.count(col(Agent.id))).where(*_legacy_agents_filter()),
+                )
+            ).one()
+    except Exception as exc:
+        # Keep scanning; the first empty scan switches it off just the same.
+        logger.warning("agent.auth.legacy_scan_check_failed error=%s", exc)
+        return
+    if remaining:
+        logger.info("agent.auth.legacy_scan_pending agents=%s", remaining)
+        return
+    legacy_token_scan.exhaust()
+
+
+async def _find_legacy_agent_for_token(
+    session: AsyncSession,
+    token: str,
+    *,
+    lookup_key: str,
+) -> Agent | None:
+    """Scan agents without a lookup key and backfill it on the one the token matches."""
+    agents = list(await session.exec(select(Agent).where(*_legacy_agents_filter())))
+    if not agents:
+        legacy_token_scan.exhaust()
+        return None
     for agent in agents:
-        if agent.agent_token_hash and verify_agent_token(token, agent.agent_token_hash):
+        if agent.agent_token_hash and await verify_agent_token_async(
+            token,
+            agent.agent_token_hash,
+        ):
+            await _backfill_token_lookup(session, agent, lookup_key)
             return agent
     return None
 
 
+async def _backfill_token_lookup(session: AsyncSession, agent: Agent, lookup_key: str) -> None:
+    # A separate session, so authentication never commits work the request has staged.
+    async with AsyncSession(session.bind, expire_on_commit=False) as backfill:
+        await backfill.exec(
+            update(Agent)
+            .where(col(Agent.id) == agent.id)
+            .where(col(Agent.agent_token_lookup).is_(None))
+            .values(agent_token_lookup=lookup_key),
+        )
+        await backfill.commit()
+    # Mirror the stored value without marking the request's copy dirty.
+    set_committed_value(agent, "agent_token_lookup", lookup_key)
+    logger.info("agent.auth.token_lookup_backfilled agent_id=%s", agent.id)
+
+
 def _resolve_agent_token(
     agent_token: str | None,
     authorization: str | None,
@@ -88,9 +212,15 @@ async def _touch_agent_presence(
     Heartbeats are the primary presence mechanism, but agents may still make API
     calls (task comments, memory updates, etc). Touch presence so the UI reflects
     real activity even if the heartbeat loop isn't running.
+
+    While the presence buffer runs the touch is only recorded in memory and written in
+    bulk later; otherwise it is written with the request.
     """
     now = utcnow()
-    if agent.last_seen_at is not None and now - agent.last_seen_at < _LAST_SEEN_TOUCH_INTERVAL:
+    last_seen_at = agent_presence_buffer.last_seen(agent.id) or agent.last_seen_at
+    if last_seen_at is not None and now - last_seen_at < _LAST_SEEN_TOUCH_INTERVAL:
+        return
+    if agent_presence_buffer.record(agent, now):
         return
 
     agent.last_seen_at = now
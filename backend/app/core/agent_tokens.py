@@ -1,14 +1,33 @@
-"""Token generation and verification helpers for agent authentication."""
+"""Token generation and verification helpers for agent authentication.
+
+PBKDF2 takes tens of milliseconds of CPU per call. Async code uses
+:func:`hash_agent_token_async` and :func:`verify_agent_token_async`, which run it on a
+small dedicated thread pool (``hashlib`` releases the GIL while deriving), so a bulk token
+rotation no longer stalls every other request on the event loop. The pool size
+(``agent_token_hash_workers``) bounds how many derivations run at once.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import hmac
 import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.core.config import settings
 
 ITERATIONS = 200_000
 SALT_BYTES = 16
+# Keys the in-memory cache digests, so cache keys are useless outside this process.
+_CACHE_DIGEST_KEY = secrets.token_bytes(32)
+
+_hash_executor: ThreadPoolExecutor | None = None
 
 
 def generate_agent_token() -> str:
@@ -32,6 +51,48 @@ def hash_agent_token(token: str) -> str:
     return f"pbkdf2_sha256${ITERATIONS}${_b64encode(salt)}${_b64encode(digest)}"
 
 
+def _executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.agent_token_hash_workers,
+            thread_name_prefix="agent-token-hash",
+        )
+    return _hash_executor
+
+
+def shutdown_hash_executor() -> None:
+    """Stop the PBKDF2 thread pool (it is recreated on next use)."""
+    global _hash_executor
+    executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def hash_agent_token_async(token: str) -> str:
+    """Hash ``token`` like :func:`hash_agent_token`, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_executor(), hash_agent_token, token)
+
+
+async def verify_agent_token_async(token: str, stored_hash: str) -> bool:
+    """Verify ``token`` like :func:`verify_agent_token`, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor(),
+        verify_agent_token,
+        token,
+        stored_hash,
+    )
+
+
+def agent_token_lookup_key(token: str) -> str:
+    """Return the indexed, non-secret lookup key for a token (SHA-256 hex).
+
+    Tokens carry 256 bits of randomness, so a fast unsalted digest cannot be brute-forced;
+    it only locates the agent row, and the PBKDF2 hash is still verified afterwards.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def verify_agent_token(token: str, stored_hash: str) -> bool:
     """Verify a plaintext token against a stored PBKDF2 hash representation."""
     try:
@@ -53,3 +114,99 @@ def verify_agent_token(token: str, stored_hash: str) -> bool:
         iterations_int,
     )
     return hmac.compare_digest(candidate, expected_digest)
+
+
+@dataclass(frozen=True)
+class VerifiedAgentToken:
+    """A token that passed PBKDF2 verification for ``agent_id``."""
+
+    agent_id: UUID
+    token_hash: str
+    expires_at: float
+
+
+class VerifiedAgentTokenCache:
+    """Bounded LRU with TTL of verified tokens, so repeat requests skip PBKDF2.
+
+    Entries are keyed by an HMAC of the token under a per-process key. Callers must check
+    an entry against the agent row they load: a deleted agent or a changed
+    ``agent_token_hash`` (a rotation, possibly on another replica) means the entry is
+    stale, so revocation never depends on this process having seen the change.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[bytes, VerifiedAgentToken] = OrderedDict()
+        self._keys_by_agent: dict[UUID, set[bytes]] = {}
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        return settings.agent_token_cache_size
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is not None:
+            return self._ttl_seconds
+        return settings.agent_token_cache_ttl_seconds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hmac.new(_CACHE_DIGEST_KEY, token.encode("utf-8"), hashlib.sha256).digest()
+
+    def get(self, token: str) -> VerifiedAgentToken | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, token: str, *, agent_id: UUID, token_hash: str) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        key = self._key(token)
+        self._discard(key)
+        self._entries[key] = VerifiedAgentToken(
+            agent_id=agent_id,
+            token_hash=token_hash,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._keys_by_agent.setdefault(agent_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate_agent(self, agent_id: UUID) -> None:
+        """Forget every cached token of ``agent_id`` (token rotated, agent removed)."""
+        for key in tuple(self._keys_by_agent.get(agent_id, ())):
+            self._discard(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_agent.clear()
+
+    def _discard(self, key: bytes) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        agent_keys = self._keys_by_agent.get(entry.agent_id)
+        if agent_keys is not None:
+            agent_keys.discard(key)
+            if not agent_keys:
+                del self._keys_by_agent[entry.agent_id]
+
+
+verified_agent_tokens = VerifiedAgentTokenCache()
@@ -19,19 +19,25 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from hmac import compare_digest
+from http.cookies import SimpleCookie
 from typing import TYPE_CHECKING, Literal
 
 import httpx
 from clerk_backend_api import Clerk
 from clerk_backend_api.models.clerkerrors import ClerkErrors
 from clerk_backend_api.models.sdkerror import SDKError
-from clerk_backend_api.security.types import AuthenticateRequestOptions, AuthStatus, RequestState
+from clerk_backend_api.security.types import (
+    AuthErrorReason,
+    AuthStatus,
+    RequestState,
+    TokenVerificationError,
+)
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, ValidationError
-from starlette.concurrency import run_in_threadpool
 
 from app.core.auth_mode import AuthMode
+from app.core.clerk_tokens import normalize_clerk_server_url, verify_clerk_session_token
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.db import crud
@@ -205,40 +211,40 @@ def _extract_clerk_profile(profile: ClerkUser | None) -> tuple[str | None, str |
     return profile_email, profile_name
 
 
-def _normalize_clerk_server_url(raw: str) -> str | None:
-    server_url = raw.strip().rstrip("/")
-    if not server_url:
+def _extract_clerk_session_token(request: Request) -> str | None:
+    # Same sources as the SDK's authenticate_request(): bearer header, then `__session*` cookie.
+    token = _extract_bearer_token(request.headers.get("Authorization"))
+    if token is not None:
+        return token
+    cookie_header = request.headers.get("cookie")
+    if not cookie_header:
         return None
-    if not server_url.endswith("/v1"):
-        server_url = f"{server_url}/v1"
-    return server_url
-
-
-def _make_authenticate_request_options() -> AuthenticateRequestOptions:
-    # Follow the clerk-backend-api documented flow: authenticate_request() with a secret key.
-    return AuthenticateRequestOptions(
-        secret_key=settings.clerk_secret_key.strip(),
-        clock_skew_in_ms=int(settings.clerk_leeway * 1000),
-        accepts_token=["session_token"],
-    )
+    for name, morsel in SimpleCookie(cookie_header).items():
+        if name.startswith("__session") and morsel.value:
+            return morsel.value
+    return None
 
 
 async def _authenticate_clerk_request(request: Request) -> RequestState:
-    # The SDK docs use httpx.Request as the request object; build one from the ASGI request.
-    httpx_request = httpx.Request(
-        request.method,
-        str(request.url),
-        headers=dict(request.headers),
-    )
-    options = _make_authenticate_request_options()
-    sdk = Clerk(bearer_auth=options.secret_key or "")
-    return await run_in_threadpool(sdk.authenticate_request, httpx_request, options)
+    # Verified in-process against the cached Clerk JWKS (see app.core.clerk_tokens) instead
+    # of constructing an SDK client and calling authenticate_request() in the threadpool.
+    token = _extract_clerk_session_token(request)
+    if token is None:
+        return RequestState(
+            status=AuthStatus.SIGNED_OUT,
+            reason=AuthErrorReason.SESSION_TOKEN_MISSING,
+        )
+    try:
+        claims = await verify_clerk_session_token(token)
+    except TokenVerificationError as exc:
+        return RequestState(status=AuthStatus.SIGNED_OUT, reason=exc.reason)
+    return RequestState(status=AuthStatus.SIGNED_IN, token=token, payload=claims)
 
 
 async def _fetch_clerk_profile(clerk_user_id: str) -> tuple[str | None, str | None]:
     secret = settings.clerk_secret_key.strip()
     secret_kind = secret.split("_", maxsplit=1)[0] if "_" in secret else "unknown"
-    server_url = _normalize_clerk_server_url(settings.clerk_api_url or "")
+    server_url = normalize_clerk_server_url(settings.clerk_api_url or "")
     clerk_user_id_log = clerk_user_id[-6:] if clerk_user_id else ""
 
     try:
@@ -294,7 +300,7 @@ async def delete_clerk_user(clerk_user_id: str) -> None:
 
     secret = settings.clerk_secret_key.strip()
     secret_kind = secret.split("_", maxsplit=1)[0] if "_" in secret else "unknown"
-    server_url = _normalize_clerk_server_url(settings.clerk_api_url or "")
+    server_url = normalize_clerk_server_url(settings.clerk_api_url or "")
     clerk_user_id_log = clerk_user_id[-6:] if clerk_user_id else ""
 
     try:
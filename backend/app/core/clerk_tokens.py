@@ -0,0 +1,262 @@
+"""In-process verification of Clerk session tokens.
+
+Clerk session tokens are short-lived RS256 JWTs signed with the instance's JWKS. Instead
+of building a Clerk SDK client per request and verifying in the threadpool, this module
+keeps the signing keys in memory and verifies tokens on the event loop:
+
+- :class:`ClerkJWKS` fetches ``GET {CLERK_API_URL}/v1/jwks`` once and serves keys from
+  memory. After ``CLERK_JWKS_CACHE_TTL_SECONDS`` the keys are refreshed in the background
+  while requests keep using the cached ones (stale-while-revalidate). A token signed with an
+  unknown ``kid`` (key rotation) triggers an immediate refetch, at most once per
+  ``_MIN_REFETCH_INTERVAL`` so forged ``kid`` values cannot hammer the Clerk API.
+- :class:`VerifiedClaimsCache` remembers the claims of verified tokens until the token
+  expires, so repeat requests with the same token skip signature verification as well.
+  Entries never outlive the token's ``exp``, which is also when Clerk stops accepting it.
+
+Failures raise the Clerk SDK's :class:`TokenVerificationError`, so callers report the
+same reasons as the SDK's ``authenticate_request``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+import httpx
+import jwt
+from clerk_backend_api.security.types import (
+    TokenVerificationError,
+    TokenVerificationErrorReason,
+)
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_ALGORITHMS = ["RS256"]
+_MIN_REFETCH_INTERVAL = 10.0
+_FETCH_TIMEOUT_SECONDS = 5.0
+# Keys the claims cache digests, so cache keys are useless outside this process.
+_CACHE_DIGEST_KEY = secrets.token_bytes(32)
+
+Claims = dict[str, Any]
+
+
+def normalize_clerk_server_url(raw: str) -> str | None:
+    """Return the Clerk Backend API base URL (ending in ``/v1``), or ``None`` when unset."""
+    server_url = raw.strip().rstrip("/")
+    if not server_url:
+        return None
+    if not server_url.endswith("/v1"):
+        server_url = f"{server_url}/v1"
+    return server_url
+
+
+class ClerkJWKS:
+    """Signing keys of the Clerk instance, cached in memory and refreshed in the background."""
+
+    def __init__(self, *, ttl_seconds: float | None = None) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._keys: dict[str, Any] = {}
+        self._fetched_at: float | None = None
+        self._attempted_at = float("-inf")
+        self._refresh: asyncio.Task[None] | None = None
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is not None:
+            return self._ttl_seconds
+        return settings.clerk_jwks_cache_ttl_seconds
+
+    def clear(self) -> None:
+        self._keys = {}
+        self._fetched_at = None
+        self._attempted_at = float("-inf")
+        self._refresh = None
+
+    async def get_key(self, kid: str) -> Any:
+        """Return the public key for ``kid``; raise when Clerk does not publish it."""
+        now = time.monotonic()
+        may_refetch = now - self._attempted_at >= _MIN_REFETCH_INTERVAL
+        if self._fetched_at is None:
+            await self._refreshed()
+        elif kid not in self._keys:
+            if may_refetch:
+                await self._refreshed()
+        elif now - self._fetched_at >= self.ttl_seconds and may_refetch:
+            self._refresh_task()
+        key = self._keys.get(kid)
+        if key is None:
+            raise TokenVerificationError(TokenVerificationErrorReason.JWK_KID_MISMATCH)
+        return key
+
+    def _refresh_task(self) -> asyncio.Task[None]:
+        """Return the in-flight refresh, starting one if none is running."""
+        task = self._refresh
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._attempted_at = time.monotonic()
+            task = asyncio.create_task(self._load())
+            task.add_done_callback(_log_refresh_failure)
+            self._refresh = task
+        return task
+
+    async def _refreshed(self) -> None:
+        try:
+            await asyncio.shield(self._refresh_task())
+        except TokenVerificationError:
+            if not self._keys:
+                raise
+            # Keep verifying with the keys we have while Clerk is unreachable.
+
+    async def _load(self) -> None:
+        keys = _parse_jwks(await self._fetch())
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        logger.info("auth.clerk.jwks.refreshed keys=%s", len(keys))
+
+    async def _fetch(self) -> Mapping[str, Any]:
+        server_url = normalize_clerk_server_url(settings.clerk_api_url or "")
+        secret = settings.clerk_secret_key.strip()
+        if server_url is None or not secret:
+            raise TokenVerificationError(TokenVerificationErrorReason.SECRET_KEY_MISSING)
+        try:
+            async with httpx.AsyncClient(timeout=_FETCH_TIMEOUT_SECONDS) as client:
+                response = await client.get(
+                    f"{server_url}/jwks",
+                    headers={"Accept": "application/json", "Authorization": f"Bearer {secret}"},
+                )
+            response.raise_for_status()
+            payload = response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            logger.warning("auth.clerk.jwks.fetch_failed error=%s", exc)
+            raise TokenVerificationError(TokenVerificationErrorReason.JWK_FAILED_TO_LOAD) from exc
+        if not isinstance(payload, Mapping):
+            raise TokenVerificationError(TokenVerificationErrorReason.JWK_REMOTE_INVALID)
+        return payload
+
+
+def _log_refresh_failure(task: asyncio.Task[None]) -> None:
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.warning("auth.clerk.jwks.refresh_failed error=%s", exc)
+
+
+def _parse_jwks(payload: Mapping[str, Any]) -> dict[str, Any]:
+    raw_keys = payload.get("keys")
+    if not isinstance(raw_keys, list):
+        raise TokenVerificationError(TokenVerificationErrorReason.JWK_REMOTE_INVALID)
+    keys: dict[str, Any] = {}
+    for raw in raw_keys:
+        if not isinstance(raw, dict) or not raw.get("kid"):
+            continue
+        try:
+            keys[str(raw["kid"])] = jwt.PyJWK(raw, algorithm="RS256").key
+        except jwt.PyJWKError:
+            continue
+    return keys
+
+
+class VerifiedClaimsCache:
+    """Bounded LRU of verified token claims, each kept until its token expires."""
+
+    def __init__(self, *, max_entries: int | None = None) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, Claims]] = OrderedDict()
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        return settings.clerk_claims_cache_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hmac.digest(_CACHE_DIGEST_KEY, token.encode("utf-8"), hashlib.sha256)
+
+    def get(self, token: str) -> Claims | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, token: str, claims: Claims) -> None:
+        expires_at = claims.get("exp")
+        if self.max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        key = self._key(token)
+        self._entries[key] = (float(expires_at), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _decode(token: str, key: Any) -> Claims:
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=_ALGORITHMS,
+            leeway=settings.clerk_leeway,
+            options={
+                "require": ["exp", "sub"],
+                "verify_aud": False,
+                "verify_iat": settings.clerk_verify_iat,
+                "verify_iss": False,
+            },
+        )
+    except jwt.ExpiredSignatureError as exc:
+        raise TokenVerificationError(TokenVerificationErrorReason.TOKEN_EXPIRED) from exc
+    except jwt.InvalidSignatureError as exc:
+        raise TokenVerificationError(TokenVerificationErrorReason.TOKEN_INVALID_SIGNATURE) from exc
+    except jwt.ImmatureSignatureError as exc:
+        raise TokenVerificationError(TokenVerificationErrorReason.TOKEN_NOT_ACTIVE_YET) from exc
+    except jwt.InvalidIssuedAtError as exc:
+        raise TokenVerificationError(TokenVerificationErrorReason.TOKEN_IAT_IN_THE_FUTURE) from exc
+    except jwt.InvalidTokenError as exc:
+        raise TokenVerificationError(TokenVerificationErrorReason.TOKEN_INVALID) from exc
+    return dict(claims)
+
+
+async def verify_clerk_session_token(token: str) -> Claims:
+    """Return the verified claims of a Clerk session token.
+
+    Raises :class:`TokenVerificationError` when the token is malformed, signed with an
+    unknown key, expired, or otherwise invalid.
+    """
+    cached = verified_clerk_claims.get(token)
+    if cached is not None:
+        return cached
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except jwt.InvalidTokenError as exc:
+        raise TokenVerificationError(TokenVerificationErrorReason.TOKEN_INVALID) from exc
+    if not isinstance(kid, str) or not kid:
+        raise TokenVerificationError(TokenVerificationErrorReason.JWK_KID_MISMATCH)
+    claims = _decode(token, await clerk_jwks.get_key(kid))
+    verified_clerk_claims.put(token, claims)
+    return claims
+
+
+clerk_jwks = ClerkJWKS()
+verified_clerk_claims = VerifiedClaimsCache()
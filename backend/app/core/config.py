@@ -46,6 +46,10 @@ class Settings(BaseSettings):
     clerk_api_url: str = "https://api.clerk.com"
     clerk_verify_iat: bool = True
     clerk_leeway: float = 10.0
+    # Session tokens are verified in-process against the instance JWKS, refreshed in the
+    # background once older than this; verified claims are cached until the token expires.
+    clerk_jwks_cache_ttl_seconds: float = Field(default=3600.0, ge=0)
+    clerk_claims_cache_size: int = Field(default=4096, ge=0)
 
     cors_origins: str = ""
     base_url: str = ""
@@ -55,6 +59,18 @@ class Settings(BaseSettings):
     security_header_referrer_policy: str = ""
     security_header_permissions_policy: str = ""
 
+    # Agent tokens minted before indexed lookup have no lookup key and are found by a PBKDF2
+    # scan, which backfills the key. Disable once every agent token is keyed or rotated.
+    agent_token_legacy_scan_enabled: bool = True
+    # Verified agent tokens cached per process so repeat requests skip PBKDF2 (0 disables).
+    agent_token_cache_size: int = Field(default=4096, ge=0)
+    agent_token_cache_ttl_seconds: float = Field(default=300.0, ge=0)
+    # Threads deriving PBKDF2 agent token hashes off the event loop (bounds concurrent hashing).
+    agent_token_hash_workers: int = Field(default=2, ge=1)
+    # Agent presence (last_seen_at) is buffered per process and written in one bulk UPDATE
+    # at this interval; 0 writes each touch with the request as before.
+    agent_presence_flush_interval_seconds: float = Field(default=5.0, ge=0)
+
     # Database lifecycle
     db_auto_migrate: bool = False
 
@@ -65,6 +81,54 @@ class Settings(BaseSettings):
     rq_dispatch_max_retries: int = 3
     rq_dispatch_retry_base_seconds: float = 10.0
     rq_dispatch_retry_max_seconds: float = 120.0
+    # Worker handlers run concurrently when > 1; throttling then applies per target
+    # (board/gateway) instead of as a global sleep after every task.
+    rq_worker_concurrency: int = Field(default=1, ge=1)
+    # Max envelopes popped per dequeue round trip; webhook deliveries in one batch are
+    # grouped into a single digest message per board and target agent.
+    rq_dequeue_batch_size: int = Field(default=50, ge=1)
+    # Smooth weighted round-robin shares per queue lane (JSON object in env).
+    rq_lane_weights: dict[str, int] = Field(default_factory=lambda: {"high": 4, "default": 1})
+    # Shared Redis connection pool (one per process and URL; one per event loop for asyncio).
+    rq_redis_max_connections: int = Field(default=50, ge=1)
+    rq_redis_pool_timeout_seconds: float = Field(default=5.0, ge=0)
+    rq_redis_socket_connect_timeout_seconds: float = Field(default=5.0, gt=0)
+    rq_redis_health_check_interval_seconds: int = Field(default=30, ge=0)
+    rq_redis_retry_attempts: int = Field(default=3, ge=0)
+    # Per-task-type queue counters and handler latency histograms kept in Redis.
+    rq_stats_enabled: bool = True
+    # Envelopes that exhaust their retries are kept (newest first) for inspection and replay.
+    rq_dead_letter_max_items: int = Field(default=10000, ge=1)
+    # At-least-once delivery: workers move envelopes to a per-worker processing list under a
+    # renewable lease and acknowledge them after the handler; expired leases are re-queued.
+    rq_reliable_dequeue: bool = False
+    rq_lease_seconds: float = Field(default=60.0, gt=0)
+
+    # Buffered webhook ingest: return 202 before writing and store payloads in group
+    # commits of up to `webhook_ingest_flush_max_batch` rows (see docs/production).
+    webhook_ingest_buffered: bool = False
+    webhook_ingest_buffer_max_items: int = Field(default=10000, ge=1)
+    webhook_ingest_flush_interval_ms: float = Field(default=5.0, ge=0)
+    webhook_ingest_flush_max_batch: int = Field(default=500, ge=1)
+
+    # SSE streams wake on Postgres LISTEN/NOTIFY change notifications and only re-poll
+    # after this long without one (they keep their short poll when LISTEN is unavailable).
+    stream_change_bus_enabled: bool = True
+    stream_fallback_poll_seconds: float = Field(default=30.0, gt=0)
+    # Carry change notifications over Redis pub/sub on `rq_redis_url` instead of Postgres
+    # LISTEN/NOTIFY (for deployments where LISTEN is unavailable, e.g. PgBouncer).
+    stream_redis_backplane_enabled: bool = False
+    # Pending events (after coalescing task updates) buffered per SSE client by the shared
+    # board feeds before the client is disconnected.
+    stream_subscriber_queue_size: int = Field(default=256, ge=1)
+    # Hydrated task payloads cached per process for the task stream (0 disables the cache).
+    stream_task_cache_size: int = Field(default=4096, ge=0)
+
+    # Memberships and accessible board ids are memoized per request and cached per process
+    # for this long (0 keeps only the per-request memo). Other replicas see access changes
+    # once their entries expire.
+    org_access_cache_ttl_seconds: float = Field(default=5.0, ge=0)
+    org_access_cache_size: int = Field(default=4096, ge=0)
 
     # OpenClaw gateway runtime compatibility
     gateway_min_version: str = "2026.02.9"
@@ -15,12 +15,15 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app import models as _models
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.services import change_bus as _change_bus
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
 
 # Import model modules so SQLModel metadata is fully registered at startup.
 _MODEL_REGISTRY = _models
+# Registers the ORM flush hooks that publish stream change notifications.
+_CHANGE_HOOKS = _change_bus
 
 
 def _normalize_database_url(database_url: str) -> str:
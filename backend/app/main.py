@@ -15,6 +15,7 @@ from app.api.agent import router as agent_router
 from app.api.agents import router as agents_router
 from app.api.approvals import router as approvals_router
 from app.api.auth import router as auth_router
+from app.api.board_events import router as board_events_router
 from app.api.board_group_memory import router as board_group_memory_router
 from app.api.board_groups import router as board_groups_router
 from app.api.board_memory import router as board_memory_router
@@ -25,18 +26,25 @@ from app.api.gateway import router as gateway_router
 from app.api.gateways import router as gateways_router
 from app.api.metrics import router as metrics_router
 from app.api.organizations import router as organizations_router
+from app.api.queue_dead_letters import router as queue_dead_letters_router
 from app.api.skills_marketplace import router as skills_marketplace_router
 from app.api.souls_directory import router as souls_directory_router
 from app.api.tags import router as tags_router
 from app.api.task_custom_fields import router as task_custom_fields_router
 from app.api.tasks import router as tasks_router
 from app.api.users import router as users_router
+from app.core.agent_auth import check_legacy_token_scan
+from app.core.agent_tokens import shutdown_hash_executor
 from app.core.config import settings
 from app.core.error_handling import install_error_handling
 from app.core.logging import configure_logging, get_logger
 from app.core.security_headers import SecurityHeadersMiddleware
 from app.db.session import init_db
 from app.schemas.health import HealthStatusResponse
+from app.services.agent_presence import agent_presence_buffer
+from app.services.change_bus import change_bus
+from app.services.queue import close_async_redis_clients
+from app.services.webhooks.ingest_buffer import webhook_ingest_buffer
 
 if TYPE_CHECKING:
     from collections.abc import AsyncIterator
@@ -76,6 +84,10 @@ OPENAPI_TAGS = [
         "name": "organizations",
         "description": "Organization profile, membership, and governance management endpoints.",
     },
+    {
+        "name": "queue",
+        "description": "Background queue administration: dead-letter inspection and replay.",
+    },
     {
         "name": "souls-directory",
         "description": "Directory and lookup endpoints for agent soul templates and variants.",
@@ -100,6 +112,10 @@ OPENAPI_TAGS = [
         "name": "board-memory",
         "description": "Board-scoped memory read/write endpoints for persistent context.",
     },
+    {
+        "name": "board-events",
+        "description": "Multiplexed board event stream covering tasks, approvals, memory, and agents.",
+    },
     {
         "name": "board-webhooks",
         "description": "Board webhook registration, delivery config, and lifecycle endpoints.",
@@ -437,10 +453,22 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
         settings.db_auto_migrate,
     )
     await init_db()
+    await check_legacy_token_scan()
+    if settings.webhook_ingest_buffered:
+        webhook_ingest_buffer.start()
+    if settings.stream_change_bus_enabled:
+        change_bus.start()
+    if settings.agent_presence_flush_interval_seconds > 0:
+        agent_presence_buffer.start()
     logger.info("app.lifecycle.started")
     try:
         yield
     finally:
+        await change_bus.stop()
+        await agent_presence_buffer.stop()
+        await webhook_ingest_buffer.stop()
+        await close_async_redis_clients()
+        shutdown_hash_executor()
         logger.info("app.lifecycle.stopped")
 
 
@@ -538,12 +566,14 @@ api_v1.include_router(gateway_router)
 api_v1.include_router(gateways_router)
 api_v1.include_router(metrics_router)
 api_v1.include_router(organizations_router)
+api_v1.include_router(queue_dead_letters_router)
 api_v1.include_router(souls_directory_router)
 api_v1.include_router(skills_marketplace_router)
 api_v1.include_router(board_groups_router)
 api_v1.include_router(board_group_memory_router)
 api_v1.include_router(boards_router)
 api_v1.include_router(board_memory_router)
+api_v1.include_router(board_events_router)
 api_v1.include_router(board_webhooks_router)
 api_v1.include_router(board_onboarding_router)
 api_v1.include_router(approvals_router)
@@ -5,6 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import UUID, uuid4
 
+from sqlalchemy import BigInteger, Column, FetchedValue
 from sqlmodel import Field
 
 from app.core.time import utcnow
@@ -24,3 +25,8 @@ class ActivityEvent(QueryModel, table=True):
     agent_id: UUID | None = Field(default=None, foreign_key="agents.id", index=True)
     task_id: UUID | None = Field(default=None, foreign_key="tasks.id", index=True)
     created_at: datetime = Field(default_factory=utcnow)
+    # Monotonic per-table sequence assigned by Postgres on insert; used as the SSE event id.
+    seq: int | None = Field(
+        default=None,
+        sa_column=Column(BigInteger, server_default=FetchedValue(), index=True, unique=True),
+    )
@@ -27,6 +27,8 @@ class Agent(QueryModel, table=True):
     status: str = Field(default="provisioning", index=True)
     openclaw_session_id: str | None = Field(default=None, index=True)
     agent_token_hash: str | None = Field(default=None, index=True)
+    # SHA-256 of the token, used to find the agent before verifying ``agent_token_hash``.
+    agent_token_lookup: str | None = Field(default=None, index=True, unique=True)
     heartbeat_config: dict[str, Any] | None = Field(
         default=None,
         sa_column=Column(JSON),
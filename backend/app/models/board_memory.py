@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, BigInteger, Column, FetchedValue
 from sqlmodel import Field
 
 from app.core.time import utcnow
@@ -26,3 +26,8 @@ class BoardMemory(QueryModel, table=True):
     is_chat: bool = Field(default=False, index=True)
     source: str | None = None
     created_at: datetime = Field(default_factory=utcnow)
+    # Monotonic per-table sequence assigned by Postgres on insert; used as the SSE event id.
+    seq: int | None = Field(
+        default=None,
+        sa_column=Column(BigInteger, server_default=FetchedValue(), index=True, unique=True),
+    )
@@ -0,0 +1,42 @@
+"""Schemas for dead-letter queue inspection and replay endpoints."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import Field
+from sqlmodel import SQLModel
+
+RUNTIME_ANNOTATION_TYPES = (datetime, UUID)
+
+
+class DeadLetterRead(SQLModel):
+    """Dead-lettered envelope with its failure history."""
+
+    id: str
+    queue_name: str
+    task_type: str
+    attempts: int
+    created_at: datetime
+    dead_at: datetime
+    last_error: str | None = None
+    payload: dict[str, Any]
+    history: list[dict[str, Any]]
+
+
+class DeadLetterReplayRequest(SQLModel):
+    """Selection and pacing for a bulk dead-letter replay."""
+
+    task_type: str | None = None
+    board_id: UUID | None = None
+    ids: list[str] | None = None
+    limit: int | None = Field(default=None, ge=1)
+    rate_per_second: float = Field(default=1.0, gt=0, le=100)
+
+
+class DeadLetterReplayResponse(SQLModel):
+    """Number of dead letters scheduled back onto their queue."""
+
+    replayed: int
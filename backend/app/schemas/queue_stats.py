@@ -0,0 +1,55 @@
+"""Schemas for the queue observability endpoint."""
+
+from __future__ import annotations
+
+from sqlmodel import SQLModel
+
+
+class QueueLaneStats(SQLModel):
+    """Backlog of one queue lane: ready list plus scheduled set."""
+
+    lane: str
+    queue_name: str
+    ready_depth: int
+    scheduled_size: int
+    oldest_due_lag_seconds: float
+
+
+class QueueLatencyBucket(SQLModel):
+    """Cumulative handler-latency bucket (``le_ms`` is None for the overflow bucket)."""
+
+    le_ms: float | None
+    count: int
+
+
+class QueueHandlerLatency(SQLModel):
+    """Handler latency histogram for one task type."""
+
+    count: int
+    failed: int
+    sum_ms: float
+    p50_ms: float | None
+    p99_ms: float | None
+    buckets: list[QueueLatencyBucket]
+
+
+class QueueTaskTypeStats(SQLModel):
+    """Throughput, retry and latency figures for one task type."""
+
+    task_type: str
+    enqueued_total: int
+    dequeued_total: int
+    retried_total: int
+    dropped_total: int
+    enqueue_rate_per_second: float
+    dequeue_rate_per_second: float
+    latency: QueueHandlerLatency | None = None
+
+
+class QueueStats(SQLModel):
+    """Point-in-time queue snapshot used for worker sizing and backlog alerts."""
+
+    queue_name: str
+    rate_window_seconds: int
+    lanes: list[QueueLaneStats]
+    task_types: list[QueueTaskTypeStats]
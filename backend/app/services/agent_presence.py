@@ -0,0 +1,227 @@
+"""Write-behind buffer for agent presence (``Agent.last_seen_at``).
+
+Every authenticated agent request refreshes its agent's presence (at most once per touch
+interval, see ``app.core.agent_auth``). Read-only polls used to commit a transaction of
+their own just for that. With the buffer running the touch is only recorded in process
+memory, and one flusher task per API process writes everything recorded within
+``AGENT_PRESENCE_FLUSH_INTERVAL_SECONDS`` with a single ``UPDATE agents ... FROM
+(VALUES ...)``.
+
+Guarantees (see ``docs/production/README.md``):
+
+- Readers in the recording process see pending presence at once: ``with_computed_status``
+  and the dashboard's active-agent count merge it in. Other replicas and the queue worker
+  see it when the flush commits.
+- A flush never moves ``last_seen_at`` backwards (a heartbeat may have written a newer
+  value) and never overrides the ``updating``/``deleting`` statuses.
+- A crash loses at most one interval of presence; graceful shutdown flushes first. A flush
+  that fails keeps its touches for the next round.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import DateTime, Update, Uuid, case, column, or_, update, values
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.time import utcnow
+from app.db.session import async_session_maker
+from app.models.agents import Agent
+from app.services.change_bus import ENTITY_AGENT, ChangeNotification, publish_changes
+
+logger = get_logger(__name__)
+
+# Statuses owned by provisioning; presence never replaces them with "online".
+PINNED_STATUSES = frozenset({"updating", "deleting"})
+
+
+@dataclass(frozen=True)
+class PresenceTouch:
+    """Latest observed activity of one agent, not yet written to the database."""
+
+    agent_id: UUID
+    board_id: UUID | None
+    seen_at: datetime
+
+
+def _presence_update(agent_id: Any, seen_at: Any, *, now: datetime) -> Update:
+    return (
+        update(Agent)
+        .where(col(Agent.id) == agent_id)
+        # A heartbeat may have committed a newer value since the touch was recorded.
+        .where(or_(col(Agent.last_seen_at).is_(None), col(Agent.last_seen_at) < seen_at))
+        .values(
+            last_seen_at=seen_at,
+            updated_at=now,
+            status=case(
+                (col(Agent.status).in_(PINNED_STATUSES), col(Agent.status)),
+                else_="online",
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bulk_presence_update(batch: Collection[PresenceTouch], *, now: datetime) -> Update:
+    """Build one ``UPDATE agents ... FROM (VALUES ...)`` writing every touch in ``batch``."""
+    presence = values(
+        column("id", Uuid()),
+        column("last_seen_at", DateTime()),
+        name="presence",
+    ).data([(touch.agent_id, touch.seen_at) for touch in batch])
+    return _presence_update(presence.c.id, presence.c.last_seen_at, now=now)
+
+
+class AgentPresenceBuffer:
+    """Per-process map of pending presence, flushed to Postgres on a timer."""
+
+    def __init__(
+        self,
+        *,
+        flush_interval_seconds: float,
+        session_maker: async_sessionmaker[AsyncSession] | None = None,
+    ) -> None:
+        self._flush_interval = flush_interval_seconds
+        self._session_maker = session_maker or async_session_maker
+        self._pending: dict[UUID, PresenceTouch] = {}
+        # The batch being written; still visible to readers until it commits.
+        self._flushing: dict[UUID, PresenceTouch] = {}
+        self._flusher: asyncio.Task[None] | None = None
+        self._closing = False
+        self._stop = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None and not self._flusher.done() and not self._closing
+
+    def __len__(self) -> int:
+        return len(self._pending.keys() | self._flushing.keys())
+
+    def record(self, agent: Agent, seen_at: datetime) -> bool:
+        """Remember that ``agent`` was active at ``seen_at``; ``False`` when not running."""
+        if not self.running:
+            return False
+        current = self._pending.get(agent.id)
+        if current is None or current.seen_at < seen_at:
+            self._pending[agent.id] = PresenceTouch(agent.id, agent.board_id, seen_at)
+        return True
+
+    def last_seen(self, agent_id: UUID) -> datetime | None:
+        """Return the newest unflushed activity time of ``agent_id``, if any."""
+        touch = self._pending.get(agent_id) or self._flushing.get(agent_id)
+        return touch.seen_at if touch is not None else None
+
+    def seen_between(
+        self,
+        start: datetime,
+        end: datetime,
+        *,
+        board_ids: Collection[UUID],
+    ) -> set[UUID]:
+        """Return agents on ``board_ids`` with unflushed activity inside ``[start, end]``."""
+        touches = {**self._flushing, **self._pending}.values()
+        return {
+            touch.agent_id
+            for touch in touches
+            if touch.board_id in board_ids and start <= touch.seen_at <= end
+        }
+
+    def apply(self, agent: Agent) -> Agent:
+        """Return ``agent`` with unflushed presence merged in, for reading only.
+
+        The merge goes into a detached copy, so a session tracking ``agent`` never writes
+        buffered presence through the ORM; only :meth:`flush` persists it.
+        """
+        seen_at = self.last_seen(agent.id)
+        if seen_at is None or (agent.last_seen_at is not None and agent.last_seen_at >= seen_at):
+            return agent
+        status = agent.status if agent.status in PINNED_STATUSES else "online"
+        return Agent.model_validate(
+            {**agent.model_dump(), "last_seen_at": seen_at, "status": status},
+        )
+
+    def start(self) -> None:
+        """Start the flusher task on the running event loop."""
+        if self.running:
+            return
+        self._closing = False
+        self._stop = asyncio.Event()
+        self._flusher = asyncio.create_task(self._run())
+        logger.info(
+            "agent.presence.buffer_started",
+            extra={"flush_interval_seconds": self._flush_interval},
+        )
+
+    async def stop(self) -> None:
+        """Stop recording, write everything still pending and stop the flusher."""
+        flusher = self._flusher
+        if flusher is None:
+            return
+        self._closing = True
+        self._stop.set()
+        await flusher
+        self._flusher = None
+        logger.info("agent.presence.buffer_stopped")
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._stop.wait(), self._flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write all pending presence in one statement; return the number of agents sent."""
+        if not self._pending:
+            return 0
+        self._flushing, self._pending = self._pending, {}
+        batch = list(self._flushing.values())
+        try:
+            await self._write(batch)
+        except Exception as exc:
+            logger.warning(
+                "agent.presence.flush_failed",
+                extra={"count": len(batch), "error": str(exc)},
+            )
+            for touch in batch:
+                self._pending.setdefault(touch.agent_id, touch)
+            return 0
+        finally:
+            self._flushing = {}
+        logger.debug("agent.presence.flushed", extra={"count": len(batch)})
+        return len(batch)
+
+    async def _write(self, batch: list[PresenceTouch]) -> None:
+        now = utcnow()
+        async with self._session_maker() as session:
+            if session.get_bind().dialect.name == "postgresql":
+                await session.exec(bulk_presence_update(batch, now=now))
+            else:
+                # Tests run on SQLite, which has no ``FROM (VALUES ...) AS v (cols)``.
+                for touch in batch:
+                    await session.exec(
+                        _presence_update(touch.agent_id, touch.seen_at, now=now),
+                    )
+            # Core updates bypass the ORM flush hooks, so announce the agent rows here.
+            notifications = {
+                ChangeNotification(touch.board_id, ENTITY_AGENT, touch.agent_id)
+                for touch in batch
+                if touch.board_id is not None
+            }
+            await session.run_sync(publish_changes, notifications)
+            await session.commit()
+
+
+agent_presence_buffer = AgentPresenceBuffer(
+    flush_interval_seconds=settings.agent_presence_flush_interval_seconds,
+)
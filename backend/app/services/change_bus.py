@@ -0,0 +1,557 @@
+"""Change-notification bus that wakes SSE streams only when their board changed.
+
+Every ORM flush that inserts, updates or deletes a streamed row (tasks, activity events,
+approvals, board memory, board group memory, agents) records a ``(board_id, entity, id)``
+:class:`ChangeNotification`. On Postgres the notifications are sent with ``pg_notify`` in the
+same transaction, so listeners only see committed changes. The ``pg_notify`` runs in a
+savepoint: if it fails, only the notification is rolled back, and it is sent again after the
+commit on a connection of its own. Each API process keeps one ``LISTEN`` connection
+(:data:`change_bus`) and wakes the stream subscriptions that match.
+
+With ``STREAM_REDIS_BACKPLANE_ENABLED`` the notifications travel over Redis pub/sub on
+``rq_redis_url`` instead: they are published right after the commit and every replica
+subscribes to the channel. Use it where ``LISTEN`` is unavailable, e.g. behind a
+transaction-pooling PgBouncer.
+
+Stream generators subscribe once and wait on their subscription instead of sleeping. They
+still re-poll after a timeout: ``stream_fallback_poll_seconds`` while the listener is
+connected, and their historical short interval while it is not (SQLite, listener down).
+Without ``LISTEN``, commits in the same process still wake local subscribers directly.
+
+Besides stream subscriptions, in-process caches can register a :class:`ChangeListener` to
+receive every notification, plus a signal when notifications may have been missed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Awaitable, Callable, Collection, Iterable
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any, Protocol
+from uuid import UUID
+
+import psycopg
+import redis
+from sqlalchemy import Connection, event, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlmodel import col
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.activity_events import ActivityEvent
+from app.models.agents import Agent
+from app.models.approvals import Approval
+from app.models.board_group_memory import BoardGroupMemory
+from app.models.board_memory import BoardMemory
+from app.models.boards import Board
+from app.models.tag_assignments import TagAssignment
+from app.models.tags import Tag
+from app.models.task_custom_fields import (
+    BoardTaskCustomField,
+    TaskCustomFieldDefinition,
+    TaskCustomFieldValue,
+)
+from app.models.task_dependencies import TaskDependency
+from app.models.tasks import Task
+from app.services.queue import _async_redis_client, _redis_client
+
+logger = get_logger(__name__)
+
+CHANGE_CHANNEL = "mc_changes"
+ENTITY_TASK = "task"
+ENTITY_ACTIVITY = "activity"
+ENTITY_APPROVAL = "approval"
+ENTITY_BOARD_MEMORY = "board_memory"
+ENTITY_BOARD_GROUP_MEMORY = "board_group_memory"
+ENTITY_AGENT = "agent"
+# Something a task's stream payload is built from (tags, dependencies, custom fields)
+# changed; ``id`` is the task, or ``None`` for every task of the board.
+ENTITY_TASK_STATE = "task_state"
+
+_PENDING_INFO_KEY = "change_notifications"
+# Notifications whose in-transaction ``pg_notify`` failed; resent after the commit.
+_UNSENT_INFO_KEY = "change_notifications_unsent"
+_NOTIFY_SQL = (
+    "SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"
+)
+_NOTIFY_PSYCOPG_SQL = "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload"
+_LISTEN_RETRY_MAX_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class ChangeNotification:
+    """One committed change to a streamed entity.
+
+    ``board_id`` is the board the row belongs to, or the board group for
+    ``board_group_memory`` rows.
+    """
+
+    board_id: UUID
+    entity: str
+    id: UUID | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "board_id": str(self.board_id),
+                "entity": self.entity,
+                "id": str(self.id) if self.id is not None else None,
+            },
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> ChangeNotification:
+        data: dict[str, Any] = json.loads(raw)
+        raw_id = data.get("id")
+        return cls(
+            board_id=UUID(str(data["board_id"])),
+            entity=str(data["entity"]),
+            id=UUID(str(raw_id)) if raw_id else None,
+        )
+
+
+class ChangeSubscription:
+    """Wake-up flag for one stream, set by changes to its boards and entities.
+
+    Call :meth:`clear` before each fetch and :meth:`wait` after it; a change committed
+    while the fetch runs then makes the next wait return immediately.
+    """
+
+    def __init__(
+        self,
+        bus: ChangeBus,
+        *,
+        board_ids: Collection[UUID] | None,
+        entities: Collection[str],
+    ) -> None:
+        self._bus = bus
+        self.board_ids = frozenset(board_ids) if board_ids is not None else None
+        self.entities = frozenset(entities)
+        self._changed = asyncio.Event()
+
+    def matches(self, notification: ChangeNotification) -> bool:
+        if notification.entity not in self.entities:
+            return False
+        return self.board_ids is None or notification.board_id in self.board_ids
+
+    def notify(self) -> None:
+        self._changed.set()
+
+    def clear(self) -> None:
+        self._changed.clear()
+
+    async def wait(self, poll_seconds: float) -> bool:
+        """Wait for a matching change or the fallback poll; ``True`` when woken by a change."""
+        timeout = self._bus.fallback_poll_seconds(poll_seconds)
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+    def __enter__(self) -> ChangeSubscription:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class ChangeListener(Protocol):
+    """Receives every dispatched notification, e.g. to invalidate a cache."""
+
+    def changes_received(self, notifications: Iterable[ChangeNotification]) -> None: ...
+
+    def changes_missed(self) -> None:
+        """Notifications may have been lost (listener reconnected); drop derived state."""
+
+
+class ChangeBus:
+    """Per-process registry of stream subscriptions fed by Postgres ``LISTEN``."""
+
+    def __init__(self) -> None:
+        self._by_board: dict[UUID, set[ChangeSubscription]] = {}
+        self._all_boards: set[ChangeSubscription] = set()
+        self._listeners: list[ChangeListener] = []
+        self._listener: asyncio.Task[None] | None = None
+        self._listening = False
+        self._retry_seconds = 1.0
+        self._publishes: set[asyncio.Task[None]] = set()
+
+    @property
+    def listening(self) -> bool:
+        return self._listening
+
+    @property
+    def delivers_all_changes(self) -> bool:
+        """``True`` when every committed change reaches :meth:`dispatch` in this process.
+
+        That holds while the listener is connected, and without a listener when only this
+        process writes (commits then dispatch locally).
+        """
+        if not settings.stream_change_bus_enabled:
+            return False
+        return self._listener is None or self._listening
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        self._listeners.append(listener)
+
+    def fallback_poll_seconds(self, poll_seconds: float) -> float:
+        """Return how long a stream may wait before re-polling without a notification."""
+        if self._listening:
+            return max(poll_seconds, settings.stream_fallback_poll_seconds)
+        return poll_seconds
+
+    def subscribe(
+        self,
+        *,
+        board_ids: Collection[UUID] | None,
+        entities: Collection[str],
+    ) -> ChangeSubscription:
+        """Watch ``entities`` on ``board_ids`` (``None`` watches every board)."""
+        subscription = ChangeSubscription(self, board_ids=board_ids, entities=entities)
+        if subscription.board_ids is None:
+            self._all_boards.add(subscription)
+        else:
+            for board_id in subscription.board_ids:
+                self._by_board.setdefault(board_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ChangeSubscription) -> None:
+        self._all_boards.discard(subscription)
+        for board_id in subscription.board_ids or ():
+            subscribers = self._by_board.get(board_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._by_board[board_id]
+
+    def dispatch(self, notifications: Iterable[ChangeNotification]) -> None:
+        """Wake every subscription interested in any of ``notifications``."""
+        notifications = tuple(notifications)
+        for listener in self._listeners:
+            listener.changes_received(notifications)
+        for notification in notifications:
+            for subscription in (
+                *self._by_board.get(notification.board_id, ()),
+                *self._all_boards,
+            ):
+                if subscription.matches(notification):
+                    subscription.notify()
+
+    def _wake_all(self) -> None:
+        for subscription in (
+            *self._all_boards,
+            *(sub for subs in self._by_board.values() for sub in subs),
+        ):
+            subscription.notify()
+
+    def start(self) -> None:
+        """Start the Redis subscriber, or the ``LISTEN`` task when the database is Postgres."""
+        if self._listener is not None:
+            return
+        if settings.stream_redis_backplane_enabled:
+            self._listener = asyncio.create_task(self._listen(self._listen_redis))
+        elif settings.database_url.startswith("postgresql"):
+            self._listener = asyncio.create_task(self._listen(self._listen_postgres))
+
+    async def stop(self) -> None:
+        listener = self._listener
+        if listener is None:
+            return
+        self._listener = None
+        listener.cancel()
+        try:
+            await listener
+        except asyncio.CancelledError:
+            pass
+
+    def _connected(self, transport: str) -> None:
+        self._listening = True
+        self._retry_seconds = 1.0
+        logger.info(
+            "stream.change_bus.listening",
+            extra={"channel": CHANGE_CHANNEL, "transport": transport},
+        )
+        # Anything committed while we were not listening is picked up by a re-poll.
+        for listener in self._listeners:
+            listener.changes_missed()
+        self._wake_all()
+
+    def _receive(self, payload: str) -> None:
+        try:
+            self.dispatch([ChangeNotification.from_json(payload)])
+        except (ValueError, KeyError) as exc:
+            logger.warning(
+                "stream.change_bus.bad_payload",
+                extra={"payload": payload[:200], "error": str(exc)},
+            )
+
+    async def _listen_postgres(self) -> None:
+        async with await psycopg.AsyncConnection.connect(_conninfo(), autocommit=True) as conn:
+            await conn.execute(f"LISTEN {CHANGE_CHANNEL}")
+            self._connected("postgres")
+            async for notify in conn.notifies():
+                self._receive(notify.payload)
+
+    async def _listen_redis(self) -> None:
+        async with _async_redis_client().pubsub(ignore_subscribe_messages=True) as pubsub:
+            await pubsub.subscribe(CHANGE_CHANNEL)
+            self._connected("redis")
+            async for message in pubsub.listen():
+                data = message.get("data")
+                self._receive(data.decode() if isinstance(data, bytes) else str(data))
+
+    async def _listen(self, session: Callable[[], Awaitable[None]]) -> None:
+        self._retry_seconds = 1.0
+        while True:
+            try:
+                await session()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(
+                    "stream.change_bus.listen_failed",
+                    extra={"error": str(exc), "retry_seconds": self._retry_seconds},
+                )
+            finally:
+                self._listening = False
+            self._wake_all()
+            await asyncio.sleep(self._retry_seconds)
+            self._retry_seconds = min(self._retry_seconds * 2, _LISTEN_RETRY_MAX_SECONDS)
+
+    def publish(self, notifications: Collection[ChangeNotification]) -> None:
+        """Publish committed ``notifications`` to every replica over Redis pub/sub."""
+        payloads = sorted(notification.to_json() for notification in notifications)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            _publish_sync(payloads)
+            return
+        task = asyncio.create_task(_publish_async(payloads))
+        self._publishes.add(task)
+        task.add_done_callback(self._publishes.discard)
+
+    def notify(self, notifications: Collection[ChangeNotification]) -> None:
+        """Send committed ``notifications`` with ``pg_notify`` on a connection of their own."""
+        payloads = sorted(notification.to_json() for notification in notifications)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            _notify_sync(payloads)
+            return
+        task = asyncio.create_task(_notify_async(payloads))
+        self._publishes.add(task)
+        task.add_done_callback(self._publishes.discard)
+
+
+def _conninfo() -> str:
+    return settings.database_url.replace("postgresql+psycopg://", "postgresql://", 1)
+
+
+async def _notify_async(payloads: list[str]) -> None:
+    try:
+        async with await psycopg.AsyncConnection.connect(_conninfo(), autocommit=True) as conn:
+            await conn.execute(_NOTIFY_PSYCOPG_SQL, (CHANGE_CHANNEL, payloads))
+    except psycopg.Error as exc:
+        # Streams still catch up on their fallback poll.
+        logger.warning("stream.change_bus.notify_failed", extra={"error": str(exc)})
+
+
+def _notify_sync(payloads: list[str]) -> None:
+    try:
+        with psycopg.connect(_conninfo(), autocommit=True) as conn:
+            conn.execute(_NOTIFY_PSYCOPG_SQL, (CHANGE_CHANNEL, payloads))
+    except psycopg.Error as exc:
+        logger.warning("stream.change_bus.notify_failed", extra={"error": str(exc)})
+
+
+async def _publish_async(payloads: list[str]) -> None:
+    try:
+        async with _async_redis_client().pipeline(transaction=False) as pipe:
+            for payload in payloads:
+                pipe.publish(CHANGE_CHANNEL, payload)
+            await pipe.execute()
+    except redis.RedisError as exc:
+        # Streams still catch up on their fallback poll.
+        logger.warning("stream.change_bus.publish_failed", extra={"error": str(exc)})
+
+
+def _publish_sync(payloads: list[str]) -> None:
+    try:
+        with _redis_client().pipeline(transaction=False) as pipe:
+            for payload in payloads:
+                pipe.publish(CHANGE_CHANNEL, payload)
+            pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("stream.change_bus.publish_failed", extra={"error": str(exc)})
+
+
+change_bus = ChangeBus()
+
+
+def _task_board_ids(session: Session, task_ids: set[UUID]) -> dict[UUID, UUID]:
+    boards: dict[UUID, UUID] = {}
+    missing: set[UUID] = set()
+    for task_id in task_ids:
+        task = session.identity_map.get(session.identity_key(Task, task_id))
+        if isinstance(task, Task) and task.board_id is not None:
+            boards[task_id] = task.board_id
+        else:
+            missing.add(task_id)
+    if missing:
+        rows = session.connection().execute(
+            select(col(Task.id), col(Task.board_id)).where(col(Task.id).in_(missing)),
+        )
+        boards.update({task_id: board_id for task_id, board_id in rows if board_id is not None})
+    return boards
+
+
+def _organization_board_ids(session: Session, organization_ids: set[UUID]) -> list[UUID]:
+    rows = session.connection().execute(
+        select(col(Board.id)).where(col(Board.organization_id).in_(organization_ids)),
+    )
+    return [board_id for (board_id,) in rows]
+
+
+def _changed_rows(session: Session) -> Iterable[Any]:
+    yield from session.new
+    yield from (row for row in session.dirty if session.is_modified(row))
+    yield from session.deleted
+
+
+def collect_changes(session: Session) -> set[ChangeNotification]:
+    """Return notifications for the streamed rows touched by the current flush."""
+    notifications: set[ChangeNotification] = set()
+    activity_task_ids: set[UUID] = set()
+    state_task_ids: set[UUID] = set()
+    state_organization_ids: set[UUID] = set()
+    for row in _changed_rows(session):
+        if isinstance(row, (TagAssignment, TaskCustomFieldValue)):
+            state_task_ids.add(row.task_id)
+        elif isinstance(row, TaskDependency):
+            notifications.add(ChangeNotification(row.board_id, ENTITY_TASK_STATE, row.task_id))
+        elif isinstance(row, BoardTaskCustomField):
+            notifications.add(ChangeNotification(row.board_id, ENTITY_TASK_STATE))
+        elif isinstance(row, (Tag, TaskCustomFieldDefinition)):
+            # New tags and definitions are not in any payload yet.
+            if row not in session.new:
+                state_organization_ids.add(row.organization_id)
+        elif isinstance(row, ActivityEvent):
+            if row.task_id is not None:
+                activity_task_ids.add(row.task_id)
+        elif isinstance(row, Task):
+            if row.board_id is not None:
+                notifications.add(ChangeNotification(row.board_id, ENTITY_TASK, row.id))
+        elif isinstance(row, Approval):
+            notifications.add(ChangeNotification(row.board_id, ENTITY_APPROVAL, row.id))
+        elif isinstance(row, BoardMemory):
+            notifications.add(ChangeNotification(row.board_id, ENTITY_BOARD_MEMORY, row.id))
+        elif isinstance(row, BoardGroupMemory):
+            notifications.add(
+                ChangeNotification(row.board_group_id, ENTITY_BOARD_GROUP_MEMORY, row.id),
+            )
+        elif isinstance(row, Agent) and row.board_id is not None:
+            notifications.add(ChangeNotification(row.board_id, ENTITY_AGENT, row.id))
+    if activity_task_ids:
+        for task_id, board_id in _task_board_ids(session, activity_task_ids).items():
+            notifications.add(ChangeNotification(board_id, ENTITY_ACTIVITY, task_id))
+    if state_task_ids:
+        for task_id, board_id in _task_board_ids(session, state_task_ids).items():
+            notifications.add(ChangeNotification(board_id, ENTITY_TASK_STATE, task_id))
+    if state_organization_ids:
+        for board_id in _organization_board_ids(session, state_organization_ids):
+            notifications.add(ChangeNotification(board_id, ENTITY_TASK_STATE))
+    return notifications
+
+
+def publish_changes(session: Session, notifications: Collection[ChangeNotification]) -> None:
+    """Send ``notifications`` with the current transaction (Postgres) and remember them."""
+    if not notifications:
+        return
+    session.info.setdefault(_PENDING_INFO_KEY, set()).update(notifications)
+    if not _notifies_in_transaction(session):
+        return
+    if not notify_in_savepoint(session.connection(), notifications):
+        session.info.setdefault(_UNSENT_INFO_KEY, set()).update(notifications)
+
+
+def _notifies_in_transaction(session: Session) -> bool:
+    if settings.stream_redis_backplane_enabled:
+        return False
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def notify_in_savepoint(
+    connection: Connection,
+    notifications: Collection[ChangeNotification],
+) -> bool:
+    """Send ``notifications`` with ``pg_notify`` inside a savepoint; ``False`` if that failed.
+
+    A failed statement aborts the whole Postgres transaction. The savepoint confines a
+    failure (e.g. a full notification queue) to the notification, so the caller's writes
+    still commit.
+    """
+    try:
+        with connection.begin_nested():
+            connection.execute(
+                text(_NOTIFY_SQL),
+                {
+                    "channel": CHANGE_CHANNEL,
+                    "payloads": sorted(notification.to_json() for notification in notifications),
+                },
+            )
+    except SQLAlchemyError as exc:
+        logger.warning(
+            "stream.change_bus.publish_failed",
+            extra={"count": len(notifications), "error": str(exc)},
+        )
+        return False
+    return True
+
+
+def _after_flush(session: Session, _flush_context: object) -> None:
+    if not settings.stream_change_bus_enabled:
+        return
+    try:
+        notifications = collect_changes(session)
+    except Exception as exc:
+        # Nothing is sent for this flush; streams catch up on their fallback poll.
+        logger.warning("stream.change_bus.publish_failed", extra={"error": str(exc)})
+        return
+    publish_changes(session, notifications)
+
+
+def _after_commit(session: Session) -> None:
+    pending: set[ChangeNotification] = session.info.pop(_PENDING_INFO_KEY, set())
+    unsent: set[ChangeNotification] = session.info.pop(_UNSENT_INFO_KEY, set())
+    if not pending:
+        return
+    if settings.stream_redis_backplane_enabled:
+        change_bus.publish(pending)
+    if unsent:
+        change_bus.notify(unsent)
+    if not change_bus.listening:
+        # No listener (e.g. SQLite, or still connecting): still wake this process's streams.
+        change_bus.dispatch(pending)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INFO_KEY, None)
+    session.info.pop(_UNSENT_INFO_KEY, None)
+
+
+event.listen(Session, "after_flush", _after_flush)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
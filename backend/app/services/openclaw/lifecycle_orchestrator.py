@@ -26,7 +26,7 @@ from app.services.openclaw.db_service import OpenClawDBService
 from app.services.openclaw.gateway_rpc import OpenClawGatewayError
 from app.services.openclaw.lifecycle_queue import (
     QueuedAgentLifecycleReconcile,
-    enqueue_lifecycle_reconcile,
+    enqueue_lifecycle_reconcile_async,
 )
 from app.services.openclaw.provisioning import OpenClawGatewayProvisioner
 from app.services.organizations import get_org_owner_user
@@ -85,7 +85,7 @@ class AgentLifecycleOrchestrator(OpenClawDBService):
                     ),
                 )
 
-        raw_token = auth_token or mint_agent_token(locked)
+        raw_token = auth_token or await mint_agent_token(locked)
         mark_provision_requested(
             locked,
             action=action,
@@ -155,7 +155,7 @@ class AgentLifecycleOrchestrator(OpenClawDBService):
         await self.session.commit()
         await self.session.refresh(locked)
         if wake and locked.checkin_deadline_at is not None:
-            enqueue_lifecycle_reconcile(
+            await enqueue_lifecycle_reconcile_async(
                 QueuedAgentLifecycleReconcile(
                     agent_id=locked.id,
                     gateway_id=locked.gateway_id,
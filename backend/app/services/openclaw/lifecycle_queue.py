@@ -10,11 +10,35 @@ from uuid import UUID
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.time import utcnow
-from app.services.queue import QueuedTask, enqueue_task_with_delay
+from app.services.queue import (
+    QUEUE_LANE_HIGH,
+    QueuedTask,
+    enqueue_keyed_task_with_delay,
+    enqueue_keyed_task_with_delay_async,
+    lane_queue_name,
+)
 from app.services.queue import requeue_if_failed as generic_requeue_if_failed
 
 logger = get_logger(__name__)
 TASK_TYPE = "agent_lifecycle_reconcile"
+# Wake checks are time-critical, so they never wait behind webhook delivery backlogs.
+QUEUE_LANE = QUEUE_LANE_HIGH
+
+
+def lifecycle_queue_name() -> str:
+    """Return the lane queue that carries lifecycle reconcile tasks."""
+    return lane_queue_name(settings.rq_queue_name, QUEUE_LANE)
+
+
+def lifecycle_dedup_key(agent_id: UUID) -> str:
+    """Return the scheduling key that coalesces reconcile checks for one agent.
+
+    Only one check per agent is ever pending; its generation is the dedup version, so a
+    newer wake replaces the pending check and a stale generation is dropped on enqueue.
+    Once the check is promoted its version is forgotten; a stale check enqueued later runs
+    and is skipped by the reconcile's generation check.
+    """
+    return f"{TASK_TYPE}:{agent_id}"
 
 
 @dataclass(frozen=True)
@@ -63,14 +87,51 @@ def decode_lifecycle_task(task: QueuedTask) -> QueuedAgentLifecycleReconcile:
     )
 
 
+def lifecycle_dedup(task: QueuedTask) -> tuple[str, int] | None:
+    """Return the scheduling key and version a queued check was scheduled under."""
+    try:
+        payload = decode_lifecycle_task(task)
+    except (KeyError, ValueError):
+        return None
+    return lifecycle_dedup_key(payload.agent_id), payload.generation
+
+
 def enqueue_lifecycle_reconcile(payload: QueuedAgentLifecycleReconcile) -> bool:
     """Enqueue a delayed reconcile check keyed to the expected check-in deadline."""
     now = utcnow()
     delay_seconds = max(0.0, (payload.checkin_deadline_at - now).total_seconds())
     queued = _task_from_payload(payload)
-    ok = enqueue_task_with_delay(
+    ok = enqueue_keyed_task_with_delay(
+        queued,
+        lifecycle_queue_name(),
+        dedup_key=lifecycle_dedup_key(payload.agent_id),
+        version=payload.generation,
+        delay_seconds=delay_seconds,
+        redis_url=settings.rq_redis_url,
+    )
+    if ok:
+        logger.info(
+            "lifecycle.queue.enqueued",
+            extra={
+                "agent_id": str(payload.agent_id),
+                "generation": payload.generation,
+                "delay_seconds": delay_seconds,
+                "attempt": payload.attempts,
+            },
+        )
+    return ok
+
+
+async def enqueue_lifecycle_reconcile_async(payload: QueuedAgentLifecycleReconcile) -> bool:
+    """Async variant of :func:`enqueue_lifecycle_reconcile` for event-loop callers."""
+    now = utcnow()
+    delay_seconds = max(0.0, (payload.checkin_deadline_at - now).total_seconds())
+    queued = _task_from_payload(payload)
+    ok = await enqueue_keyed_task_with_delay_async(
         queued,
-        settings.rq_queue_name,
+        lifecycle_queue_name(),
+        dedup_key=lifecycle_dedup_key(payload.agent_id),
+        version=payload.generation,
         delay_seconds=delay_seconds,
         redis_url=settings.rq_redis_url,
     )
@@ -103,11 +164,14 @@ def defer_lifecycle_reconcile(
         attempts=task.attempts,
     )
     queued = _task_from_payload(deferred)
-    return enqueue_task_with_delay(
+    return enqueue_keyed_task_with_delay(
         queued,
-        settings.rq_queue_name,
+        lifecycle_queue_name(),
+        dedup_key=lifecycle_dedup_key(payload.agent_id),
+        version=payload.generation,
         delay_seconds=max(0.0, delay_seconds),
         redis_url=settings.rq_redis_url,
+        count_enqueued=False,
     )
 
 
@@ -115,7 +179,7 @@ def requeue_lifecycle_queue_task(task: QueuedTask, *, delay_seconds: float = 0)
     """Requeue a failed lifecycle task with capped retries."""
     return generic_requeue_if_failed(
         task,
-        settings.rq_queue_name,
+        lifecycle_queue_name(),
         max_retries=settings.rq_dispatch_max_retries,
         redis_url=settings.rq_redis_url,
         delay_seconds=max(0.0, delay_seconds),
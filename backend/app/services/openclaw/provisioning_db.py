@@ -8,20 +8,19 @@ Layering:
 
 from __future__ import annotations
 
-import asyncio
 import json
 import re
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any, Literal, Protocol, TypeVar
-from uuid import UUID, uuid4
+from uuid import UUID, uuid4, uuid5
 
 from fastapi import HTTPException, Request, status
 from sqlalchemy import asc, func, or_
 from sqlmodel import col, select
 from sse_starlette.sse import EventSourceResponse
 
-from app.core.agent_tokens import verify_agent_token
+from app.core.agent_tokens import verified_agent_tokens, verify_agent_token_async
 from app.core.logging import TRACE_LEVEL
 from app.core.time import utcnow
 from app.db import crud
@@ -46,6 +45,8 @@ from app.schemas.agents import (
 from app.schemas.common import OkResponse
 from app.schemas.gateways import GatewayTemplatesSyncError, GatewayTemplatesSyncResult
 from app.services.activity_log import record_activity
+from app.services.agent_presence import agent_presence_buffer
+from app.services.change_bus import ENTITY_AGENT
 from app.services.openclaw.constants import (
     _TOOLS_KV_RE,
     DEFAULT_HEARTBEAT_CONFIG,
@@ -88,9 +89,10 @@ from app.services.organizations import (
     list_accessible_board_ids,
     require_board_access,
 )
+from app.services.stream_hub import StreamCursor, StreamEvent, StreamFetch, stream_hub
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator, Sequence
+    from collections.abc import AsyncGenerator, Sequence
 
     from fastapi_pagination.limit_offset import LimitOffsetPage
     from sqlalchemy.sql.elements import ColumnElement
@@ -101,6 +103,7 @@ if TYPE_CHECKING:
 
 
 _T = TypeVar("_T")
+STREAM_POLL_SECONDS = 2
 
 
 @dataclass(frozen=True)
@@ -210,7 +213,7 @@ class OpenClawProvisioningService(OpenClawDBService):
             identity_profile=merged_identity_profile,
             openclaw_session_id=self.lead_session_key(board),
         )
-        raw_token = mint_agent_token(agent)
+        raw_token = await mint_agent_token(agent)
         await self.add_commit_refresh(agent)
 
         # Strict behavior: provisioning errors surface to the caller. The DB row exists
@@ -456,7 +459,7 @@ def _append_sync_error(
 
 
 async def _rotate_agent_token(session: AsyncSession, agent: Agent) -> str:
-    token = mint_agent_token(agent)
+    token = await mint_agent_token(agent)
     agent.updated_at = utcnow()
     session.add(agent)
     await session.commit()
@@ -541,7 +544,7 @@ async def _resolve_agent_auth_token(
             return None, False
         auth_token = await _rotate_agent_token(ctx.session, agent)
 
-    if agent.agent_token_hash and not verify_agent_token(
+    if agent.agent_token_hash and not await verify_agent_token_async(
         auth_token,
         agent.agent_token_hash,
     ):
@@ -867,6 +870,7 @@ class AgentLifecycleService(OpenClawDBService):
     @classmethod
     def with_computed_status(cls, agent: Agent) -> Agent:
         now = utcnow()
+        agent = agent_presence_buffer.apply(agent)
         if agent.status in {"deleting", "updating"}:
             return agent
         if agent.last_seen_at is None:
@@ -1064,7 +1068,7 @@ class AgentLifecycleService(OpenClawDBService):
         data: dict[str, Any],
     ) -> tuple[Agent, str]:
         agent = Agent.model_validate(data)
-        raw_token = mint_agent_token(agent)
+        raw_token = await mint_agent_token(agent)
         agent.openclaw_session_id = self.resolve_session_key(agent)
         await self.add_commit_refresh(agent)
         return agent, raw_token
@@ -1310,8 +1314,8 @@ class AgentLifecycleService(OpenClawDBService):
         )
 
     @staticmethod
-    def mark_agent_update_pending(agent: Agent) -> str:
-        raw_token = mint_agent_token(agent)
+    async def mark_agent_update_pending(agent: Agent) -> str:
+        raw_token = await mint_agent_token(agent)
         return raw_token
 
     async def provision_updated_agent(
@@ -1385,7 +1389,7 @@ class AgentLifecycleService(OpenClawDBService):
         if agent.agent_token_hash is not None:
             return
 
-        raw_token = mint_agent_token(agent)
+        raw_token = await mint_agent_token(agent)
         await self.add_commit_refresh(agent)
         board = await self.require_board(
             str(agent.board_id) if agent.board_id else None,
@@ -1503,38 +1507,80 @@ class AgentLifecycleService(OpenClawDBService):
         ctx: OrganizationContext,
     ) -> EventSourceResponse:
         since_dt = self.parse_since(since) or utcnow()
-        last_seen = since_dt
         board_ids = await list_accessible_board_ids(self.session, member=ctx.member, write=False)
         allowed_ids = set(board_ids)
         if board_id is not None:
             OpenClawAuthorizationPolicy.require_board_write_access(allowed=board_id in allowed_ids)
+        return EventSourceResponse(
+            self.agent_events(
+                request=request,
+                board_id=board_id,
+                since_dt=since_dt,
+                allowed_ids=allowed_ids,
+            ),
+            ping=15,
+        )
+
+    @classmethod
+    def agent_stream_event(cls, agent: Agent) -> StreamEvent:
+        """Serialize one version of an agent row for the shared stream feed."""
+        changed_at = max(agent.updated_at, agent.last_seen_at or agent.updated_at)
+        return StreamEvent(
+            # One id per row version, so the feed's settle-window re-reads are recognised.
+            id=uuid5(agent.id, f"{agent.updated_at.isoformat()}|{changed_at.isoformat()}"),
+            seq=None,
+            created_at=changed_at,
+            event="agent",
+            data=json.dumps({"agent": cls.serialize_agent(agent)}),
+            coalesce_key=("agent", agent.id),
+        )
+
+    def _agent_stream_fetch(
+        self,
+        board_id: UUID | None,
+        allowed_ids: frozenset[UUID],
+    ) -> StreamFetch:
+        async def fetch(cursor: StreamCursor) -> list[StreamEvent]:
+            # Agent rows carry no sequence number, so the feed always cursors on time.
+            since = cursor.since or utcnow()
+            async with async_session_maker() as stream_session:
+                stream_service = AgentLifecycleService(stream_session)
+                stream_service.logger = self.logger
+                if board_id is not None:
+                    agents = await stream_service.fetch_agent_events(board_id, since)
+                elif allowed_ids:
+                    agents = await stream_service.fetch_agent_events(None, since)
+                    agents = [agent for agent in agents if agent.board_id in allowed_ids]
+                else:
+                    agents = []
+                return [self.agent_stream_event(agent) for agent in agents]
+
+        return fetch
+
+    def agent_events(
+        self,
+        *,
+        request: Request,
+        board_id: UUID | None,
+        since_dt: datetime,
+        allowed_ids: set[UUID],
+    ) -> AsyncGenerator[dict[str, str], None]:
+        """Return the shared agent event stream for one already-authorized client.
 
-        async def event_generator() -> AsyncIterator[dict[str, str]]:
-            nonlocal last_seen
-            while True:
-                if await request.is_disconnected():
-                    break
-                async with async_session_maker() as stream_session:
-                    stream_service = AgentLifecycleService(stream_session)
-                    stream_service.logger = self.logger
-                    if board_id is not None:
-                        agents = await stream_service.fetch_agent_events(
-                            board_id,
-                            last_seen,
-                        )
-                    elif allowed_ids:
-                        agents = await stream_service.fetch_agent_events(None, last_seen)
-                        agents = [agent for agent in agents if agent.board_id in allowed_ids]
-                    else:
-                        agents = []
-                for agent in agents:
-                    updated_at = agent.updated_at or agent.last_seen_at or utcnow()
-                    last_seen = max(updated_at, last_seen)
-                    payload = {"agent": self.serialize_agent(agent)}
-                    yield {"event": "agent", "data": json.dumps(payload)}
-                await asyncio.sleep(2)
-
-        return EventSourceResponse(event_generator(), ping=15)
+        Pending updates to one agent are coalesced, so a slow reader gets each agent's latest
+        state rather than every presence flush.
+        """
+        scope = frozenset({board_id} if board_id is not None else allowed_ids)
+        return stream_hub.stream(
+            request,
+            ("agents", board_id, scope),
+            fetch=self._agent_stream_fetch(board_id, scope),
+            since=since_dt,
+            resume_after=None,
+            board_ids=scope,
+            entities={ENTITY_AGENT},
+            poll_seconds=STREAM_POLL_SECONDS,
+        )
 
     async def create_agent(
         self,
@@ -1626,7 +1672,7 @@ class AgentLifecycleService(OpenClawDBService):
             main_gateway=main_gateway,
             gateway_for_main=gateway_for_main,
         )
-        raw_token = self.mark_agent_update_pending(agent)
+        raw_token = await self.mark_agent_update_pending(agent)
         self.session.add(agent)
         await self.session.commit()
         await self.session.refresh(agent)
@@ -1864,6 +1910,7 @@ class AgentLifecycleService(OpenClawDBService):
         )
         await self.session.delete(agent)
         await self.session.commit()
+        verified_agent_tokens.invalidate_agent(agent.id)
 
         try:
             # Notify the gateway-main agent about cleanup for board-scoped deletes.
@@ -0,0 +1,321 @@
+"""Request-scoped and short-TTL cache of organization access lookups.
+
+A user request typically resolves the active membership (``User`` and
+``OrganizationMember`` queries), then board access (``OrganizationBoardAccess`` or the
+organization's board list), and endpoints such as the dashboard metrics and activity feed
+repeat those lookups. :data:`organization_access_cache` keeps the results:
+
+- per request, in ``session.info``, so repeated lookups within one request cost nothing;
+- per process for ``ORG_ACCESS_CACHE_TTL_SECONDS`` (``0`` keeps only the per-request layer).
+
+Cached memberships are detached snapshots. :meth:`OrganizationAccessCache.member` merges
+them into the caller's session without a query (``merge(load=False)``), so callers get
+ordinary persistent rows they may modify and commit.
+
+Writes to memberships, board access rows, boards and users' active organization drop the
+affected entries when they are flushed (see :func:`_after_flush`), and again once the
+transaction commits: another request reading between the flush and the commit still sees
+the old rows and may cache them. Bulk ``DELETE``
+statements bypass the ORM, so code using them calls :meth:`OrganizationAccessCache.invalidate`
+itself. Other replicas are not notified; they see access changes once their entries expire.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from app.core.config import settings
+from app.models.boards import Board
+from app.models.organization_board_access import OrganizationBoardAccess
+from app.models.organization_members import OrganizationMember
+from app.models.users import User
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+_MEMO_INFO_KEY = "organization_access_memo"
+# (user_id, organization_id, member_id) dropped at flush, dropped again after the commit.
+_PENDING_INFO_KEY = "organization_access_pending"
+
+# ("active", user_id) -> organization id of the user's active membership
+# ("member", user_id, organization_id) -> OrganizationMember snapshot
+# ("boards", member_id, write) -> frozenset of accessible board ids
+CacheKey = tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    expires_at: float
+    value: Any
+    user_id: UUID | None = None
+    organization_id: UUID | None = None
+    member_id: UUID | None = None
+
+    def matches(
+        self,
+        *,
+        user_id: UUID | None,
+        organization_id: UUID | None,
+        member_id: UUID | None,
+    ) -> bool:
+        return (
+            (user_id is not None and self.user_id == user_id)
+            or (organization_id is not None and self.organization_id == organization_id)
+            or (member_id is not None and self.member_id == member_id)
+        )
+
+
+def _snapshot(member: OrganizationMember) -> OrganizationMember:
+    copy = OrganizationMember.model_validate(member.model_dump())
+    make_transient_to_detached(copy)
+    return copy
+
+
+class OrganizationAccessCache:
+    """Bounded TTL cache of memberships and accessible board ids, plus a per-session memo."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._generation = 0
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is not None:
+            return self._ttl_seconds
+        return settings.org_access_cache_ttl_seconds
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        return settings.org_access_cache_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self) -> int:
+        """Take before reading access state from the database, and pass to the ``put_*``."""
+        return self._generation
+
+    @staticmethod
+    def _memo(session: AsyncSession) -> dict[CacheKey, _Entry]:
+        memo: dict[CacheKey, _Entry] = session.info.setdefault(_MEMO_INFO_KEY, {})
+        return memo
+
+    def _get(self, session: AsyncSession, key: CacheKey) -> _Entry | None:
+        memo = self._memo(session)
+        entry = memo.get(key)
+        if entry is not None:
+            return entry
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry.expires_at:
+            del self._entries[key]
+            return None
+        memo[key] = entry
+        return entry
+
+    def _put(self, session: AsyncSession, generation: int, key: CacheKey, entry: _Entry) -> None:
+        if generation != self._generation:
+            # Access changed while the caller was reading it; the value may be stale.
+            return
+        self._memo(session)[key] = entry
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _expires_at(self) -> float:
+        return time.monotonic() + self.ttl_seconds
+
+    def active_organization_id(self, session: AsyncSession, user_id: UUID) -> UUID | None:
+        entry = self._get(session, ("active", user_id))
+        return entry.value if entry is not None else None
+
+    def put_active_organization_id(
+        self,
+        session: AsyncSession,
+        generation: int,
+        *,
+        user_id: UUID,
+        organization_id: UUID,
+    ) -> None:
+        self._put(
+            session,
+            generation,
+            ("active", user_id),
+            _Entry(self._expires_at(), organization_id, user_id, organization_id),
+        )
+
+    async def member(
+        self,
+        session: AsyncSession,
+        *,
+        user_id: UUID,
+        organization_id: UUID,
+    ) -> OrganizationMember | None:
+        """Return the cached membership attached to ``session``, without querying."""
+        entry = self._get(session, ("member", user_id, organization_id))
+        if entry is None:
+            return None
+        loaded = session.identity_map.get(identity_key(OrganizationMember, entry.value.id))
+        if isinstance(loaded, OrganizationMember):
+            # Never overwrite a row the caller already holds (it may carry unflushed edits).
+            return loaded
+        return await session.merge(entry.value, load=False)
+
+    def put_member(
+        self,
+        session: AsyncSession,
+        generation: int,
+        member: OrganizationMember,
+    ) -> None:
+        self._put(
+            session,
+            generation,
+            ("member", member.user_id, member.organization_id),
+            _Entry(
+                self._expires_at(),
+                _snapshot(member),
+                member.user_id,
+                member.organization_id,
+                member.id,
+            ),
+        )
+
+    def board_ids(
+        self,
+        session: AsyncSession,
+        *,
+        member: OrganizationMember,
+        write: bool,
+    ) -> frozenset[UUID] | None:
+        entry = self._get(session, ("boards", member.id, write))
+        return entry.value if entry is not None else None
+
+    def put_board_ids(
+        self,
+        session: AsyncSession,
+        generation: int,
+        *,
+        member: OrganizationMember,
+        write: bool,
+        board_ids: frozenset[UUID],
+    ) -> None:
+        self._put(
+            session,
+            generation,
+            ("boards", member.id, write),
+            _Entry(
+                self._expires_at(),
+                board_ids,
+                member.user_id,
+                member.organization_id,
+                member.id,
+            ),
+        )
+
+    def invalidate(
+        self,
+        session: AsyncSession | Session | None = None,
+        *,
+        user_id: UUID | None = None,
+        organization_id: UUID | None = None,
+        member_id: UUID | None = None,
+    ) -> None:
+        """Drop entries for a user, an organization and/or a membership."""
+        self._generation += 1
+        stores = [self._entries]
+        if session is not None:
+            stores.append(session.info.get(_MEMO_INFO_KEY, {}))
+        for store in stores:
+            stale = [
+                key
+                for key, entry in store.items()
+                if entry.matches(
+                    user_id=user_id,
+                    organization_id=organization_id,
+                    member_id=member_id,
+                )
+            ]
+            for key in stale:
+                del store[key]
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+
+def _changed(session: Session, row: Any, attribute: str) -> bool:
+    if row in session.new or row in session.deleted:
+        return True
+    return bool(inspect(row).attrs[attribute].history.has_changes())
+
+
+def _invalidate(
+    session: Session,
+    *,
+    user_id: UUID | None = None,
+    organization_id: UUID | None = None,
+    member_id: UUID | None = None,
+) -> None:
+    organization_access_cache.invalidate(
+        session,
+        user_id=user_id,
+        organization_id=organization_id,
+        member_id=member_id,
+    )
+    session.info.setdefault(_PENDING_INFO_KEY, []).append((user_id, organization_id, member_id))
+
+
+def _after_flush(session: Session, _flush_context: object) -> None:
+    for rows in (session.new, session.dirty, session.deleted):
+        for row in rows:
+            if isinstance(row, OrganizationMember):
+                _invalidate(session, user_id=row.user_id, member_id=row.id)
+            elif isinstance(row, OrganizationBoardAccess):
+                _invalidate(session, member_id=row.organization_member_id)
+            elif isinstance(row, Board) and _changed(session, row, "organization_id"):
+                # All-boards members see every board of the organization.
+                _invalidate(session, organization_id=row.organization_id)
+            elif isinstance(row, User) and _changed(session, row, "active_organization_id"):
+                _invalidate(session, user_id=row.id)
+
+
+def _after_commit(session: Session) -> None:
+    # Entries cached from the pre-commit rows between the flush and now are stale.
+    for user_id, organization_id, member_id in session.info.pop(_PENDING_INFO_KEY, ()):
+        organization_access_cache.invalidate(
+            session,
+            user_id=user_id,
+            organization_id=organization_id,
+            member_id=member_id,
+        )
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INFO_KEY, None)
+
+
+organization_access_cache = OrganizationAccessCache()
+event.listen(Session, "after_flush", _after_flush)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
@@ -23,6 +23,7 @@ from app.models.organization_members import OrganizationMember
 from app.models.organizations import Organization
 from app.models.skills import SkillPack
 from app.models.users import User
+from app.services.organization_access_cache import organization_access_cache
 
 if TYPE_CHECKING:
     from uuid import UUID
@@ -83,10 +84,21 @@ async def get_member(
     organization_id: UUID,
 ) -> OrganizationMember | None:
     """Fetch a membership by user id and organization id."""
-    return await OrganizationMember.objects.filter_by(
+    cached = await organization_access_cache.member(
+        session,
+        user_id=user_id,
+        organization_id=organization_id,
+    )
+    if cached is not None:
+        return cached
+    generation = organization_access_cache.snapshot()
+    member = await OrganizationMember.objects.filter_by(
         user_id=user_id,
         organization_id=organization_id,
     ).first(session)
+    if member is not None:
+        organization_access_cache.put_member(session, generation, member)
+    return member
 
 
 async def get_org_owner_user(
@@ -143,6 +155,17 @@ async def get_active_membership(
     user: User,
 ) -> OrganizationMember | None:
     """Resolve and normalize the user's currently active membership."""
+    active_organization_id = organization_access_cache.active_organization_id(session, user.id)
+    if active_organization_id is not None:
+        cached = await get_member(
+            session,
+            user_id=user.id,
+            organization_id=active_organization_id,
+        )
+        if cached is not None:
+            user.active_organization_id = active_organization_id
+            return cached
+    generation = organization_access_cache.snapshot()
     db_user = await User.objects.by_id(user.id).first(session)
     if db_user is None:
         db_user = user
@@ -154,6 +177,12 @@ async def get_active_membership(
         )
         if member is not None:
             user.active_organization_id = db_user.active_organization_id
+            organization_access_cache.put_active_organization_id(
+                session,
+                generation,
+                user_id=user.id,
+                organization_id=member.organization_id,
+            )
             return member
         db_user.active_organization_id = None
         session.add(db_user)
@@ -378,6 +407,9 @@ async def has_board_access(
             return True
     elif member_all_boards_read(member):
         return True
+    cached = organization_access_cache.board_ids(session, member=member, write=write)
+    if cached is not None:
+        return board.id in cached
     access = await OrganizationBoardAccess.objects.filter_by(
         organization_member_id=member.id,
         board_id=board.id,
@@ -449,6 +481,27 @@ async def list_accessible_board_ids(
     write: bool,
 ) -> list[UUID]:
     """List board ids accessible to a member for read or write mode."""
+    cached = organization_access_cache.board_ids(session, member=member, write=write)
+    if cached is not None:
+        return list(cached)
+    generation = organization_access_cache.snapshot()
+    board_ids = await _query_accessible_board_ids(session, member=member, write=write)
+    organization_access_cache.put_board_ids(
+        session,
+        generation,
+        member=member,
+        write=write,
+        board_ids=board_ids,
+    )
+    return list(board_ids)
+
+
+async def _query_accessible_board_ids(
+    session: AsyncSession,
+    *,
+    member: OrganizationMember,
+    write: bool,
+) -> frozenset[UUID]:
     if (write and member_all_boards_write(member)) or (
         not write and member_all_boards_read(member)
     ):
@@ -457,7 +510,7 @@ async def list_accessible_board_ids(
                 col(Board.organization_id) == member.organization_id,
             ),
         )
-        return list(ids)
+        return frozenset(ids)
 
     access_stmt = select(OrganizationBoardAccess.board_id).where(
         col(OrganizationBoardAccess.organization_member_id) == member.id,
@@ -474,7 +527,7 @@ async def list_accessible_board_ids(
             ),
         )
     board_ids = await session.exec(access_stmt)
-    return list(board_ids)
+    return frozenset(board_ids)
 
 
 async def apply_member_access_update(
@@ -496,6 +549,7 @@ async def apply_member_access_update(
         col(OrganizationBoardAccess.organization_member_id) == member.id,
         commit=False,
     )
+    organization_access_cache.invalidate(session, user_id=member.user_id, member_id=member.id)
 
     if update.all_boards_read or update.all_boards_write:
         return
@@ -567,6 +621,7 @@ async def apply_invite_to_member(
     invite: OrganizationInvite,
 ) -> None:
     """Apply invite role/access grants onto an existing organization member."""
+    organization_access_cache.invalidate(session, user_id=member.user_id, member_id=member.id)
     now = utcnow()
     member_changed = False
     invite_role = normalize_role(invite.role or "member")
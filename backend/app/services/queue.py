@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import threading
 import time
-from dataclasses import dataclass
+import weakref
+from collections import Counter
+from collections.abc import Awaitable, Iterable, Sequence
+from dataclasses import dataclass, field, replace
 from datetime import UTC, datetime
 from typing import Any, cast
+from uuid import uuid4
 
 import redis
+import redis.asyncio as redis_async
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialWithJitterBackoff
+from redis.exceptions import NoScriptError
+from redis.retry import Retry
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -16,8 +28,41 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 _SCHEDULED_SUFFIX = ":scheduled"
+_KEYED_PAYLOADS_SUFFIX = ":scheduled:keyed"
+_KEYED_VERSIONS_SUFFIX = ":scheduled:versions"
+_LANE_INFIX = ":lane:"
+_STATS_INFIX = ":stats:"
+_DEAD_LETTER_SUFFIX = ":dead"
+_FAILURE_HISTORY_LIMIT = 10
+_FAILURE_ERROR_MAX_CHARS = 1000
 _DRY_RUN_BATCH_SIZE = 100
 
+# Per-task-type counters kept next to the queue (see app.services.queue_stats). Totals live
+# in one hash per counter; rates come from short-lived per-interval hashes.
+STATS_COUNTER_ENQUEUED = "enqueued"
+STATS_COUNTER_DEQUEUED = "dequeued"
+STATS_COUNTER_RETRIED = "retried"
+STATS_COUNTER_DROPPED = "dropped"
+STATS_INTERVAL_SECONDS = 60
+STATS_INTERVAL_TTL_SECONDS = 3600
+
+# Priority lanes. Every lane is its own ready list plus scheduled ZSET; the default lane keeps
+# the bare queue name so envelopes queued before lanes existed are still consumed.
+QUEUE_LANE_DEFAULT = "default"
+QUEUE_LANE_HIGH = "high"
+
+
+class QueueWriteError(RuntimeError):
+    """Redis accepted neither the retry nor the dead letter of a failed task."""
+
+
+@dataclass(frozen=True)
+class TaskReceipt:
+    """Where a leased envelope sits until it is acknowledged."""
+
+    processing_key: str
+    raw: str
+
 
 @dataclass(frozen=True)
 class QueuedTask:
@@ -27,77 +72,336 @@ class QueuedTask:
     payload: dict[str, Any]
     created_at: datetime
     attempts: int = 0
+    # Most recent failures, oldest first: {"attempt", "error", "failed_at"}.
+    history: tuple[dict[str, Any], ...] = ()
+    # Set by lease-based dequeue (app.services.queue_leases) so the task can be acknowledged.
+    receipt: TaskReceipt | None = field(default=None, compare=False, repr=False)
 
     def to_json(self) -> str:
-        return json.dumps(
-            {
-                "task_type": self.task_type,
-                "payload": self.payload,
-                "created_at": self.created_at.isoformat(),
-                "attempts": self.attempts,
-            },
-            sort_keys=True,
-        )
+        envelope: dict[str, Any] = {
+            "task_type": self.task_type,
+            "payload": self.payload,
+            "created_at": self.created_at.isoformat(),
+            "attempts": self.attempts,
+        }
+        if self.history:
+            envelope["history"] = list(self.history)
+        return json.dumps(envelope, sort_keys=True)
+
+
+def with_failure(task: QueuedTask, error: str) -> QueuedTask:
+    """Return ``task`` with a failure entry appended to its bounded attempt history."""
+    entry = {
+        "attempt": task.attempts,
+        "error": error[:_FAILURE_ERROR_MAX_CHARS],
+        "failed_at": datetime.now(UTC).isoformat(),
+    }
+    return replace(task, history=(*task.history, entry)[-_FAILURE_HISTORY_LIMIT:])
+
+
+_RETRY_BACKOFF_BASE_SECONDS = 0.05
+_RETRY_BACKOFF_CAP_SECONDS = 1.0
+
+_sync_clients_lock = threading.Lock()
+_sync_clients: dict[str, redis.Redis] = {}
+_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    dict[str, redis_async.Redis],
+] = weakref.WeakKeyDictionary()
+
+
+def _pool_options() -> dict[str, Any]:
+    # No socket read timeout: BRPOP legitimately blocks for the worker's block timeout.
+    return {
+        "max_connections": settings.rq_redis_max_connections,
+        "timeout": settings.rq_redis_pool_timeout_seconds,
+        "socket_connect_timeout": settings.rq_redis_socket_connect_timeout_seconds,
+        "socket_keepalive": True,
+        "health_check_interval": settings.rq_redis_health_check_interval_seconds,
+    }
+
+
+def _backoff() -> ExponentialWithJitterBackoff:
+    return ExponentialWithJitterBackoff(
+        base=_RETRY_BACKOFF_BASE_SECONDS,
+        cap=_RETRY_BACKOFF_CAP_SECONDS,
+    )
 
 
 def _redis_client(redis_url: str | None = None) -> redis.Redis:
-    return redis.Redis.from_url(redis_url or settings.rq_redis_url)
+    """Return the process-wide client for ``redis_url`` backed by a shared blocking pool."""
+    url = redis_url or settings.rq_redis_url
+    client = _sync_clients.get(url)
+    if client is not None:
+        return client
+    with _sync_clients_lock:
+        client = _sync_clients.get(url)
+        if client is None:
+            pool = redis.BlockingConnectionPool.from_url(
+                url,
+                retry=Retry(_backoff(), settings.rq_redis_retry_attempts),
+                **_pool_options(),
+            )
+            client = redis.Redis(connection_pool=pool)
+            _sync_clients[url] = client
+    return client
+
+
+def _async_redis_client(redis_url: str | None = None) -> redis_async.Redis:
+    """Return the asyncio client for ``redis_url`` bound to the running event loop.
+
+    asyncio connections cannot be shared across loops, so pools are cached per loop and
+    released together with it.
+    """
+    url = redis_url or settings.rq_redis_url
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    client = clients.get(url)
+    if client is None:
+        pool = redis_async.BlockingConnectionPool.from_url(
+            url,
+            retry=AsyncRetry(_backoff(), settings.rq_redis_retry_attempts),
+            **_pool_options(),
+        )
+        client = redis_async.Redis(connection_pool=pool)
+        clients[url] = client
+    return client
+
+
+def close_redis_clients() -> None:
+    """Disconnect and forget every pooled synchronous Redis client."""
+    with _sync_clients_lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        client.connection_pool.disconnect()
+
+
+async def close_async_redis_clients() -> None:
+    """Close pooled asyncio Redis clients owned by the running event loop."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose(close_connection_pool=True)
+
+
+def lane_queue_name(queue_name: str, lane: str = QUEUE_LANE_DEFAULT) -> str:
+    """Return the Redis list name backing ``lane`` of ``queue_name``."""
+    if lane == QUEUE_LANE_DEFAULT:
+        return queue_name
+    return f"{queue_name}{_LANE_INFIX}{lane}"
 
 
 def _scheduled_queue_name(queue_name: str) -> str:
     return f"{queue_name}{_SCHEDULED_SUFFIX}"
 
 
+def _keyed_payloads_name(queue_name: str) -> str:
+    return f"{queue_name}{_KEYED_PAYLOADS_SUFFIX}"
+
+
+def _keyed_versions_name(queue_name: str) -> str:
+    return f"{queue_name}{_KEYED_VERSIONS_SUFFIX}"
+
+
+def stats_key(queue_name: str, name: str, interval: int | None = None) -> str:
+    """Return the stats key for ``name``; every lane of a queue shares one stats namespace."""
+    base = queue_name.split(_LANE_INFIX, 1)[0]
+    key = f"{base}{_STATS_INFIX}{name}"
+    return key if interval is None else f"{key}:{interval}"
+
+
+def dead_letter_key(queue_name: str) -> str:
+    """Return the dead-letter list shared by every lane of ``queue_name``."""
+    return f"{queue_name.split(_LANE_INFIX, 1)[0]}{_DEAD_LETTER_SUFFIX}"
+
+
+def stats_interval(now: float) -> int:
+    """Return the rate interval index that ``now`` (epoch seconds) falls into."""
+    return int(now // STATS_INTERVAL_SECONDS)
+
+
+def _stage_counts(
+    pipe: Any,
+    queue_name: str,
+    counter: str,
+    counts: Counter[str],
+) -> None:
+    interval_key = stats_key(queue_name, counter, stats_interval(_now_seconds()))
+    total_key = stats_key(queue_name, counter)
+    for task_type, amount in counts.items():
+        pipe.hincrby(total_key, task_type, amount)
+        pipe.hincrby(interval_key, task_type, amount)
+    pipe.expire(interval_key, STATS_INTERVAL_TTL_SECONDS)
+
+
+def _record_counts(
+    client: redis.Redis,
+    queue_name: str,
+    counter: str,
+    task_types: Iterable[str],
+) -> None:
+    """Bump per-task-type counters in one pipelined round trip; never fails the caller."""
+    counts = Counter(task_types)
+    if not settings.rq_stats_enabled or not counts:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        _stage_counts(pipe, queue_name, counter, counts)
+        pipe.execute()
+    except Exception as exc:
+        logger.debug(
+            "rq.queue.stats_failed",
+            extra={"queue_name": queue_name, "counter": counter, "error": str(exc)},
+        )
+
+
+async def _record_counts_async(
+    client: redis_async.Redis,
+    queue_name: str,
+    counter: str,
+    task_types: Iterable[str],
+) -> None:
+    counts = Counter(task_types)
+    if not settings.rq_stats_enabled or not counts:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        _stage_counts(pipe, queue_name, counter, counts)
+        await pipe.execute()
+    except Exception as exc:
+        logger.debug(
+            "rq.queue.stats_failed",
+            extra={"queue_name": queue_name, "counter": counter, "error": str(exc)},
+        )
+
+
+def _script_sha(script: str) -> str:
+    return hashlib.sha1(script.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
 def _now_seconds() -> float:
     return time.time()
 
 
+# Promote up to ARGV[2] members due at ARGV[1] from the scheduled ZSET (KEYS[1]) onto the
+# ready list (KEYS[2]) in one atomic step, so concurrent workers never promote the same
+# member twice. Keyed members ("@key:<dedup key>") resolve to their latest envelope in the
+# keyed payload hash (KEYS[3]); their entries in the payload and version (KEYS[4]) hashes are
+# removed, so both only hold keys that are still pending. A stale version enqueued after
+# promotion is therefore accepted again; consumers must (and the lifecycle reconcile does)
+# ignore envelopes older than their current state. Returns {promoted_count, next_due_score?};
+# the score is returned as a string to keep float precision across the Lua boundary.
+_PROMOTE_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local ready = {}
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+    for _, member in ipairs(due) do
+        if string.sub(member, 1, 5) == '@key:' then
+            local key = string.sub(member, 6)
+            local envelope = redis.call('HGET', KEYS[3], key)
+            redis.call('HDEL', KEYS[3], key)
+            redis.call('HDEL', KEYS[4], key)
+            if envelope then
+                table.insert(ready, envelope)
+            end
+        else
+            table.insert(ready, member)
+        end
+    end
+    if #ready > 0 then
+        redis.call('LPUSH', KEYS[2], unpack(ready))
+    end
+end
+local nxt = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if #nxt == 0 then
+    return {#ready}
+end
+return {#ready, nxt[2]}
+"""
+_PROMOTE_DUE_SHA = _script_sha(_PROMOTE_DUE_SCRIPT)
+
+# Keyed, idempotent scheduling: one scheduled entry per dedup key (ARGV[1]). A later call
+# replaces the envelope (ARGV[4]) and due time (ARGV[3]) unless the stored version in
+# KEYS[3] is newer than ARGV[2], in which case the stale envelope is dropped (returns 0).
+_SCHEDULE_KEYED_SCRIPT = """
+local current = redis.call('HGET', KEYS[3], ARGV[1])
+if current and tonumber(current) > tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[4])
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[1], ARGV[3], '@key:' .. ARGV[1])
+return 1
+"""
+_SCHEDULE_KEYED_SHA = _script_sha(_SCHEDULE_KEYED_SCRIPT)
+
+
+def _run_script(
+    client: redis.Redis,
+    *,
+    script: str,
+    sha: str,
+    keys: list[str],
+    args: list[str],
+) -> Any:
+    try:
+        return client.evalsha(sha, len(keys), *keys, *args)
+    except NoScriptError:
+        # EVAL also loads the script into the server cache for subsequent EVALSHA calls.
+        return client.eval(script, len(keys), *keys, *args)
+
+
+async def _run_script_async(
+    client: redis_async.Redis,
+    *,
+    script: str,
+    sha: str,
+    keys: list[str],
+    args: list[str],
+) -> Any:
+    try:
+        return await cast(Awaitable[Any], client.evalsha(sha, len(keys), *keys, *args))
+    except NoScriptError:
+        return await cast(Awaitable[Any], client.eval(script, len(keys), *keys, *args))
+
+
 def _drain_ready_scheduled_tasks(
     client: redis.Redis,
     queue_name: str,
     *,
     max_items: int = _DRY_RUN_BATCH_SIZE,
 ) -> float | None:
-    scheduled_queue = _scheduled_queue_name(queue_name)
     now = _now_seconds()
-
-    ready_items = cast(
-        list[str | bytes],
-        client.zrangebyscore(
-            scheduled_queue,
-            "-inf",
-            now,
-            start=0,
-            num=max_items,
+    result = cast(
+        list[int | bytes | str],
+        _run_script(
+            client,
+            script=_PROMOTE_DUE_SCRIPT,
+            sha=_PROMOTE_DUE_SHA,
+            keys=[
+                _scheduled_queue_name(queue_name),
+                queue_name,
+                _keyed_payloads_name(queue_name),
+                _keyed_versions_name(queue_name),
+            ],
+            args=[repr(now), str(max_items)],
         ),
     )
-    if ready_items:
-        ready_values = tuple(ready_items)
-        client.lpush(queue_name, *ready_values)
-        client.zrem(scheduled_queue, *ready_values)
+    promoted = int(result[0])
+    if promoted:
         logger.debug(
             "rq.queue.drain_ready_scheduled",
             extra={
                 "queue_name": queue_name,
-                "count": len(ready_items),
+                "count": promoted,
             },
         )
-
-    next_item = cast(
-        list[tuple[str | bytes, float]],
-        client.zrangebyscore(
-            scheduled_queue,
-            now,
-            "+inf",
-            start=0,
-            num=1,
-            withscores=True,
-        ),
-    )
-    if not next_item:
+    if len(result) < 2:
         return None
 
-    next_score = float(next_item[0][1])
+    raw_score = result[1]
+    next_score = float(raw_score.decode("utf-8") if isinstance(raw_score, bytes) else raw_score)
     return max(0.0, next_score - now)
 
 
@@ -107,11 +411,61 @@ def _schedule_for_later(
     delay_seconds: float,
     *,
     redis_url: str | None = None,
+    count_enqueued: bool = True,
 ) -> bool:
-    client = _redis_client(redis_url=redis_url)
-    scheduled_queue = _scheduled_queue_name(queue_name)
-    score = _now_seconds() + delay_seconds
-    client.zadd(scheduled_queue, {task.to_json(): score})
+    try:
+        client = _redis_client(redis_url=redis_url)
+        scheduled_queue = _scheduled_queue_name(queue_name)
+        score = _now_seconds() + delay_seconds
+        client.zadd(scheduled_queue, {task.to_json(): score})
+        if count_enqueued:
+            _record_counts(client, queue_name, STATS_COUNTER_ENQUEUED, [task.task_type])
+    except Exception as exc:
+        logger.warning(
+            "rq.queue.schedule_failed",
+            extra={
+                "task_type": task.task_type,
+                "queue_name": queue_name,
+                "delay_seconds": delay_seconds,
+                "error": str(exc),
+            },
+        )
+        return False
+    logger.info(
+        "rq.queue.scheduled",
+        extra={
+            "task_type": task.task_type,
+            "queue_name": queue_name,
+            "delay_seconds": delay_seconds,
+        },
+    )
+    return True
+
+
+async def _schedule_for_later_async(
+    task: QueuedTask,
+    queue_name: str,
+    delay_seconds: float,
+    *,
+    redis_url: str | None = None,
+) -> bool:
+    try:
+        client = _async_redis_client(redis_url=redis_url)
+        scheduled_queue = _scheduled_queue_name(queue_name)
+        score = _now_seconds() + delay_seconds
+        await client.zadd(scheduled_queue, {task.to_json(): score})
+        await _record_counts_async(client, queue_name, STATS_COUNTER_ENQUEUED, [task.task_type])
+    except Exception as exc:
+        logger.warning(
+            "rq.queue.schedule_failed",
+            extra={
+                "task_type": task.task_type,
+                "queue_name": queue_name,
+                "delay_seconds": delay_seconds,
+                "error": str(exc),
+            },
+        )
+        return False
     logger.info(
         "rq.queue.scheduled",
         extra={
@@ -128,11 +482,18 @@ def enqueue_task(
     queue_name: str,
     *,
     redis_url: str | None = None,
+    count_enqueued: bool = True,
 ) -> bool:
-    """Persist a task envelope in a Redis list-backed queue."""
+    """Persist a task envelope in a Redis list-backed queue.
+
+    ``count_enqueued=False`` skips the enqueued counter, for retries that are counted as
+    retried instead.
+    """
     try:
         client = _redis_client(redis_url=redis_url)
         client.lpush(queue_name, task.to_json())
+        if count_enqueued:
+            _record_counts(client, queue_name, STATS_COUNTER_ENQUEUED, [task.task_type])
         logger.info(
             "rq.queue.enqueued",
             extra={
@@ -156,26 +517,198 @@ def enqueue_task_with_delay(
     *,
     delay_seconds: float,
     redis_url: str | None = None,
+    count_enqueued: bool = True,
 ) -> bool:
     """Enqueue a task immediately or schedule it for delayed delivery."""
     delay = max(0.0, float(delay_seconds))
     if delay == 0:
-        return enqueue_task(task, queue_name, redis_url=redis_url)
+        return enqueue_task(task, queue_name, redis_url=redis_url, count_enqueued=count_enqueued)
+    return _schedule_for_later(
+        task,
+        queue_name,
+        delay,
+        redis_url=redis_url,
+        count_enqueued=count_enqueued,
+    )
+
+
+async def enqueue_task_async(
+    task: QueuedTask,
+    queue_name: str,
+    *,
+    redis_url: str | None = None,
+) -> bool:
+    """Async variant of :func:`enqueue_task` for callers running on the API event loop."""
     try:
-        return _schedule_for_later(task, queue_name, delay, redis_url=redis_url)
-    except Exception as exc:
-        logger.warning(
-            "rq.queue.schedule_failed",
+        client = _async_redis_client(redis_url=redis_url)
+        await cast(Awaitable[int], client.lpush(queue_name, task.to_json()))
+        await _record_counts_async(client, queue_name, STATS_COUNTER_ENQUEUED, [task.task_type])
+        logger.info(
+            "rq.queue.enqueued",
             extra={
                 "task_type": task.task_type,
                 "queue_name": queue_name,
-                "delay_seconds": delay,
-                "error": str(exc),
+                "attempt": task.attempts,
             },
         )
+        return True
+    except Exception as exc:
+        logger.warning(
+            "rq.queue.enqueue_failed",
+            extra={"task_type": task.task_type, "queue_name": queue_name, "error": str(exc)},
+        )
         return False
 
 
+async def enqueue_task_with_delay_async(
+    task: QueuedTask,
+    queue_name: str,
+    *,
+    delay_seconds: float,
+    redis_url: str | None = None,
+) -> bool:
+    """Async variant of :func:`enqueue_task_with_delay`."""
+    delay = max(0.0, float(delay_seconds))
+    if delay == 0:
+        return await enqueue_task_async(task, queue_name, redis_url=redis_url)
+    return await _schedule_for_later_async(task, queue_name, delay, redis_url=redis_url)
+
+
+def _keyed_schedule_call(
+    task: QueuedTask,
+    queue_name: str,
+    *,
+    dedup_key: str,
+    version: int,
+    delay_seconds: float,
+) -> tuple[list[str], list[str]]:
+    keys = [
+        _scheduled_queue_name(queue_name),
+        _keyed_payloads_name(queue_name),
+        _keyed_versions_name(queue_name),
+    ]
+    score = _now_seconds() + max(0.0, float(delay_seconds))
+    return keys, [dedup_key, str(version), repr(score), task.to_json()]
+
+
+def _log_keyed_schedule(
+    task: QueuedTask,
+    queue_name: str,
+    *,
+    dedup_key: str,
+    version: int,
+    delay_seconds: float,
+    accepted: bool,
+) -> None:
+    logger.info(
+        "rq.queue.scheduled" if accepted else "rq.queue.superseded",
+        extra={
+            "task_type": task.task_type,
+            "queue_name": queue_name,
+            "dedup_key": dedup_key,
+            "version": version,
+            "delay_seconds": delay_seconds,
+        },
+    )
+
+
+def enqueue_keyed_task_with_delay(
+    task: QueuedTask,
+    queue_name: str,
+    *,
+    dedup_key: str,
+    version: int,
+    delay_seconds: float,
+    redis_url: str | None = None,
+    count_enqueued: bool = True,
+) -> bool:
+    """Schedule ``task`` as the single pending entry for ``dedup_key``.
+
+    A later call for the same key replaces the pending envelope and due time; a call whose
+    ``version`` is older than the last scheduled one is dropped as superseded. Returns False
+    only when Redis could not be reached. ``count_enqueued=False`` is for a task put back
+    rather than newly enqueued.
+    """
+    keys, args = _keyed_schedule_call(
+        task,
+        queue_name,
+        dedup_key=dedup_key,
+        version=version,
+        delay_seconds=delay_seconds,
+    )
+    try:
+        client = _redis_client(redis_url=redis_url)
+        accepted = _run_script(
+            client,
+            script=_SCHEDULE_KEYED_SCRIPT,
+            sha=_SCHEDULE_KEYED_SHA,
+            keys=keys,
+            args=args,
+        )
+    except Exception as exc:
+        logger.warning(
+            "rq.queue.schedule_failed",
+            extra={"task_type": task.task_type, "queue_name": queue_name, "error": str(exc)},
+        )
+        return False
+    if accepted and count_enqueued:
+        _record_counts(client, queue_name, STATS_COUNTER_ENQUEUED, [task.task_type])
+    _log_keyed_schedule(
+        task,
+        queue_name,
+        dedup_key=dedup_key,
+        version=version,
+        delay_seconds=delay_seconds,
+        accepted=bool(accepted),
+    )
+    return True
+
+
+async def enqueue_keyed_task_with_delay_async(
+    task: QueuedTask,
+    queue_name: str,
+    *,
+    dedup_key: str,
+    version: int,
+    delay_seconds: float,
+    redis_url: str | None = None,
+) -> bool:
+    """Async variant of :func:`enqueue_keyed_task_with_delay`."""
+    keys, args = _keyed_schedule_call(
+        task,
+        queue_name,
+        dedup_key=dedup_key,
+        version=version,
+        delay_seconds=delay_seconds,
+    )
+    try:
+        client = _async_redis_client(redis_url=redis_url)
+        accepted = await _run_script_async(
+            client,
+            script=_SCHEDULE_KEYED_SCRIPT,
+            sha=_SCHEDULE_KEYED_SHA,
+            keys=keys,
+            args=args,
+        )
+    except Exception as exc:
+        logger.warning(
+            "rq.queue.schedule_failed",
+            extra={"task_type": task.task_type, "queue_name": queue_name, "error": str(exc)},
+        )
+        return False
+    if accepted:
+        await _record_counts_async(client, queue_name, STATS_COUNTER_ENQUEUED, [task.task_type])
+    _log_keyed_schedule(
+        task,
+        queue_name,
+        dedup_key=dedup_key,
+        version=version,
+        delay_seconds=delay_seconds,
+        accepted=bool(accepted),
+    )
+    return True
+
+
 def _coerce_datetime(raw: object | None) -> datetime:
     if raw is None:
         return datetime.now(UTC)
@@ -192,37 +725,112 @@ def _coerce_datetime(raw: object | None) -> datetime:
     return datetime.now(UTC)
 
 
+def _queue_names(queue_name: str | Sequence[str]) -> list[str]:
+    return [queue_name] if isinstance(queue_name, str) else list(queue_name)
+
+
 def dequeue_task(
-    queue_name: str,
+    queue_name: str | Sequence[str],
     *,
     redis_url: str | None = None,
     block: bool = False,
     block_timeout: float = 0,
 ) -> QueuedTask | None:
-    """Pop one task envelope from the queue."""
+    """Pop one task envelope from the queue.
+
+    ``queue_name`` may list several lane queues; they are tried in the given order, so the
+    caller decides priority.
+    """
+    popped = _pop_first(
+        _queue_names(queue_name),
+        redis_url=redis_url,
+        block=block,
+        block_timeout=block_timeout,
+    )
+    if popped is None:
+        return None
+    source, raw = popped
+    task = _decode_task(raw, source)
+    _record_counts(
+        _redis_client(redis_url=redis_url),
+        source,
+        STATS_COUNTER_DEQUEUED,
+        [task.task_type],
+    )
+    return task
+
+
+def _pop_first(
+    queue_names: list[str],
+    *,
+    redis_url: str | None,
+    block: bool,
+    block_timeout: float,
+) -> tuple[str, str | bytes] | None:
     client = _redis_client(redis_url=redis_url)
     timeout = max(0.0, float(block_timeout))
-    raw: str | bytes | None
     if block:
-        next_delay = _drain_ready_scheduled_tasks(client, queue_name)
+        next_delays = [
+            delay
+            for delay in (_drain_ready_scheduled_tasks(client, name) for name in queue_names)
+            if delay is not None
+        ]
+        next_delay = min(next_delays) if next_delays else None
         if timeout == 0:
             timeout = next_delay if next_delay is not None else 0
         else:
             timeout = min(timeout, next_delay) if next_delay is not None else timeout
         raw_result = cast(
             tuple[bytes | str, bytes | str] | None,
-            client.brpop([queue_name], timeout=timeout),
+            client.brpop(queue_names, timeout=timeout),
         )
-        if raw_result is None:
-            _drain_ready_scheduled_tasks(client, queue_name)
-            return None
-        raw = raw_result[1]
+        if raw_result is not None:
+            key = raw_result[0]
+            return (key.decode("utf-8") if isinstance(key, bytes) else key), raw_result[1]
     else:
-        raw = cast(str | bytes | None, client.rpop(queue_name))
-    if raw is None:
-        _drain_ready_scheduled_tasks(client, queue_name)
-        return None
-    return _decode_task(raw, queue_name)
+        for name in queue_names:
+            raw = cast(str | bytes | None, client.rpop(name))
+            if raw is not None:
+                return name, raw
+    for name in queue_names:
+        _drain_ready_scheduled_tasks(client, name)
+    return None
+
+
+def dequeue_tasks(
+    queue_name: str | Sequence[str],
+    *,
+    max_items: int,
+    redis_url: str | None = None,
+    block: bool = False,
+    block_timeout: float = 0,
+) -> list[QueuedTask]:
+    """Pop up to ``max_items`` task envelopes from a single lane.
+
+    Waits for the first task exactly like :func:`dequeue_task`, then drains whatever else is
+    ready on the same lane with a single ``RPOP key count`` round trip. Undecodable envelopes
+    in the tail are logged and skipped rather than failing the whole batch.
+    """
+    popped = _pop_first(
+        _queue_names(queue_name),
+        redis_url=redis_url,
+        block=block,
+        block_timeout=block_timeout,
+    )
+    if popped is None:
+        return []
+    source, first_raw = popped
+    tasks = [_decode_task(first_raw, source)]
+    client = _redis_client(redis_url=redis_url)
+    if max_items > 1:
+        raw_items = cast(list[str | bytes] | None, client.rpop(source, max_items - 1))
+        for raw in raw_items or []:
+            try:
+                tasks.append(_decode_task(raw, source))
+            except Exception:
+                continue
+    _record_counts(client, source, STATS_COUNTER_DEQUEUED, (task.task_type for task in tasks))
+    return tasks
 
 
 def _decode_task(raw: str | bytes, queue_name: str) -> QueuedTask:
@@ -245,6 +853,7 @@ def _decode_task(raw: str | bytes, queue_name: str) -> QueuedTask:
             payload=payload["payload"],
             created_at=datetime.fromisoformat(payload["created_at"]),
             attempts=int(payload.get("attempts", 0)),
+            history=tuple(payload.get("history") or ()),
         )
     except Exception as exc:
         logger.error(
@@ -255,12 +864,74 @@ def _decode_task(raw: str | bytes, queue_name: str) -> QueuedTask:
 
 
 def _requeue_with_attempt(task: QueuedTask) -> QueuedTask:
-    return QueuedTask(
-        task_type=task.task_type,
-        payload=task.payload,
-        created_at=task.created_at,
-        attempts=task.attempts + 1,
+    return replace(task, attempts=task.attempts + 1, receipt=None)
+
+
+def _dead_letter(task: QueuedTask, queue_name: str, *, redis_url: str | None) -> bool:
+    """Move an exhausted envelope to the bounded dead-letter list (newest first)."""
+    entry = json.dumps(
+        {
+            "id": uuid4().hex,
+            "queue_name": queue_name,
+            "dead_at": datetime.now(UTC).isoformat(),
+            "task": json.loads(task.to_json()),
+        },
+        sort_keys=True,
+    )
+    key = dead_letter_key(queue_name)
+    try:
+        client = _redis_client(redis_url=redis_url)
+        pipe = client.pipeline(transaction=True)
+        pipe.lpush(key, entry)
+        pipe.ltrim(key, 0, settings.rq_dead_letter_max_items - 1)
+        pipe.execute()
+    except Exception as exc:
+        logger.warning(
+            "rq.queue.dead_letter_failed",
+            extra={"task_type": task.task_type, "queue_name": queue_name, "error": str(exc)},
+        )
+        return False
+    logger.warning(
+        "rq.queue.dead_lettered",
+        extra={
+            "task_type": task.task_type,
+            "queue_name": queue_name,
+            "attempts": task.attempts,
+            "error": task.history[-1]["error"] if task.history else None,
+        },
     )
+    return True
+
+
+def dead_letter_task(
+    task: QueuedTask,
+    queue_name: str,
+    *,
+    error: str,
+    redis_url: str | None = None,
+) -> bool:
+    """Move ``task`` straight to the dead-letter list, recording ``error`` as its failure.
+
+    Returns False when the dead-letter write failed.
+    """
+    if not _dead_letter(with_failure(task, error), queue_name, redis_url=redis_url):
+        return False
+    _record_outcome(queue_name, STATS_COUNTER_DROPPED, task, redis_url=redis_url)
+    return True
+
+
+def _record_outcome(
+    queue_name: str,
+    counter: str,
+    task: QueuedTask,
+    *,
+    redis_url: str | None,
+) -> None:
+    try:
+        client = _redis_client(redis_url=redis_url)
+    except Exception:
+        return
+    _record_counts(client, queue_name, counter, [task.task_type])
 
 
 def requeue_if_failed(
@@ -273,7 +944,10 @@ def requeue_if_failed(
 ) -> bool:
     """Requeue a failed task with capped retries.
 
-    Returns True if requeued.
+    Returns True if requeued. Once ``max_retries`` is exhausted the envelope, including its
+    failure history, is moved to the queue's dead-letter list instead and False is returned.
+    Raises :class:`QueueWriteError` when Redis took neither write, so a caller holding a lease
+    can leave the task to the lease reaper instead of acknowledging it.
     """
     requeued_task = _requeue_with_attempt(task)
     if requeued_task.attempts > max_retries:
@@ -285,16 +959,26 @@ def requeue_if_failed(
                 "attempts": requeued_task.attempts,
             },
         )
+        if not _dead_letter(task, queue_name, redis_url=redis_url):
+            raise QueueWriteError(f"could not dead-letter {task.task_type} on {queue_name}")
+        _record_outcome(queue_name, STATS_COUNTER_DROPPED, task, redis_url=redis_url)
         return False
     if delay_seconds > 0:
-        return _schedule_for_later(
+        requeued = _schedule_for_later(
             requeued_task,
             queue_name,
             delay_seconds,
             redis_url=redis_url,
+            count_enqueued=False,
         )
-    return enqueue_task(
-        requeued_task,
-        queue_name,
-        redis_url=redis_url,
-    )
+    else:
+        requeued = enqueue_task(
+            requeued_task,
+            queue_name,
+            redis_url=redis_url,
+            count_enqueued=False,
+        )
+    if not requeued:
+        raise QueueWriteError(f"could not requeue {task.task_type} on {queue_name}")
+    _record_outcome(queue_name, STATS_COUNTER_RETRIED, task, redis_url=redis_url)
+    return True
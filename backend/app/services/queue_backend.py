@@ -0,0 +1,266 @@
+"""Pluggable storage behind the queue worker.
+
+The worker only needs four operations from a queue: pop a batch from the first non-empty
+lane, put an envelope back (optionally delayed), acknowledge finished envelopes, and move
+an envelope it cannot process to the dead-letter list.
+:class:`RedisQueueBackend` maps them onto :mod:`app.services.queue` (and
+:mod:`app.services.queue_leases` in reliable mode) and is what production uses.
+:class:`InMemoryQueueBackend` keeps everything in process so worker throughput and handler
+overhead can be measured, and the worker tested, without Redis.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from typing import Protocol
+
+from app.core.config import settings
+from app.services.queue import (
+    QueuedTask,
+    _decode_task,
+    _queue_names,
+    dead_letter_task,
+    dequeue_tasks,
+    enqueue_keyed_task_with_delay,
+    enqueue_task_with_delay,
+    with_failure,
+)
+from app.services.queue_leases import ack_tasks, dequeue_tasks_leased
+
+
+class QueueBackend(Protocol):
+    """Queue operations used by :mod:`app.services.queue_worker`."""
+
+    def dequeue(
+        self,
+        queue_name: str | Sequence[str],
+        *,
+        max_items: int,
+        block: bool = False,
+        block_timeout: float = 0,
+    ) -> list[QueuedTask]:
+        """Pop up to ``max_items`` envelopes from the first lane that has any."""
+        ...
+
+    def enqueue(
+        self,
+        task: QueuedTask,
+        queue_name: str,
+        *,
+        delay_seconds: float = 0,
+        dedup_key: str | None = None,
+        version: int = 0,
+        count_enqueued: bool = True,
+    ) -> bool:
+        """Add ``task`` to ``queue_name``, ready after ``delay_seconds``.
+
+        With ``dedup_key`` the task becomes the single pending entry for that key, unless a
+        newer ``version`` is already scheduled. ``count_enqueued=False`` is for tasks the
+        worker puts back rather than new work.
+        """
+        ...
+
+    def ack(self, tasks: Sequence[QueuedTask]) -> int:
+        """Mark dequeued tasks as finished; returns how many were outstanding."""
+        ...
+
+    def dead_letter(self, task: QueuedTask, queue_name: str, *, error: str) -> bool:
+        """Move ``task`` to the dead-letter list of ``queue_name`` without retrying it.
+
+        Returns False when the move failed and the task must not be acknowledged.
+        """
+        ...
+
+
+class RedisQueueBackend:
+    """The shared Redis queue, optionally with lease-based (at-least-once) dequeue."""
+
+    def __init__(self, *, redis_url: str | None = None, leased: bool = False) -> None:
+        self._redis_url = redis_url or settings.rq_redis_url
+        self._leased = leased
+
+    def dequeue(
+        self,
+        queue_name: str | Sequence[str],
+        *,
+        max_items: int,
+        block: bool = False,
+        block_timeout: float = 0,
+    ) -> list[QueuedTask]:
+        dequeue = dequeue_tasks_leased if self._leased else dequeue_tasks
+        return dequeue(
+            queue_name,
+            max_items=max_items,
+            redis_url=self._redis_url,
+            block=block,
+            block_timeout=block_timeout,
+        )
+
+    def enqueue(
+        self,
+        task: QueuedTask,
+        queue_name: str,
+        *,
+        delay_seconds: float = 0,
+        dedup_key: str | None = None,
+        version: int = 0,
+        count_enqueued: bool = True,
+    ) -> bool:
+        if dedup_key is not None:
+            return enqueue_keyed_task_with_delay(
+                task,
+                queue_name,
+                dedup_key=dedup_key,
+                version=version,
+                delay_seconds=delay_seconds,
+                redis_url=self._redis_url,
+                count_enqueued=count_enqueued,
+            )
+        return enqueue_task_with_delay(
+            task,
+            queue_name,
+            delay_seconds=delay_seconds,
+            redis_url=self._redis_url,
+            count_enqueued=count_enqueued,
+        )
+
+    def ack(self, tasks: Sequence[QueuedTask]) -> int:
+        return ack_tasks(tasks, redis_url=self._redis_url)
+
+    def dead_letter(self, task: QueuedTask, queue_name: str, *, error: str) -> bool:
+        return dead_letter_task(task, queue_name, error=error, redis_url=self._redis_url)
+
+
+class InMemoryQueueBackend:
+    """Thread-safe, process-local queue with the same lane and delay semantics as Redis.
+
+    Envelopes are stored as JSON and decoded on dequeue, like the Redis backend, so
+    serialization cost stays part of what a benchmark measures. Delivery is at-most-once
+    and nothing survives the process, so this is for benchmarks and tests only.
+    """
+
+    def __init__(self) -> None:
+        self._ready: dict[str, deque[str]] = {}
+        # (due, sequence, envelope, dedup key) per queue.
+        self._scheduled: dict[str, list[tuple[float, int, str, str | None]]] = {}
+        # (queue, dedup key) -> (version, sequence of the pending entry).
+        self._keyed: dict[tuple[str, str], tuple[int, int]] = {}
+        self._sequence = itertools.count()
+        self._changed = threading.Condition()
+        self._dead: dict[str, list[QueuedTask]] = {}
+
+    def enqueue(
+        self,
+        task: QueuedTask,
+        queue_name: str,
+        *,
+        delay_seconds: float = 0,
+        dedup_key: str | None = None,
+        version: int = 0,
+        count_enqueued: bool = True,
+    ) -> bool:
+        del count_enqueued
+        envelope = task.to_json()
+        with self._changed:
+            if dedup_key is not None:
+                current = self._keyed.get((queue_name, dedup_key))
+                if current is not None and current[0] > version:
+                    return True
+                sequence = next(self._sequence)
+                # Supersedes any pending entry for the key, which promotion then skips.
+                self._keyed[(queue_name, dedup_key)] = (version, sequence)
+                heapq.heappush(
+                    self._scheduled.setdefault(queue_name, []),
+                    (time.monotonic() + max(0.0, delay_seconds), sequence, envelope, dedup_key),
+                )
+            elif delay_seconds > 0:
+                heapq.heappush(
+                    self._scheduled.setdefault(queue_name, []),
+                    (time.monotonic() + delay_seconds, next(self._sequence), envelope, None),
+                )
+            else:
+                self._ready.setdefault(queue_name, deque()).append(envelope)
+            self._changed.notify_all()
+        return True
+
+    def _is_pending(self, queue_name: str, sequence: int, dedup_key: str | None) -> bool:
+        if dedup_key is None:
+            return True
+        current = self._keyed.get((queue_name, dedup_key))
+        return current is not None and current[1] == sequence
+
+    def depth(self, queue_name: str) -> int:
+        """Return how many envelopes are ready or scheduled on ``queue_name``."""
+        with self._changed:
+            scheduled = sum(
+                1
+                for _, sequence, _, dedup_key in self._scheduled.get(queue_name, ())
+                if self._is_pending(queue_name, sequence, dedup_key)
+            )
+            return len(self._ready.get(queue_name, ())) + scheduled
+
+    def _promote_due(self, names: list[str], now: float) -> float | None:
+        """Move due scheduled envelopes to their ready lists; returns seconds to the next."""
+        next_delay: float | None = None
+        for name in names:
+            scheduled = self._scheduled.get(name)
+            while scheduled and scheduled[0][0] <= now:
+                _, sequence, envelope, dedup_key = heapq.heappop(scheduled)
+                if not self._is_pending(name, sequence, dedup_key):
+                    continue
+                if dedup_key is not None:
+                    # Promotion forgets the key's version, as the Redis backend does.
+                    del self._keyed[(name, dedup_key)]
+                self._ready.setdefault(name, deque()).append(envelope)
+            if scheduled:
+                delay = scheduled[0][0] - now
+                next_delay = delay if next_delay is None else min(next_delay, delay)
+        return next_delay
+
+    def dequeue(
+        self,
+        queue_name: str | Sequence[str],
+        *,
+        max_items: int,
+        block: bool = False,
+        block_timeout: float = 0,
+    ) -> list[QueuedTask]:
+        names = _queue_names(queue_name)
+        deadline = time.monotonic() + block_timeout if block and block_timeout > 0 else None
+        with self._changed:
+            while True:
+                now = time.monotonic()
+                next_delay = self._promote_due(names, now)
+                for name in names:
+                    ready = self._ready.get(name)
+                    if ready:
+                        count = min(max_items, len(ready))
+                        raw_items = [ready.popleft() for _ in range(count)]
+                        return [_decode_task(raw, name) for raw in raw_items]
+                if not block:
+                    return []
+                waits = [delay for delay in (next_delay,) if delay is not None]
+                if deadline is not None:
+                    if now >= deadline:
+                        return []
+                    waits.append(deadline - now)
+                self._changed.wait(min(waits) if waits else None)
+
+    def ack(self, tasks: Sequence[QueuedTask]) -> int:
+        del tasks
+        return 0
+
+    def dead_letter(self, task: QueuedTask, queue_name: str, *, error: str) -> bool:
+        with self._changed:
+            self._dead.setdefault(queue_name, []).append(with_failure(task, error))
+        return True
+
+    def dead_letters(self, queue_name: str) -> list[QueuedTask]:
+        """Return the envelopes dead-lettered on ``queue_name``, oldest first."""
+        with self._changed:
+            return list(self._dead.get(queue_name, ()))
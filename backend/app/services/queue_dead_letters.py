@@ -0,0 +1,218 @@
+"""Inspection and replay of dead-lettered queue envelopes.
+
+:func:`app.services.queue.requeue_if_failed` moves envelopes that exhaust their retries to a
+bounded per-queue dead-letter list. This module lists them (optionally filtered by task type
+or board), pages through them for the admin API, and replays them back onto their original lane, staggered over time so a bulk
+replay after a gateway outage does not stampede the gateway again.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Collection
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, cast
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.queue import (
+    STATS_COUNTER_ENQUEUED,
+    QueuedTask,
+    _decode_task,
+    _now_seconds,
+    _record_counts,
+    _redis_client,
+    _scheduled_queue_name,
+    _script_sha,
+    dead_letter_key,
+)
+
+logger = get_logger(__name__)
+
+# Atomically take one entry (ARGV[1]) off the dead-letter list (KEYS[1]) and schedule its
+# envelope (ARGV[3]) at ARGV[2] on the lane's scheduled set (KEYS[2]). Returns 0 when the
+# entry was already replayed or trimmed by someone else.
+_REPLAY_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[3])
+return 1
+"""
+_REPLAY_SHA = _script_sha(_REPLAY_SCRIPT)
+
+
+@dataclass(frozen=True)
+class DeadLetter:
+    """One dead-lettered envelope together with where and when it died."""
+
+    id: str
+    queue_name: str
+    dead_at: datetime
+    task: QueuedTask
+    raw: str
+
+    @property
+    def last_error(self) -> str | None:
+        if not self.task.history:
+            return None
+        error = self.task.history[-1].get("error")
+        return str(error) if error is not None else None
+
+
+def _decode_entry(raw: str | bytes) -> DeadLetter | None:
+    text = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+    try:
+        entry: dict[str, Any] = json.loads(text)
+        queue_name = str(entry["queue_name"])
+        return DeadLetter(
+            id=str(entry["id"]),
+            queue_name=queue_name,
+            dead_at=datetime.fromisoformat(entry["dead_at"]),
+            task=_decode_task(json.dumps(entry["task"]), queue_name),
+            raw=text,
+        )
+    except Exception as exc:
+        logger.warning("rq.queue.dead_letter_undecodable", extra={"error": str(exc)})
+        return None
+
+
+def _matches(
+    letter: DeadLetter,
+    *,
+    task_type: str | None,
+    board_id: str | None,
+    ids: Collection[str] | None,
+) -> bool:
+    if task_type is not None and letter.task.task_type != task_type:
+        return False
+    if board_id is not None and str(letter.task.payload.get("board_id")) != board_id:
+        return False
+    return ids is None or letter.id in ids
+
+
+def list_dead_letters(
+    *,
+    task_type: str | None = None,
+    board_id: str | None = None,
+    ids: Collection[str] | None = None,
+    queue_name: str | None = None,
+    redis_url: str | None = None,
+) -> list[DeadLetter]:
+    """Return dead letters matching every given filter, newest first."""
+    client = _redis_client(redis_url=redis_url or settings.rq_redis_url)
+    raw_entries = cast(
+        list[str | bytes],
+        client.lrange(dead_letter_key(queue_name or settings.rq_queue_name), 0, -1),
+    )
+    letters: list[DeadLetter] = []
+    for raw in raw_entries:
+        letter = _decode_entry(raw)
+        if letter is not None and _matches(
+            letter,
+            task_type=task_type,
+            board_id=board_id,
+            ids=ids,
+        ):
+            letters.append(letter)
+    return letters
+
+
+def page_dead_letters(
+    *,
+    offset: int,
+    limit: int,
+    task_type: str | None = None,
+    board_id: str | None = None,
+    queue_name: str | None = None,
+    redis_url: str | None = None,
+) -> tuple[list[DeadLetter], int]:
+    """Return one page of matching dead letters, newest first, and the total match count.
+
+    Without filters only the requested slice is read (``LRANGE`` plus ``LLEN``); a filter has
+    to scan the whole list, which the configured ``rq_dead_letter_max_items`` bounds.
+    """
+    if task_type is not None or board_id is not None:
+        letters = list_dead_letters(
+            task_type=task_type,
+            board_id=board_id,
+            queue_name=queue_name,
+            redis_url=redis_url,
+        )
+        return letters[offset : offset + limit], len(letters)
+
+    client = _redis_client(redis_url=redis_url or settings.rq_redis_url)
+    key = dead_letter_key(queue_name or settings.rq_queue_name)
+    pipe = client.pipeline(transaction=True)
+    pipe.lrange(key, offset, offset + limit - 1)
+    pipe.llen(key)
+    raw_entries, total = cast(tuple[list[str | bytes], int], tuple(pipe.execute()))
+    letters = [letter for raw in raw_entries if (letter := _decode_entry(raw)) is not None]
+    return letters, int(total)
+
+
+def replay_dead_letters(
+    *,
+    rate_per_second: float,
+    task_type: str | None = None,
+    board_id: str | None = None,
+    ids: Collection[str] | None = None,
+    limit: int | None = None,
+    queue_name: str | None = None,
+    redis_url: str | None = None,
+) -> int:
+    """Put matching dead letters back on their lane, oldest first, ``rate_per_second`` apart.
+
+    Replayed envelopes start over with zero attempts but keep their failure history.
+    Returns how many entries were replayed.
+    """
+    if rate_per_second <= 0:
+        raise ValueError("rate_per_second must be positive")
+    letters = list_dead_letters(
+        task_type=task_type,
+        board_id=board_id,
+        ids=ids,
+        queue_name=queue_name,
+        redis_url=redis_url,
+    )
+    letters.reverse()
+    if limit is not None:
+        letters = letters[:limit]
+    if not letters:
+        return 0
+
+    client = _redis_client(redis_url=redis_url or settings.rq_redis_url)
+    client.script_load(_REPLAY_SCRIPT)
+    start = _now_seconds()
+    pipe = client.pipeline(transaction=False)
+    for index, letter in enumerate(letters):
+        envelope = replace(letter.task, attempts=0)
+        pipe.evalsha(
+            _REPLAY_SHA,
+            2,
+            dead_letter_key(letter.queue_name),
+            _scheduled_queue_name(letter.queue_name),
+            letter.raw,
+            repr(start + index / rate_per_second),
+            envelope.to_json(),
+        )
+    results = pipe.execute()
+    replayed = [letter for letter, result in zip(letters, results, strict=True) if result]
+    for lane in {letter.queue_name for letter in replayed}:
+        _record_counts(
+            client,
+            lane,
+            STATS_COUNTER_ENQUEUED,
+            (letter.task.task_type for letter in replayed if letter.queue_name == lane),
+        )
+    logger.info(
+        "rq.queue.dead_letters_replayed",
+        extra={
+            "count": len(replayed),
+            "task_type": task_type,
+            "board_id": board_id,
+            "rate_per_second": rate_per_second,
+        },
+    )
+    return len(replayed)
@@ -0,0 +1,257 @@
+"""Lease-based, at-least-once dequeue for the generic Redis queue.
+
+Plain :func:`app.services.queue.dequeue_tasks` pops envelopes with ``BRPOP``/``RPOP``, so
+a worker that dies mid-handler loses whatever it popped. In lease mode envelopes are moved
+(``LMOVE``/``BLMOVE``) into a per-worker processing list instead, and each worker holds a
+lease per lane in a ZSET scored by its expiry. The worker acknowledges envelopes once their
+handler (and any retry bookkeeping) is done and keeps renewing its lease while alive. Any
+worker can reap expired leases: the dead worker's processing list is moved back onto the
+ready list, oldest first, so in-flight deliveries survive crashes and rolling deploys.
+
+Handlers must tolerate redelivery: a worker that stalls past its lease may see its
+envelopes run again elsewhere.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+from collections.abc import Sequence
+from dataclasses import replace
+from typing import cast
+from uuid import uuid4
+
+import redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.queue import (
+    STATS_COUNTER_DEQUEUED,
+    QueuedTask,
+    TaskReceipt,
+    _decode_task,
+    _drain_ready_scheduled_tasks,
+    _now_seconds,
+    _queue_names,
+    _record_counts,
+    _redis_client,
+    _run_script,
+    _script_sha,
+)
+
+logger = get_logger(__name__)
+
+_PROCESSING_INFIX = ":processing:"
+_LEASES_SUFFIX = ":leases"
+
+# Move up to ARGV[1] envelopes from the ready list (KEYS[1]) to the processing list (KEYS[2])
+# in one round trip, oldest first.
+_CLAIM_SCRIPT = """
+local claimed = {}
+for _ = 1, tonumber(ARGV[1]) do
+    local raw = redis.call('LMOVE', KEYS[1], KEYS[2], 'RIGHT', 'LEFT')
+    if not raw then
+        break
+    end
+    table.insert(claimed, raw)
+end
+return claimed
+"""
+_CLAIM_SHA = _script_sha(_CLAIM_SCRIPT)
+
+# Re-queue the processing lists of every worker whose lease in KEYS[1] expired by ARGV[1].
+# Processing lists are named ARGV[2] .. worker id; envelopes go back onto the consuming end
+# of the ready list (KEYS[2]) with the oldest next in line. Returns how many were re-queued.
+_REAP_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+local moved = 0
+for _, worker in ipairs(expired) do
+    local processing = ARGV[2] .. worker
+    while redis.call('LMOVE', processing, KEYS[2], 'LEFT', 'RIGHT') do
+        moved = moved + 1
+    end
+    redis.call('ZREM', KEYS[1], worker)
+end
+return moved
+"""
+_REAP_SHA = _script_sha(_REAP_SCRIPT)
+
+_worker_id: str | None = None
+
+
+def worker_id() -> str:
+    """Return this process's lease owner id (host, pid and a per-process nonce)."""
+    global _worker_id
+    if _worker_id is None:
+        _worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+    return _worker_id
+
+
+def processing_key(queue_name: str, owner: str) -> str:
+    return f"{queue_name}{_PROCESSING_INFIX}{owner}"
+
+
+def leases_key(queue_name: str) -> str:
+    return f"{queue_name}{_LEASES_SUFFIX}"
+
+
+def renew_leases(
+    queue_name: str | Sequence[str],
+    *,
+    owner: str | None = None,
+    lease_seconds: float | None = None,
+    redis_url: str | None = None,
+) -> None:
+    """Extend this worker's lease on every lane in ``queue_name``."""
+    expires_at = _now_seconds() + (lease_seconds or settings.rq_lease_seconds)
+    client = _redis_client(redis_url=redis_url)
+    pipe = client.pipeline(transaction=False)
+    for name in _queue_names(queue_name):
+        pipe.zadd(leases_key(name), {owner or worker_id(): expires_at})
+    pipe.execute()
+
+
+def _claim(
+    client: redis.Redis,
+    name: str,
+    owner: str,
+    max_items: int,
+) -> list[str | bytes]:
+    return cast(
+        list[str | bytes],
+        _run_script(
+            client,
+            script=_CLAIM_SCRIPT,
+            sha=_CLAIM_SHA,
+            keys=[name, processing_key(name, owner)],
+            args=[str(max_items)],
+        ),
+    )
+
+
+def _decode_claimed(
+    client: redis.Redis,
+    name: str,
+    owner: str,
+    raw_items: list[str | bytes],
+) -> list[QueuedTask]:
+    tasks: list[QueuedTask] = []
+    for raw in raw_items:
+        text = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+        receipt = TaskReceipt(processing_key=processing_key(name, owner), raw=text)
+        try:
+            task = _decode_task(text, name)
+        except Exception:
+            # Already logged; drop it so it is not redelivered forever.
+            client.lrem(receipt.processing_key, 1, text)
+            continue
+        tasks.append(replace(task, receipt=receipt))
+    _record_counts(client, name, STATS_COUNTER_DEQUEUED, (task.task_type for task in tasks))
+    return tasks
+
+
+def dequeue_tasks_leased(
+    queue_name: str | Sequence[str],
+    *,
+    max_items: int,
+    owner: str | None = None,
+    redis_url: str | None = None,
+    block: bool = False,
+    block_timeout: float = 0,
+) -> list[QueuedTask]:
+    """Lease up to ``max_items`` envelopes from the first lane that has any.
+
+    Lanes are tried in the given order without blocking. When ``block`` is set and all are
+    empty, waits with ``BLMOVE`` on the first lane only (``BLMOVE`` takes a single source),
+    bounded by ``block_timeout`` and the next scheduled due time, so other lanes are
+    re-checked on the caller's next round. Every returned task carries a receipt for
+    :func:`ack_tasks`.
+    """
+    names = _queue_names(queue_name)
+    owner = owner or worker_id()
+    client = _redis_client(redis_url=redis_url)
+    renew_leases(names, owner=owner, redis_url=redis_url)
+    next_delays = [
+        delay
+        for delay in (_drain_ready_scheduled_tasks(client, name) for name in names)
+        if delay is not None
+    ]
+    for name in names:
+        claimed = _claim(client, name, owner, max_items)
+        if claimed:
+            return _decode_claimed(client, name, owner, claimed)
+    if not block:
+        return []
+
+    timeout = max(0.0, float(block_timeout))
+    if next_delays:
+        timeout = min(timeout, min(next_delays)) if timeout else min(next_delays)
+    first = names[0]
+    raw = cast(
+        str | bytes | None,
+        client.blmove(
+            first,
+            processing_key(first, owner),
+            timeout,  # type: ignore[arg-type]  # fractional timeouts are valid since Redis 6
+            "RIGHT",
+            "LEFT",
+        ),
+    )
+    if raw is None:
+        return []
+    claimed = [raw, *(_claim(client, first, owner, max_items - 1) if max_items > 1 else [])]
+    return _decode_claimed(client, first, owner, claimed)
+
+
+def ack_tasks(tasks: Sequence[QueuedTask], *, redis_url: str | None = None) -> int:
+    """Drop finished envelopes from their processing lists; returns how many were found."""
+    leased = [task.receipt for task in tasks if task.receipt is not None]
+    if not leased:
+        return 0
+    client = _redis_client(redis_url=redis_url)
+    pipe = client.pipeline(transaction=False)
+    for receipt in leased:
+        pipe.lrem(receipt.processing_key, 1, receipt.raw)
+    return sum(int(removed) for removed in pipe.execute())
+
+
+def reap_expired_leases(
+    queue_name: str | Sequence[str],
+    *,
+    redis_url: str | None = None,
+) -> int:
+    """Re-queue envelopes held by workers whose lease expired; returns how many moved."""
+    client = _redis_client(redis_url=redis_url)
+    now = repr(_now_seconds())
+    recovered = 0
+    for name in _queue_names(queue_name):
+        recovered += int(
+            _run_script(
+                client,
+                script=_REAP_SCRIPT,
+                sha=_REAP_SHA,
+                keys=[leases_key(name), name],
+                args=[now, f"{name}{_PROCESSING_INFIX}"],
+            ),
+        )
+    if recovered:
+        logger.warning(
+            "rq.queue.leases_reaped",
+            extra={"queue_names": _queue_names(queue_name), "count": recovered},
+        )
+    return recovered
+
+
+def release_leases(
+    queue_name: str | Sequence[str],
+    *,
+    owner: str | None = None,
+    redis_url: str | None = None,
+) -> int:
+    """Give up this worker's leases now (graceful shutdown) and re-queue what it held."""
+    client = _redis_client(redis_url=redis_url)
+    pipe = client.pipeline(transaction=False)
+    for name in _queue_names(queue_name):
+        pipe.zadd(leases_key(name), {owner or worker_id(): 0})
+    pipe.execute()
+    return reap_expired_leases(queue_name, redis_url=redis_url)
@@ -0,0 +1,260 @@
+"""Queue observability: handler latency histograms and point-in-time queue snapshots.
+
+Enqueue, dequeue, retry and drop counters are bumped by :mod:`app.services.queue` itself;
+this module adds handler latency recording for the worker, drop counts for work lost before
+it reached the queue, and reads everything back for the admin endpoint. All stats live in Redis next to the queue, so every worker replica and API
+process contributes to (and sees) the same numbers.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections.abc import Sequence
+from typing import Any
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.queue_stats import (
+    QueueHandlerLatency,
+    QueueLaneStats,
+    QueueLatencyBucket,
+    QueueStats,
+    QueueTaskTypeStats,
+)
+from app.services.queue import (
+    STATS_COUNTER_DEQUEUED,
+    STATS_COUNTER_DROPPED,
+    STATS_COUNTER_ENQUEUED,
+    STATS_COUNTER_RETRIED,
+    STATS_INTERVAL_SECONDS,
+    _async_redis_client,
+    _now_seconds,
+    _record_counts_async,
+    _scheduled_queue_name,
+    lane_queue_name,
+    stats_interval,
+    stats_key,
+)
+
+logger = get_logger(__name__)
+
+# Upper bounds (milliseconds) of the handler latency buckets; slower calls land in "inf".
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+    30000,
+    60000,
+)
+_OVERFLOW_BUCKET = "inf"
+_COUNTERS = (
+    STATS_COUNTER_ENQUEUED,
+    STATS_COUNTER_DEQUEUED,
+    STATS_COUNTER_RETRIED,
+    STATS_COUNTER_DROPPED,
+)
+_RATE_COUNTERS = (STATS_COUNTER_ENQUEUED, STATS_COUNTER_DEQUEUED)
+
+
+def _latency_key(queue_name: str, task_type: str) -> str:
+    return stats_key(queue_name, f"latency:{task_type}")
+
+
+def _bucket_field(elapsed_ms: float) -> str:
+    index = bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+    if index >= len(LATENCY_BUCKETS_MS):
+        return f"le:{_OVERFLOW_BUCKET}"
+    return f"le:{LATENCY_BUCKETS_MS[index]:g}"
+
+
+async def record_handler_latency(
+    task_type: str,
+    elapsed_seconds: float,
+    *,
+    failed: bool,
+    queue_name: str | None = None,
+    redis_url: str | None = None,
+) -> None:
+    """Add one handler call to the latency histogram of ``task_type``.
+
+    Best effort: a Redis failure is logged at debug level and never fails the handler.
+    """
+    if not settings.rq_stats_enabled:
+        return
+    elapsed_ms = max(0.0, elapsed_seconds * 1000)
+    key = _latency_key(queue_name or settings.rq_queue_name, task_type)
+    try:
+        client = _async_redis_client(redis_url=redis_url or settings.rq_redis_url)
+        pipe = client.pipeline(transaction=False)
+        pipe.hincrby(key, _bucket_field(elapsed_ms), 1)
+        pipe.hincrby(key, "count", 1)
+        pipe.hincrbyfloat(key, "sum_ms", elapsed_ms)
+        if failed:
+            pipe.hincrby(key, "failed", 1)
+        await pipe.execute()
+    except Exception as exc:
+        logger.debug(
+            "rq.queue.stats_failed",
+            extra={"task_type": task_type, "counter": "latency", "error": str(exc)},
+        )
+
+
+async def record_dropped(
+    task_type: str,
+    count: int = 1,
+    *,
+    queue_name: str | None = None,
+    redis_url: str | None = None,
+) -> None:
+    """Count ``count`` items of ``task_type`` that were lost before they could be enqueued.
+
+    They are reported in ``dropped_total`` next to dead-lettered tasks. Best effort, like the
+    latency histogram.
+    """
+    client = _async_redis_client(redis_url=redis_url or settings.rq_redis_url)
+    await _record_counts_async(
+        client,
+        queue_name or settings.rq_queue_name,
+        STATS_COUNTER_DROPPED,
+        [task_type] * count,
+    )
+
+
+def _text(value: bytes | str) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _int_hash(raw: dict[Any, Any]) -> dict[str, int]:
+    return {_text(field): int(value) for field, value in raw.items()}
+
+
+def _percentile(buckets: list[QueueLatencyBucket], total: int, quantile: float) -> float | None:
+    """Return the upper bound of the bucket holding ``quantile`` of the observations."""
+    if total <= 0:
+        return None
+    rank = quantile * total
+    for bucket in buckets:
+        if bucket.count >= rank:
+            return bucket.le_ms if bucket.le_ms is not None else LATENCY_BUCKETS_MS[-1]
+    return LATENCY_BUCKETS_MS[-1]
+
+
+def _latency_from_hash(raw: dict[Any, Any]) -> QueueHandlerLatency | None:
+    fields = {_text(field): _text(value) for field, value in raw.items()}
+    total = int(fields.get("count", 0))
+    if total <= 0:
+        return None
+    buckets: list[QueueLatencyBucket] = []
+    cumulative = 0
+    for bound in LATENCY_BUCKETS_MS:
+        cumulative += int(fields.get(f"le:{bound:g}", 0))
+        buckets.append(QueueLatencyBucket(le_ms=bound, count=cumulative))
+    cumulative += int(fields.get(f"le:{_OVERFLOW_BUCKET}", 0))
+    buckets.append(QueueLatencyBucket(le_ms=None, count=cumulative))
+    return QueueHandlerLatency(
+        count=total,
+        failed=int(fields.get("failed", 0)),
+        sum_ms=float(fields.get("sum_ms", 0)),
+        p50_ms=_percentile(buckets, total, 0.5),
+        p99_ms=_percentile(buckets, total, 0.99),
+        buckets=buckets,
+    )
+
+
+async def collect_queue_stats(
+    *,
+    queue_name: str | None = None,
+    lanes: Sequence[str] | None = None,
+    rate_window_seconds: int = 300,
+    redis_url: str | None = None,
+) -> QueueStats:
+    """Read a queue snapshot in two pipelined round trips.
+
+    Rates average the last ``rate_window_seconds`` worth of completed stats intervals, so
+    they trail real time by at most one interval.
+    """
+    base_name = queue_name or settings.rq_queue_name
+    lane_names = list(lanes if lanes is not None else settings.rq_lane_weights)
+    intervals_in_window = max(1, rate_window_seconds // STATS_INTERVAL_SECONDS)
+    now = _now_seconds()
+    current_interval = stats_interval(now)
+    window_intervals = range(current_interval - intervals_in_window, current_interval)
+    client = _async_redis_client(redis_url=redis_url or settings.rq_redis_url)
+
+    pipe = client.pipeline(transaction=False)
+    for lane in lane_names:
+        ready_name = lane_queue_name(base_name, lane)
+        pipe.llen(ready_name)
+        pipe.zcard(_scheduled_queue_name(ready_name))
+        pipe.zrange(_scheduled_queue_name(ready_name), 0, 0, withscores=True)
+    for counter in _COUNTERS:
+        pipe.hgetall(stats_key(base_name, counter))
+    for counter in _RATE_COUNTERS:
+        for interval in window_intervals:
+            pipe.hgetall(stats_key(base_name, counter, interval))
+    results = list(await pipe.execute())
+
+    lane_stats: list[QueueLaneStats] = []
+    for lane in lane_names:
+        ready_depth, scheduled_size, oldest = results[:3]
+        del results[:3]
+        oldest_score = float(oldest[0][1]) if oldest else None
+        lane_stats.append(
+            QueueLaneStats(
+                lane=lane,
+                queue_name=lane_queue_name(base_name, lane),
+                ready_depth=int(ready_depth),
+                scheduled_size=int(scheduled_size),
+                oldest_due_lag_seconds=(
+                    max(0.0, now - oldest_score) if oldest_score is not None else 0.0
+                ),
+            ),
+        )
+    totals = {counter: _int_hash(results.pop(0)) for counter in _COUNTERS}
+    windowed: dict[str, dict[str, int]] = {}
+    for counter in _RATE_COUNTERS:
+        sums: dict[str, int] = {}
+        for _ in window_intervals:
+            for task_type, amount in _int_hash(results.pop(0)).items():
+                sums[task_type] = sums.get(task_type, 0) + amount
+        windowed[counter] = sums
+
+    task_types = sorted({task_type for counts in totals.values() for task_type in counts})
+    latency_hashes: list[dict[Any, Any]] = []
+    if task_types:
+        latency_pipe = client.pipeline(transaction=False)
+        for task_type in task_types:
+            latency_pipe.hgetall(_latency_key(base_name, task_type))
+        latency_hashes = list(await latency_pipe.execute())
+
+    window_seconds = len(window_intervals) * STATS_INTERVAL_SECONDS
+    return QueueStats(
+        queue_name=base_name,
+        rate_window_seconds=window_seconds,
+        lanes=lane_stats,
+        task_types=[
+            QueueTaskTypeStats(
+                task_type=task_type,
+                enqueued_total=totals[STATS_COUNTER_ENQUEUED].get(task_type, 0),
+                dequeued_total=totals[STATS_COUNTER_DEQUEUED].get(task_type, 0),
+                retried_total=totals[STATS_COUNTER_RETRIED].get(task_type, 0),
+                dropped_total=totals[STATS_COUNTER_DROPPED].get(task_type, 0),
+                enqueue_rate_per_second=(
+                    windowed[STATS_COUNTER_ENQUEUED].get(task_type, 0) / window_seconds
+                ),
+                dequeue_rate_per_second=(
+                    windowed[STATS_COUNTER_DEQUEUED].get(task_type, 0) / window_seconds
+                ),
+                latency=_latency_from_hash(raw),
+            )
+            for task_type, raw in zip(task_types, latency_hashes, strict=True)
+        ],
+    )
@@ -4,18 +4,33 @@ from __future__ import annotations
 
 import asyncio
 import random
+import time
+from collections import deque
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.openclaw.lifecycle_queue import QUEUE_LANE as LIFECYCLE_QUEUE_LANE
 from app.services.openclaw.lifecycle_queue import TASK_TYPE as LIFECYCLE_RECONCILE_TASK_TYPE
 from app.services.openclaw.lifecycle_queue import (
+    lifecycle_dedup,
     requeue_lifecycle_queue_task,
 )
 from app.services.openclaw.lifecycle_reconcile import process_lifecycle_queue_task
-from app.services.queue import QueuedTask, dequeue_task
+from app.services.queue import (
+    QUEUE_LANE_DEFAULT,
+    QueuedTask,
+    close_async_redis_clients,
+    close_redis_clients,
+    lane_queue_name,
+    with_failure,
+)
+from app.services.queue_backend import QueueBackend, RedisQueueBackend
+from app.services.queue_leases import reap_expired_leases, release_leases, renew_leases
+from app.services.queue_stats import record_handler_latency
 from app.services.webhooks.dispatch import (
+    process_webhook_queue_batch,
     process_webhook_queue_task,
     requeue_webhook_queue_task,
 )
@@ -23,6 +38,7 @@ from app.services.webhooks.queue import TASK_TYPE as WEBHOOK_TASK_TYPE
 
 logger = get_logger(__name__)
 _WORKER_BLOCK_TIMEOUT_SECONDS = 5.0
+_THROTTLE_PRUNE_THRESHOLD = 1024
 
 
 @dataclass(frozen=True)
@@ -30,6 +46,27 @@ class _TaskHandler:
     handler: Callable[[QueuedTask], Awaitable[None]]
     attempts_to_delay: Callable[[int], float]
     requeue: Callable[[QueuedTask, float], bool]
+    throttle_key: Callable[[QueuedTask], str | None] = lambda task: None
+    # Optional handler for several tasks sharing one throttle key (one target) at once.
+    batch_handler: Callable[[list[QueuedTask]], Awaitable[None]] | None = None
+    lane: str = QUEUE_LANE_DEFAULT
+    # Scheduling key and version of keyed tasks, kept when the worker defers one.
+    dedup: Callable[[QueuedTask], tuple[str, int] | None] = lambda task: None
+
+
+@dataclass(frozen=True)
+class _WorkUnit:
+    handler: _TaskHandler
+    tasks: list[QueuedTask]
+    target: str | None
+
+
+def _payload_target(prefix: str, field: str) -> Callable[[QueuedTask], str | None]:
+    def _key(task: QueuedTask) -> str | None:
+        value = task.payload.get(field)
+        return f"{prefix}:{value}" if value else None
+
+    return _key
 
 
 _TASK_HANDLERS: dict[str, _TaskHandler] = {
@@ -40,6 +77,9 @@ _TASK_HANDLERS: dict[str, _TaskHandler] = {
             settings.rq_dispatch_retry_max_seconds,
         ),
         requeue=lambda task, delay: requeue_lifecycle_queue_task(task, delay_seconds=delay),
+        throttle_key=_payload_target("gateway", "gateway_id"),
+        lane=LIFECYCLE_QUEUE_LANE,
+        dedup=lifecycle_dedup,
     ),
     WEBHOOK_TASK_TYPE: _TaskHandler(
         handler=process_webhook_queue_task,
@@ -48,6 +88,8 @@ _TASK_HANDLERS: dict[str, _TaskHandler] = {
             settings.rq_dispatch_retry_max_seconds,
         ),
         requeue=lambda task, delay: requeue_webhook_queue_task(task, delay_seconds=delay),
+        throttle_key=_payload_target("board", "board_id"),
+        batch_handler=process_webhook_queue_batch,
     ),
 }
 
@@ -56,67 +98,416 @@ def _compute_jitter(base_delay: float) -> float:
     return random.uniform(0, min(settings.rq_dispatch_retry_max_seconds / 10, base_delay * 0.1))
 
 
-async def flush_queue(*, block: bool = False, block_timeout: float = 0) -> int:
-    """Consume one queue batch and dispatch by task type."""
+class _TargetThrottle:
+    """Per-target dispatch spacing used by the concurrent worker mode."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self._interval = max(0.0, interval_seconds)
+        self._next_allowed_at: dict[str, float] = {}
+
+    def claim(self, key: str | None) -> float:
+        """Reserve a dispatch slot for ``key`` or return the seconds until one opens."""
+        if key is None or self._interval == 0:
+            return 0.0
+        now = time.monotonic()
+        wait = self._next_allowed_at.get(key, now) - now
+        if wait > 0:
+            return wait
+        self._next_allowed_at[key] = now + self._interval
+        if len(self._next_allowed_at) > _THROTTLE_PRUNE_THRESHOLD:
+            self._next_allowed_at = {
+                target: allowed_at
+                for target, allowed_at in self._next_allowed_at.items()
+                if allowed_at > now
+            }
+        return 0.0
+
+
+def _worker_lanes() -> list[str]:
+    return sorted({handler.lane for handler in _TASK_HANDLERS.values()} | {QUEUE_LANE_DEFAULT})
+
+
+def _worker_queue_names() -> list[str]:
+    return [lane_queue_name(settings.rq_queue_name, lane) for lane in _worker_lanes()]
+
+
+def _default_backend() -> QueueBackend:
+    return RedisQueueBackend(
+        redis_url=settings.rq_redis_url,
+        leased=settings.rq_reliable_dequeue,
+    )
+
+
+async def _ack(tasks: list[QueuedTask], backend: QueueBackend) -> None:
+    """Acknowledge leased tasks; a failed ack only means the lease reaper redelivers them."""
+    if not any(task.receipt is not None for task in tasks):
+        return
+    try:
+        await asyncio.to_thread(backend.ack, tasks)
+    except Exception as exc:
+        logger.warning(
+            "queue.worker.ack_failed",
+            extra={"task_type": tasks[0].task_type, "count": len(tasks), "error": str(exc)},
+        )
+
+
+class _LaneScheduler:
+    """Weighted fair dequeue across queue lanes.
+
+    Lanes are visited in smooth weighted round-robin order (``rq_lane_weights``). Batches
+    popped from a lane are buffered locally as work units, and every pick re-checks lanes
+    ahead of it in the rotation, so a deep webhook backlog delays high-priority work by at
+    most one unit per worker slot.
+    """
+
+    def __init__(self, weights: dict[str, int], backend: QueueBackend) -> None:
+        self._weights = {lane: max(1, weights.get(lane, 1)) for lane in _worker_lanes()}
+        self._backend = backend
+        self._credit = dict.fromkeys(self._weights, 0)
+        self._buffers: dict[str, deque[_WorkUnit]] = {lane: deque() for lane in self._weights}
+
+    def _rotation(self) -> list[str]:
+        total = sum(self._weights.values())
+        for lane, weight in self._weights.items():
+            self._credit[lane] += weight
+        chosen = max(self._credit, key=lambda lane: self._credit[lane])
+        self._credit[chosen] -= total
+        rest = sorted(
+            (lane for lane in self._weights if lane != chosen),
+            key=lambda lane: -self._weights[lane],
+        )
+        return [chosen, *rest]
+
+    def _buffer(self, tasks: list[QueuedTask]) -> None:
+        units, unhandled = _build_work_units(tasks)
+        for unit in units:
+            self._buffers.setdefault(unit.handler.lane, deque()).append(unit)
+        if unhandled:
+            _dead_letter_unhandled(unhandled, self._backend)
+
+    def _fetch(self, lanes: list[str], *, block: bool, block_timeout: float) -> bool:
+        tasks = self._backend.dequeue(
+            [lane_queue_name(settings.rq_queue_name, lane) for lane in lanes],
+            max_items=settings.rq_dequeue_batch_size,
+            block=block,
+            block_timeout=block_timeout,
+        )
+        self._buffer(tasks)
+        return bool(tasks)
+
+    def next_unit(self, *, block: bool, block_timeout: float) -> _WorkUnit | None:
+        """Return the next work unit to dispatch, or ``None`` once the queue is drained."""
+        rotation = self._rotation()
+        for lane in rotation:
+            if not self._buffers[lane]:
+                self._fetch([lane], block=False, block_timeout=0)
+            if self._buffers[lane]:
+                return self._buffers[lane].popleft()
+        if block and self._fetch(rotation, block=True, block_timeout=block_timeout):
+            for lane in rotation:
+                if self._buffers[lane]:
+                    return self._buffers[lane].popleft()
+        for buffered in self._buffers.values():
+            if buffered:
+                return buffered.popleft()
+        return None
+
+
+def _requeue_failed(task: QueuedTask, handler: _TaskHandler) -> bool:
+    """Retry or dead-letter a failed task; False when neither reached Redis."""
+    base_delay = handler.attempts_to_delay(task.attempts)
+    delay = base_delay + _compute_jitter(base_delay)
+    try:
+        requeued = handler.requeue(task, delay)
+    except Exception as exc:
+        logger.warning(
+            "queue.worker.requeue_failed",
+            extra={
+                "task_type": task.task_type,
+                "attempt": task.attempts,
+                "error": str(exc),
+            },
+        )
+        return False
+    if not requeued:
+        logger.warning(
+            "queue.worker.drop_task",
+            extra={
+                "task_type": task.task_type,
+                "attempt": task.attempts,
+            },
+        )
+    return True
+
+
+async def _dispatch_unit(unit: _WorkUnit, backend: QueueBackend) -> int:
+    """Run one work unit and return how many tasks it completed.
+
+    Only tasks that were handled, retried or dead-lettered are acknowledged; the rest stay
+    leased so the lease reaper redelivers them.
+    """
+    first = unit.tasks[0]
+    started = time.monotonic()
+    settled: list[QueuedTask] = []
+    try:
+        if len(unit.tasks) > 1 and unit.handler.batch_handler is not None:
+            await unit.handler.batch_handler(unit.tasks)
+        else:
+            await unit.handler.handler(first)
+        settled = unit.tasks
+        await record_handler_latency(
+            first.task_type,
+            time.monotonic() - started,
+            failed=False,
+        )
+        logger.info(
+            "queue.worker.success",
+            extra={
+                "task_type": first.task_type,
+                "attempt": first.attempts,
+                "count": len(unit.tasks),
+            },
+        )
+        return len(unit.tasks)
+    except Exception as exc:
+        logger.exception(
+            "queue.worker.failed",
+            extra={
+                "task_type": first.task_type,
+                "attempt": first.attempts,
+                "count": len(unit.tasks),
+                "error": str(exc),
+            },
+        )
+        await record_handler_latency(
+            first.task_type,
+            time.monotonic() - started,
+            failed=True,
+        )
+        settled = [
+            task
+            for task in unit.tasks
+            if _requeue_failed(with_failure(task, str(exc)), unit.handler)
+        ]
+        return 0
+    finally:
+        await _ack(settled, backend)
+
+
+def _resolve_handler(task: QueuedTask) -> _TaskHandler | None:
+    handler = _TASK_HANDLERS.get(task.task_type)
+    if handler is None:
+        logger.warning(
+            "queue.worker.task_unhandled",
+            extra={
+                "task_type": task.task_type,
+                "queue_name": settings.rq_queue_name,
+            },
+        )
+    return handler
+
+
+def _dead_letter_unhandled(tasks: list[QueuedTask], backend: QueueBackend) -> None:
+    """Dead-letter and acknowledge tasks of unknown types so leases never redeliver them."""
+    tasks = [
+        task
+        for task in tasks
+        if backend.dead_letter(
+            task,
+            settings.rq_queue_name,
+            error=f"unknown task type: {task.task_type}",
+        )
+    ]
+    if not any(task.receipt is not None for task in tasks):
+        return
+    try:
+        backend.ack(tasks)
+    except Exception as exc:
+        logger.warning(
+            "queue.worker.ack_failed",
+            extra={"task_type": tasks[0].task_type, "count": len(tasks), "error": str(exc)},
+        )
+
+
+def _build_work_units(
+    tasks: list[QueuedTask],
+) -> tuple[list[_WorkUnit], list[QueuedTask]]:
+    """Group batch-capable tasks per (type, target); every other task is its own unit.
+
+    Tasks without a registered handler are returned separately.
+    """
+    units: list[_WorkUnit] = []
+    unhandled: list[QueuedTask] = []
+    batched: dict[tuple[str, str], _WorkUnit] = {}
+    for task in tasks:
+        handler = _resolve_handler(task)
+        if handler is None:
+            unhandled.append(task)
+            continue
+        target = handler.throttle_key(task)
+        if handler.batch_handler is None or target is None:
+            units.append(_WorkUnit(handler=handler, tasks=[task], target=target))
+            continue
+        unit = batched.get((task.task_type, target))
+        if unit is None:
+            unit = _WorkUnit(handler=handler, tasks=[], target=target)
+            batched[(task.task_type, target)] = unit
+            units.append(unit)
+        unit.tasks.append(task)
+    return units, unhandled
+
+
+def _defer(task: QueuedTask, handler: _TaskHandler, backend: QueueBackend, delay: float) -> bool:
+    """Put a dequeued task back for later; keyed tasks keep their dedup key and version."""
+    dedup_key, version = handler.dedup(task) or (None, 0)
+    return backend.enqueue(
+        task,
+        lane_queue_name(settings.rq_queue_name, handler.lane),
+        delay_seconds=delay,
+        dedup_key=dedup_key,
+        version=version,
+        count_enqueued=False,
+    )
+
+
+async def _dispatch_throttled(
+    unit: _WorkUnit,
+    throttle: _TargetThrottle,
+    backend: QueueBackend,
+) -> int:
+    wait = throttle.claim(unit.target)
+    if wait > 0:
+        # Hand tasks back to the scheduler instead of parking a worker slot on a hot target.
+        deferred = [
+            await asyncio.to_thread(_defer, task, unit.handler, backend, wait)
+            for task in unit.tasks
+        ]
+        await _ack([task for task, ok in zip(unit.tasks, deferred, strict=True) if ok], backend)
+        if all(deferred):
+            logger.debug(
+                "queue.worker.throttled",
+                extra={
+                    "task_type": unit.tasks[0].task_type,
+                    "target": unit.target,
+                    "count": len(unit.tasks),
+                    "delay_seconds": wait,
+                },
+            )
+            return 0
+        unit = _WorkUnit(
+            handler=unit.handler,
+            tasks=[task for task, ok in zip(unit.tasks, deferred, strict=True) if not ok],
+            target=unit.target,
+        )
+        await asyncio.sleep(wait)
+        throttle.claim(unit.target)
+    return await _dispatch_unit(unit, backend)
+
+
+async def _flush_queue_concurrently(
+    *,
+    concurrency: int,
+    block: bool,
+    block_timeout: float,
+    backend: QueueBackend,
+) -> int:
+    slots = asyncio.Semaphore(concurrency)
+    scheduler = _LaneScheduler(settings.rq_lane_weights, backend)
+    throttle = _TargetThrottle(settings.rq_dispatch_throttle_seconds)
+    in_flight: set[asyncio.Task[int]] = set()
     processed = 0
+
+    def _on_done(job: asyncio.Task[int]) -> None:
+        nonlocal processed
+        in_flight.discard(job)
+        slots.release()
+        if job.cancelled():
+            return
+        exc = job.exception()
+        if exc is not None:
+            logger.error(
+                "queue.worker.dispatch_crashed",
+                extra={"queue_name": settings.rq_queue_name, "error": str(exc)},
+            )
+        else:
+            processed += job.result()
+
     while True:
+        await slots.acquire()
         try:
-            task = dequeue_task(
-                settings.rq_queue_name,
-                redis_url=settings.rq_redis_url,
+            # Dequeue may block on BRPOP, so keep it off the loop that runs the handlers.
+            unit = await asyncio.to_thread(
+                scheduler.next_unit,
                 block=block,
                 block_timeout=block_timeout,
             )
         except Exception:
+            slots.release()
             logger.exception(
                 "queue.worker.dequeue_failed",
                 extra={"queue_name": settings.rq_queue_name},
             )
             continue
 
-        if task is None:
+        if unit is None:
+            slots.release()
             break
 
-        handler = _TASK_HANDLERS.get(task.task_type)
-        if handler is None:
-            logger.warning(
-                "queue.worker.task_unhandled",
-                extra={
-                    "task_type": task.task_type,
-                    "queue_name": settings.rq_queue_name,
-                },
-            )
-            continue
+        job = asyncio.create_task(_dispatch_throttled(unit, throttle, backend))
+        in_flight.add(job)
+        job.add_done_callback(_on_done)
 
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+    return processed
+
+
+async def flush_queue(
+    *,
+    block: bool = False,
+    block_timeout: float = 0,
+    concurrency: int | None = None,
+    backend: QueueBackend | None = None,
+) -> int:
+    """Consume one queue batch and dispatch by task type.
+
+    Lanes are served in weighted fair order (see :class:`_LaneScheduler`). Up to
+    ``rq_dequeue_batch_size`` envelopes are popped per round trip; tasks whose handler
+    supports batching are dispatched together per target. With ``concurrency`` (default
+    ``settings.rq_worker_concurrency``) above one, up to that many work units run at once and
+    ``rq_dispatch_throttle_seconds`` spaces dispatches per target board/gateway instead of
+    sleeping after every unit. ``backend`` defaults to the Redis queue configured in
+    settings; benchmarks and tests pass an in-process one.
+    """
+    backend = backend or _default_backend()
+    workers = concurrency if concurrency is not None else settings.rq_worker_concurrency
+    if workers > 1:
+        processed = await _flush_queue_concurrently(
+            concurrency=workers,
+            block=block,
+            block_timeout=block_timeout,
+            backend=backend,
+        )
+        if processed > 0:
+            logger.info("queue.worker.batch_complete", extra={"count": processed})
+        return processed
+
+    scheduler = _LaneScheduler(settings.rq_lane_weights, backend)
+    processed = 0
+    while True:
         try:
-            await handler.handler(task)
-            processed += 1
-            logger.info(
-                "queue.worker.success",
-                extra={
-                    "task_type": task.task_type,
-                    "attempt": task.attempts,
-                },
-            )
-        except Exception as exc:
+            next_unit = scheduler.next_unit(block=block, block_timeout=block_timeout)
+        except Exception:
             logger.exception(
-                "queue.worker.failed",
-                extra={
-                    "task_type": task.task_type,
-                    "attempt": task.attempts,
-                    "error": str(exc),
-                },
+                "queue.worker.dequeue_failed",
+                extra={"queue_name": settings.rq_queue_name},
             )
-            base_delay = handler.attempts_to_delay(task.attempts)
-            delay = base_delay + _compute_jitter(base_delay)
-            if not handler.requeue(task, delay):
-                logger.warning(
-                    "queue.worker.drop_task",
-                    extra={
-                        "task_type": task.task_type,
-                        "attempt": task.attempts,
-                    },
-                )
+            continue
+
+        if next_unit is None:
+            break
+
+        processed += await _dispatch_unit(next_unit, backend)
         await asyncio.sleep(settings.rq_dispatch_throttle_seconds)
 
     if processed > 0:
@@ -124,29 +515,67 @@ async def flush_queue(*, block: bool = False, block_timeout: float = 0) -> int:
     return processed
 
 
-async def _run_worker_loop() -> None:
+async def _maintain_leases() -> None:
+    """Renew this worker's lane leases and reap expired ones until cancelled."""
+    names = _worker_queue_names()
+    interval = settings.rq_lease_seconds / 3
     while True:
         try:
-            await flush_queue(
-                block=True,
-                # Keep a finite timeout so scheduled tasks are periodically drained.
-                block_timeout=_WORKER_BLOCK_TIMEOUT_SECONDS,
-            )
+            await asyncio.to_thread(renew_leases, names, redis_url=settings.rq_redis_url)
+            await asyncio.to_thread(reap_expired_leases, names, redis_url=settings.rq_redis_url)
         except Exception:
             logger.exception(
-                "queue.worker.loop_failed",
+                "queue.worker.lease_maintenance_failed",
                 extra={"queue_name": settings.rq_queue_name},
             )
-            await asyncio.sleep(1)
+        await asyncio.sleep(interval)
+
+
+async def _run_worker_loop(concurrency: int | None = None) -> None:
+    lease_keeper = asyncio.create_task(_maintain_leases()) if settings.rq_reliable_dequeue else None
+    try:
+        while True:
+            try:
+                await flush_queue(
+                    block=True,
+                    # Keep a finite timeout so scheduled tasks are periodically drained.
+                    block_timeout=_WORKER_BLOCK_TIMEOUT_SECONDS,
+                    concurrency=concurrency,
+                )
+            except Exception:
+                logger.exception(
+                    "queue.worker.loop_failed",
+                    extra={"queue_name": settings.rq_queue_name},
+                )
+                await asyncio.sleep(1)
+    finally:
+        if lease_keeper is not None:
+            lease_keeper.cancel()
+            try:
+                await asyncio.to_thread(
+                    release_leases,
+                    _worker_queue_names(),
+                    redis_url=settings.rq_redis_url,
+                )
+            except Exception:
+                logger.exception(
+                    "queue.worker.lease_release_failed",
+                    extra={"queue_name": settings.rq_queue_name},
+                )
+        await close_async_redis_clients()
 
 
-def run_worker() -> None:
+def run_worker(*, concurrency: int | None = None) -> None:
     """RQ entrypoint for running continuous queue processing."""
     logger.info(
         "queue.worker.batch_started",
-        extra={"throttle_seconds": settings.rq_dispatch_throttle_seconds},
+        extra={
+            "throttle_seconds": settings.rq_dispatch_throttle_seconds,
+            "concurrency": concurrency or settings.rq_worker_concurrency,
+        },
     )
     try:
-        asyncio.run(_run_worker_loop())
+        asyncio.run(_run_worker_loop(concurrency))
     finally:
+        close_redis_clients()
         logger.info("queue.worker.stopped", extra={"queue_name": settings.rq_queue_name})
@@ -0,0 +1,410 @@
+"""Per-process fan-out hub that shares one fetch loop between SSE streams of a board.
+
+Without the hub every open tab ran its own fetch-and-hydrate loop, so N clients watching a
+board issued N identical queries per change and serialized N identical payloads. The hub
+keeps one :class:`_Feed` per stream key (for example ``("tasks", board_id)``). The feed
+fetches rows newer than its cursor when the change bus reports a change (or on the fallback
+poll), serializes each row once and broadcasts it to every subscriber's bounded queue. The
+feed stops when its last subscriber leaves.
+
+Every event carries its row's database sequence number (``seq``) as the SSE ``id``. A
+reconnecting ``EventSource`` sends it back as ``Last-Event-ID`` and the subscriber's one
+backfill query resumes strictly after it. This replaces the ``since`` timestamp window, which
+replayed or skipped events that shared a timestamp. Without the header the backfill starts
+at ``since``, so history from before the feed started is still delivered.
+
+The feed itself cursors on ``seq`` as well. Sequence numbers are assigned at insert, not at
+commit, so a slow transaction can commit a lower ``seq`` after a higher one. The feed
+therefore re-reads events from the last :data:`SETTLE_SECONDS` on each fetch and drops the
+ones it already sent. The window is the bound: a transaction that commits later than that
+after its insert is skipped, by the feed and by a resumed backfill alike. Feeds whose rows
+have no ``seq`` (agents) cursor on ``created_at`` instead and re-read the same window; their
+event ids must then name one version of the row so re-reads are recognised.
+
+Each subscriber buffers at most ``stream_subscriber_queue_size`` pending events. Events that
+describe the latest state of one entity (a task or an agent) carry a ``coalesce_key``; a newer one
+replaces the pending older one, so a slow reader gets each task's current state instead of
+every intermediate update. A subscriber whose buffer still fills up is disconnected rather
+than slowing the feed down. Its last message is a ``resync`` event naming the id to resume
+from, and its ``EventSource`` reconnects with ``Last-Event-ID`` and catches up from the
+database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from collections.abc import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Collection,
+    Hashable,
+    Mapping,
+)
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.time import utcnow
+from app.services.change_bus import change_bus
+
+if TYPE_CHECKING:
+    from fastapi import Request
+
+logger = get_logger(__name__)
+
+SEEN_MAX = 2000
+SETTLE_SECONDS = 2.0
+RESYNC_EVENT = "resync"
+# Reconnect delay suggested to a client dropped for falling behind.
+RESYNC_RETRY_MS = 1000
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """One serialized SSE event, shared by every subscriber of a feed."""
+
+    id: UUID
+    seq: int | None
+    created_at: datetime
+    event: str
+    data: str
+    # Pending events with the same key replace each other (only the latest state matters).
+    coalesce_key: Hashable | None = None
+    # The object ``data`` was serialized from, for per-connection encoders (read-only).
+    payload: Mapping[str, object] | None = field(default=None, compare=False)
+
+    @property
+    def buffer_key(self) -> Hashable:
+        return self.coalesce_key if self.coalesce_key is not None else self.id
+
+    def as_sse(self) -> dict[str, str]:
+        message = {"event": self.event, "data": self.data}
+        if self.seq is not None:
+            message["id"] = str(self.seq)
+        return message
+
+
+@dataclass(frozen=True)
+class StreamCursor:
+    """Where a fetch starts: strictly after sequence ``after_seq``, else at ``since``."""
+
+    after_seq: int | None = None
+    since: datetime | None = None
+
+
+StreamFetch = Callable[[StreamCursor], Awaitable[list[StreamEvent]]]
+"""Return serialized events from the given cursor, oldest first."""
+
+StreamEncode = Callable[[StreamEvent], dict[str, str]]
+"""Turn a shared event into one connection's SSE message (default :meth:`StreamEvent.as_sse`)."""
+
+
+def coalesce(events: list[StreamEvent]) -> list[StreamEvent]:
+    """Keep only the last event per coalesce key, in the order of those last events."""
+    latest: OrderedDict[Hashable, StreamEvent] = OrderedDict()
+    for event in events:
+        latest.pop(event.buffer_key, None)
+        latest[event.buffer_key] = event
+    return list(latest.values())
+
+
+def resync_message(last_event_id: str | None) -> dict[str, str]:
+    """Final message to a dropped slow subscriber, telling it where to resume."""
+    return {
+        "event": RESYNC_EVENT,
+        "data": json.dumps({"reason": "slow_consumer", "last_event_id": last_event_id}),
+        "retry": str(RESYNC_RETRY_MS),
+    }
+
+
+def last_event_id(request: Request) -> int | None:
+    """Return the sequence number a reconnecting ``EventSource`` resumes after."""
+    raw = request.headers.get("last-event-id", "").strip()
+    if not raw.isdigit():
+        return None
+    return int(raw)
+
+
+class _SeenIds:
+    """Bounded set of recently delivered event ids (fetches use ``>=`` on the cursor)."""
+
+    def __init__(self, limit: int = SEEN_MAX) -> None:
+        self._limit = limit
+        self._ids: set[UUID] = set()
+        self._order: deque[UUID] = deque()
+
+    def add(self, event_id: UUID) -> bool:
+        """Record ``event_id``; ``False`` when it was already seen."""
+        if event_id in self._ids:
+            return False
+        self._ids.add(event_id)
+        self._order.append(event_id)
+        if len(self._order) > self._limit:
+            self._ids.discard(self._order.popleft())
+        return True
+
+
+class HubSubscription:
+    """One stream's bounded, coalescing buffer of events broadcast by a feed."""
+
+    def __init__(self, max_items: int) -> None:
+        self._max_items = max_items
+        self._pending: OrderedDict[Hashable, StreamEvent] = OrderedDict()
+        self._ready = asyncio.Event()
+        self.overflowed = False
+        self.coalesced = 0
+
+    @property
+    def finished(self) -> bool:
+        """``True`` once the feed dropped this subscriber and its buffer is drained."""
+        return self.overflowed and not self._pending
+
+    def offer(self, event: StreamEvent) -> None:
+        if self.overflowed:
+            return
+        key = event.buffer_key
+        if key in self._pending:
+            # Re-queued at the end so pending events stay in feed order.
+            del self._pending[key]
+            self.coalesced += 1
+        elif len(self._pending) >= self._max_items:
+            self.overflowed = True
+            return
+        self._pending[key] = event
+        self._ready.set()
+
+    async def next(self, timeout: float) -> StreamEvent | None:
+        """Return the next event, or ``None`` when nothing arrives within ``timeout``."""
+        if not self._pending:
+            if self.overflowed:
+                return None
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                return None
+            if not self._pending:
+                return None
+        _key, event = self._pending.popitem(last=False)
+        return event
+
+
+class _Feed:
+    """One fetch loop for a stream key, broadcasting to its subscribers."""
+
+    def __init__(
+        self,
+        key: Hashable,
+        *,
+        fetch: StreamFetch,
+        board_ids: Collection[UUID],
+        entities: Collection[str],
+        poll_seconds: float,
+    ) -> None:
+        self.key = key
+        self._fetch = fetch
+        self._board_ids = board_ids
+        self._entities = entities
+        self._poll_seconds = poll_seconds
+        self.subscribers: set[HubSubscription] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        started_at = utcnow()
+        # Events older than the settle window are final; only later ones are re-read.
+        settled_seq: int | None = None
+        unsettled: deque[tuple[float, int]] = deque()
+        # Newest ``created_at`` of events without a sequence number.
+        newest_at: datetime | None = None
+        seen = _SeenIds()
+        with change_bus.subscribe(board_ids=self._board_ids, entities=self._entities) as changes:
+            while True:
+                changes.clear()
+                horizon = time.monotonic() - SETTLE_SECONDS
+                while unsettled and unsettled[0][0] < horizon:
+                    settled_seq = max(settled_seq or 0, unsettled.popleft()[1])
+                if settled_seq is not None:
+                    cursor = StreamCursor(after_seq=settled_seq)
+                elif newest_at is not None:
+                    settle = timedelta(seconds=SETTLE_SECONDS)
+                    cursor = StreamCursor(since=max(started_at, newest_at - settle))
+                else:
+                    cursor = StreamCursor(since=started_at)
+                try:
+                    events = await self._fetch(cursor)
+                except Exception as exc:
+                    logger.warning(
+                        "stream.hub.fetch_failed",
+                        extra={"key": str(self.key), "error": str(exc)},
+                    )
+                    events = []
+                for event in events:
+                    if not seen.add(event.id):
+                        continue
+                    if event.seq is not None:
+                        unsettled.append((time.monotonic(), event.seq))
+                    else:
+                        newest_at = max(newest_at or event.created_at, event.created_at)
+                    for subscriber in tuple(self.subscribers):
+                        subscriber.offer(event)
+                        if subscriber.overflowed:
+                            logger.warning(
+                                "stream.hub.subscriber_overflowed",
+                                extra={"key": str(self.key), "coalesced": subscriber.coalesced},
+                            )
+                            self.subscribers.discard(subscriber)
+                await changes.wait(self._poll_seconds)
+
+
+class StreamHub:
+    """Registry of shared feeds keyed by stream kind and board."""
+
+    def __init__(self, *, queue_size: int | None = None) -> None:
+        self._queue_size = queue_size
+        self._feeds: dict[Hashable, _Feed] = {}
+
+    def feed_count(self) -> int:
+        return len(self._feeds)
+
+    def subscriber_count(self, key: Hashable) -> int:
+        feed = self._feeds.get(key)
+        return len(feed.subscribers) if feed is not None else 0
+
+    def attach(
+        self,
+        key: Hashable,
+        *,
+        fetch: StreamFetch,
+        board_ids: Collection[UUID],
+        entities: Collection[str],
+        poll_seconds: float,
+    ) -> HubSubscription:
+        """Subscribe to the feed for ``key``, starting it on first use."""
+        subscription = HubSubscription(self._queue_size or settings.stream_subscriber_queue_size)
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = _Feed(
+                key,
+                fetch=fetch,
+                board_ids=board_ids,
+                entities=entities,
+                poll_seconds=poll_seconds,
+            )
+            self._feeds[key] = feed
+            feed.start()
+        feed.subscribers.add(subscription)
+        return subscription
+
+    def detach(self, key: Hashable, subscription: HubSubscription) -> None:
+        """Drop ``subscription`` and stop the feed once nobody is left."""
+        feed = self._feeds.get(key)
+        if feed is None:
+            return
+        feed.subscribers.discard(subscription)
+        if not feed.subscribers:
+            feed.stop()
+            del self._feeds[key]
+
+    async def stream(
+        self,
+        request: Request,
+        key: Hashable,
+        *,
+        fetch: StreamFetch,
+        since: datetime,
+        resume_after: int | None,
+        board_ids: Collection[UUID],
+        entities: Collection[str],
+        poll_seconds: float,
+        encode: StreamEncode | None = None,
+    ) -> AsyncGenerator[dict[str, str], None]:
+        """Yield SSE events for one client: its own backfill, then the shared feed.
+
+        The backfill resumes after sequence ``resume_after`` (the client's ``Last-Event-ID``)
+        when given and starts at ``since`` otherwise. ``encode`` holds per-connection state,
+        e.g. for delta encoding.
+        """
+        encode = encode or StreamEvent.as_sse
+        backfill = (
+            StreamCursor(after_seq=resume_after)
+            if resume_after is not None
+            else StreamCursor(since=since)
+        )
+        subscription = self.attach(
+            key,
+            fetch=fetch,
+            board_ids=board_ids,
+            entities=entities,
+            poll_seconds=poll_seconds,
+        )
+        resumed_at = str(resume_after) if resume_after is not None else None
+        try:
+            # Attached before the backfill, so nothing committed in between is missed.
+            seen = _SeenIds()
+            backlog = await fetch(backfill)
+            for backlog_event in backlog:
+                # Including coalesced ones, so a re-read by the feed cannot resend them.
+                seen.add(backlog_event.id)
+            for backlog_event in coalesce(backlog):
+                message = encode(backlog_event)
+                resumed_at = message.get("id", resumed_at)
+                yield message
+            while not subscription.finished:
+                if await request.is_disconnected():
+                    return
+                event = await subscription.next(poll_seconds)
+                if event is not None and seen.add(event.id):
+                    message = encode(event)
+                    resumed_at = message.get("id", resumed_at)
+                    yield message
+            yield resync_message(resumed_at)
+        finally:
+            self.detach(key, subscription)
+
+
+stream_hub = StreamHub()
+
+
+async def multiplex(
+    streams: Mapping[str, AsyncGenerator[dict[str, str], None]],
+) -> AsyncGenerator[tuple[str, dict[str, str]], None]:
+    """Interleave named SSE streams as ``(name, message)`` pairs in arrival order.
+
+    Ends as soon as any stream ends (for example a subscriber dropped for falling behind),
+    so the client reconnects and resumes every stream together.
+    """
+    pending: dict[asyncio.Future[dict[str, str]], str] = {
+        asyncio.ensure_future(anext(stream)): name for name, stream in streams.items()
+    }
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    message = future.result()
+                except StopAsyncIteration:
+                    return
+                yield name, message
+                pending[asyncio.ensure_future(anext(streams[name]))] = name
+    finally:
+        for future in pending:
+            future.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for stream in streams.values():
+            await stream.aclose()
@@ -0,0 +1,138 @@
+"""Per-process cache of hydrated task payloads for the task event stream.
+
+Building a stream payload for a task costs four queries (tags, dependencies, dependency
+status, custom fields). The cache keeps the finished ``TaskRead`` JSON keyed by
+``(task_id, updated_at)``, so a feed that sees another event for an unchanged task sends it
+without touching the database.
+
+Edits to a task itself bump ``Task.updated_at``, which changes the key. Writes that change a
+payload without touching the task reach the cache as ``task_state`` change notifications:
+tag assignments, dependencies and custom-field values of the task, renamed tags or changed
+custom-field definitions, and a dependency toggling done/undone (for each dependent, whose
+``is_blocked`` and ``blocked_by_task_ids`` change). They travel over the change bus like
+every other notification, so all replicas drop their copies.
+
+The cache is bypassed while the change bus cannot guarantee delivery (bus disabled, or its
+listener disconnected), and is cleared whenever the listener reconnects.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.change_bus import ENTITY_TASK_STATE, ChangeNotification, change_bus
+
+TaskPayload = dict[str, object]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    board_id: UUID
+    updated_at: datetime
+    payload: TaskPayload
+
+
+@dataclass(frozen=True)
+class CacheSnapshot:
+    """Invalidation counters observed before a fetch read the database."""
+
+    generation: int
+    board_generation: int
+
+
+class TaskStreamCache:
+    """Bounded LRU of hydrated task payloads, invalidated through the change bus."""
+
+    def __init__(self, *, max_entries: int | None = None) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[UUID, _Entry] = OrderedDict()
+        self._by_board: dict[UUID, set[UUID]] = {}
+        self._generation = 0
+        self._board_generations: dict[UUID, int] = {}
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        return settings.stream_task_cache_size
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and change_bus.delivers_all_changes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self, board_id: UUID) -> CacheSnapshot:
+        """Take before reading task state, and pass to :meth:`put` afterwards."""
+        return CacheSnapshot(self._generation, self._board_generations.get(board_id, 0))
+
+    def get(self, task_id: UUID, updated_at: datetime) -> TaskPayload | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(task_id)
+        if entry is None or entry.updated_at != updated_at:
+            return None
+        self._entries.move_to_end(task_id)
+        return entry.payload
+
+    def put(
+        self,
+        snapshot: CacheSnapshot,
+        *,
+        board_id: UUID,
+        task_id: UUID,
+        updated_at: datetime,
+        payload: TaskPayload,
+    ) -> None:
+        """Store ``payload`` unless the board was invalidated since ``snapshot``."""
+        if not self.enabled or snapshot != self.snapshot(board_id):
+            return
+        self._discard(task_id)
+        self._entries[task_id] = _Entry(board_id, updated_at, payload)
+        self._by_board.setdefault(board_id, set()).add(task_id)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, board_id: UUID, task_ids: Collection[UUID] | None = None) -> None:
+        """Drop ``task_ids`` of a board, or every cached task of the board when ``None``."""
+        self._board_generations[board_id] = self._board_generations.get(board_id, 0) + 1
+        targets = task_ids if task_ids is not None else tuple(self._by_board.get(board_id, ()))
+        for task_id in targets:
+            self._discard(task_id)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._by_board.clear()
+
+    def _discard(self, task_id: UUID) -> None:
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        board_tasks = self._by_board.get(entry.board_id)
+        if board_tasks is not None:
+            board_tasks.discard(task_id)
+            if not board_tasks:
+                del self._by_board[entry.board_id]
+
+    def changes_received(self, notifications: Iterable[ChangeNotification]) -> None:
+        for notification in notifications:
+            if notification.entity != ENTITY_TASK_STATE:
+                continue
+            self.invalidate(
+                notification.board_id,
+                [notification.id] if notification.id is not None else None,
+            )
+
+    def changes_missed(self) -> None:
+        self.clear()
+
+
+task_stream_cache = TaskStreamCache()
+change_bus.add_listener(task_stream_cache)
@@ -7,6 +7,8 @@ import random
 import time
 from uuid import UUID
 
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
@@ -17,7 +19,7 @@ from app.models.board_webhook_payloads import BoardWebhookPayload
 from app.models.board_webhooks import BoardWebhook
 from app.models.boards import Board
 from app.services.openclaw.gateway_dispatch import GatewayDispatchService
-from app.services.queue import QueuedTask
+from app.services.queue import QueuedTask, QueueWriteError
 from app.services.webhooks.queue import (
     QueuedInboundDelivery,
     decode_webhook_task,
@@ -25,6 +27,7 @@ from app.services.webhooks.queue import (
 )
 
 logger = get_logger(__name__)
+_DIGEST_PREVIEW_CHARS = 280
 
 
 def _build_payload_preview(payload_value: object) -> str:
@@ -62,13 +65,50 @@ def _webhook_message(
     )
 
 
-async def _notify_target_agent(
+def _single_line_preview(payload_value: object) -> str:
+    preview = " ".join(_build_payload_preview(payload_value).split())
+    if len(preview) <= _DIGEST_PREVIEW_CHARS:
+        return preview
+    return f"{preview[: _DIGEST_PREVIEW_CHARS - 3]}..."
+
+
+def _webhook_digest_message(
+    *,
+    board: Board,
+    entries: list[tuple[BoardWebhook, BoardWebhookPayload]],
+) -> str:
+    lines = [
+        f"WEBHOOK EVENTS RECEIVED ({len(entries)})",
+        f"Board: {board.name}",
+        "",
+        "Payloads:",
+    ]
+    for webhook, payload in entries:
+        lines.append(f"- Payload ID: {payload.id}")
+        lines.append(f"  Webhook ID: {webhook.id}")
+        lines.append(f"  Instruction: {webhook.description}")
+        lines.append(f"  Preview: {_single_line_preview(payload.payload)}")
+    lines.extend(
+        [
+            "",
+            "Take action:",
+            "1) Triage each payload against its webhook instruction.",
+            "2) Create/update tasks as needed; related payloads may share one task.",
+            "3) Reference the payload IDs in task descriptions.",
+            "",
+            "Full payloads are stored in board memory:",
+            f"GET /api/v1/agent/boards/{board.id}/memory?is_chat=false",
+        ],
+    )
+    return "\n".join(lines)
+
+
+async def _resolve_target_agent(
     *,
     session: AsyncSession,
     board: Board,
     webhook: BoardWebhook,
-    payload: BoardWebhookPayload,
-) -> None:
+) -> Agent | None:
     target_agent: Agent | None = None
     if webhook.agent_id is not None:
         target_agent = await Agent.objects.filter_by(id=webhook.agent_id, board_id=board.id).first(
@@ -79,6 +119,18 @@ async def _notify_target_agent(
             session
         )
     if target_agent is None or not target_agent.openclaw_session_id:
+        return None
+    return target_agent
+
+
+async def _send_to_agent(
+    *,
+    session: AsyncSession,
+    board: Board,
+    agent: Agent,
+    message: str,
+) -> None:
+    if not agent.openclaw_session_id:
         return
 
     dispatch = GatewayDispatchService(session)
@@ -86,16 +138,29 @@ async def _notify_target_agent(
     if config is None:
         return
 
-    message = _webhook_message(board=board, webhook=webhook, payload=payload)
     await dispatch.try_send_agent_message(
-        session_key=target_agent.openclaw_session_id,
+        session_key=agent.openclaw_session_id,
         config=config,
-        agent_name=target_agent.name,
+        agent_name=agent.name,
         message=message,
         deliver=False,
     )
 
 
+async def _notify_target_agent(
+    *,
+    session: AsyncSession,
+    board: Board,
+    webhook: BoardWebhook,
+    payload: BoardWebhookPayload,
+) -> None:
+    target_agent = await _resolve_target_agent(session=session, board=board, webhook=webhook)
+    if target_agent is None:
+        return
+    message = _webhook_message(board=board, webhook=webhook, payload=payload)
+    await _send_to_agent(session=session, board=board, agent=target_agent, message=message)
+
+
 async def _load_webhook_payload(
     *,
     session: AsyncSession,
@@ -126,7 +191,7 @@ async def _load_webhook_payload(
         )
         return None
 
-    board = await Board.objects.by_id(board_id).first(session)
+    board = await session.get(Board, board_id)
     if board is None:
         logger.warning(
             "webhook.queue.board_missing",
@@ -156,8 +221,13 @@ async def _load_webhook_payload(
     return board, webhook, payload
 
 
-async def _process_single_item(item: QueuedInboundDelivery) -> None:
-    async with async_session_maker() as session:
+async def notify_webhook_delivery(
+    item: QueuedInboundDelivery,
+    *,
+    session_maker: async_sessionmaker[AsyncSession] | None = None,
+) -> None:
+    """Notify the target agent about a stored payload right away, bypassing the queue."""
+    async with (session_maker or async_session_maker)() as session:
         loaded = await _load_webhook_payload(
             session=session,
             payload_id=item.payload_id,
@@ -172,6 +242,76 @@ async def _process_single_item(item: QueuedInboundDelivery) -> None:
         await session.commit()
 
 
+async def _process_single_item(item: QueuedInboundDelivery) -> None:
+    await notify_webhook_delivery(item)
+
+
+async def _prefetch_webhook_rows(
+    session: AsyncSession,
+    items: list[QueuedInboundDelivery],
+) -> None:
+    """Load every referenced row with one IN query per table into the identity map."""
+    payload_ids = {item.payload_id for item in items}
+    webhook_ids = {item.webhook_id for item in items}
+    board_ids = {item.board_id for item in items}
+    (
+        await session.exec(
+            select(BoardWebhookPayload).where(col(BoardWebhookPayload.id).in_(payload_ids)),
+        )
+    ).all()
+    (await session.exec(select(BoardWebhook).where(col(BoardWebhook.id).in_(webhook_ids)))).all()
+    (await session.exec(select(Board).where(col(Board.id).in_(board_ids)))).all()
+
+
+async def _process_item_batch(items: list[QueuedInboundDelivery]) -> None:
+    """Deliver queued payloads as one digest message per board and target agent."""
+    async with async_session_maker() as session:
+        await _prefetch_webhook_rows(session, items)
+        groups: dict[tuple[UUID, UUID], list[tuple[BoardWebhook, BoardWebhookPayload]]] = {}
+        targets: dict[tuple[UUID, UUID], tuple[Board, Agent]] = {}
+        agents_by_webhook: dict[UUID, Agent | None] = {}
+        for item in items:
+            loaded = await _load_webhook_payload(
+                session=session,
+                payload_id=item.payload_id,
+                webhook_id=item.webhook_id,
+                board_id=item.board_id,
+            )
+            if loaded is None:
+                continue
+            board, webhook, payload = loaded
+            if webhook.id not in agents_by_webhook:
+                agents_by_webhook[webhook.id] = await _resolve_target_agent(
+                    session=session,
+                    board=board,
+                    webhook=webhook,
+                )
+            agent = agents_by_webhook[webhook.id]
+            if agent is None:
+                continue
+            key = (board.id, agent.id)
+            targets[key] = (board, agent)
+            groups.setdefault(key, []).append((webhook, payload))
+
+        for key, entries in groups.items():
+            board, agent = targets[key]
+            if len(entries) == 1:
+                webhook, payload = entries[0]
+                message = _webhook_message(board=board, webhook=webhook, payload=payload)
+            else:
+                message = _webhook_digest_message(board=board, entries=entries)
+            await _send_to_agent(session=session, board=board, agent=agent, message=message)
+            logger.info(
+                "webhook.dispatch.digest_sent",
+                extra={
+                    "board_id": str(board.id),
+                    "agent_id": str(agent.id),
+                    "count": len(entries),
+                },
+            )
+        await session.commit()
+
+
 def _compute_webhook_retry_delay(attempts: int) -> float:
     base = float(settings.rq_dispatch_retry_base_seconds) * (2 ** max(0, attempts))
     return float(min(base, float(settings.rq_dispatch_retry_max_seconds)))
@@ -189,9 +329,14 @@ async def process_webhook_queue_task(task: QueuedTask) -> None:
     await _process_single_item(item)
 
 
+async def process_webhook_queue_batch(tasks: list[QueuedTask]) -> None:
+    """Deliver a batch of queued webhook tasks as per-board, per-agent digests."""
+    await _process_item_batch([decode_webhook_task(task) for task in tasks])
+
+
 def requeue_webhook_queue_task(task: QueuedTask, *, delay_seconds: float = 0) -> bool:
     payload = decode_webhook_task(task)
-    return requeue_if_failed(payload, delay_seconds=delay_seconds)
+    return requeue_if_failed(payload, delay_seconds=delay_seconds, history=task.history)
 
 
 async def flush_webhook_delivery_queue(*, block: bool = False, block_timeout: float = 0) -> int:
@@ -239,6 +384,9 @@ async def flush_webhook_delivery_queue(*, block: bool = False, block_timeout: fl
                 requeue_if_failed(item, delay_seconds=delay + jitter)
             except TypeError:
                 requeue_if_failed(item)
+            except QueueWriteError:
+                # Already logged; this loop pops without a lease, so nothing can redeliver it.
+                pass
         time.sleep(0.0)
         await asyncio.sleep(settings.rq_dispatch_throttle_seconds)
     if processed > 0:
@@ -0,0 +1,230 @@
+"""Group-commit write-behind buffer for inbound board webhooks.
+
+With ``WEBHOOK_INGEST_BUFFERED`` enabled the ingest endpoint hands the payload row and its
+board memory row to :data:`webhook_ingest_buffer` and returns ``202`` without touching the
+database. One flusher task per API process collects whatever arrived within
+``WEBHOOK_INGEST_FLUSH_INTERVAL_MS``, writes it with one multi-row insert per table in a
+single transaction and then enqueues lead dispatch for every stored payload.
+
+Guarantees (see ``docs/production/README.md``):
+
+- Durability: an accepted payload lives only in process memory until its batch commits;
+  a crash or kill in between loses it. Graceful shutdown drains the buffer first.
+- Ordering: payloads accepted by one process are committed in acceptance order, batch by
+  batch; dispatch of one batch is enqueued concurrently. There is no ordering across API
+  replicas, and ``received_at`` is the acceptance time, not the commit time.
+- Back-pressure: when the buffer holds ``WEBHOOK_INGEST_BUFFER_MAX_ITEMS`` payloads the
+  endpoint falls back to the synchronous write path instead of rejecting the request.
+- Failures: a payload whose row cannot be written is counted as dropped in the queue stats
+  (``webhook_delivery``). When dispatch cannot be enqueued the lead is notified directly,
+  as on the synchronous path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import async_session_maker
+from app.models.board_memory import BoardMemory
+from app.models.board_webhook_payloads import BoardWebhookPayload
+from app.services.change_bus import ENTITY_BOARD_MEMORY, ChangeNotification, publish_changes
+from app.services.queue_stats import record_dropped
+from app.services.webhooks.dispatch import notify_webhook_delivery
+from app.services.webhooks.queue import TASK_TYPE as WEBHOOK_TASK_TYPE
+from app.services.webhooks.queue import QueuedInboundDelivery, enqueue_webhook_delivery_async
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class BufferedIngest:
+    """One accepted webhook payload and the board memory entry recorded for it."""
+
+    payload: BoardWebhookPayload
+    memory: BoardMemory
+
+
+def _row(model: BoardWebhookPayload | BoardMemory) -> dict[str, Any]:
+    # ``seq`` is assigned by the database default; an explicit NULL would override it.
+    return model.model_dump(exclude={"seq"})
+
+
+def _delivery(payload: BoardWebhookPayload) -> QueuedInboundDelivery:
+    return QueuedInboundDelivery(
+        board_id=payload.board_id,
+        webhook_id=payload.webhook_id,
+        payload_id=payload.id,
+        received_at=payload.received_at,
+    )
+
+
+class WebhookIngestBuffer:
+    """Bounded in-process buffer flushed to Postgres in batched transactions."""
+
+    def __init__(
+        self,
+        *,
+        max_items: int,
+        flush_interval_seconds: float,
+        max_batch: int,
+        session_maker: async_sessionmaker[AsyncSession] | None = None,
+    ) -> None:
+        self._max_items = max_items
+        self._flush_interval = max(0.0, flush_interval_seconds)
+        self._max_batch = max(1, max_batch)
+        self._session_maker = session_maker or async_session_maker
+        # Unbounded so the shutdown sentinel always fits; ``submit`` enforces ``max_items``.
+        self._pending: asyncio.Queue[BufferedIngest | None] = asyncio.Queue()
+        # Accepted but not yet written, including the batch the flusher is working on.
+        self._held = 0
+        self._flusher: asyncio.Task[None] | None = None
+        self._closing = False
+        # Cuts the group-commit wait short when a full batch is waiting or on shutdown.
+        self._flush_now = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None and not self._flusher.done() and not self._closing
+
+    def submit(self, payload: BoardWebhookPayload, memory: BoardMemory) -> bool:
+        """Accept a payload for the next group commit; ``False`` when not running or full."""
+        if not self.running or self._held >= self._max_items:
+            return False
+        self._held += 1
+        self._pending.put_nowait(BufferedIngest(payload=payload, memory=memory))
+        if self._pending.qsize() >= self._max_batch:
+            self._flush_now.set()
+        return True
+
+    def start(self) -> None:
+        """Start the flusher task on the running event loop."""
+        if self.running:
+            return
+        self._pending = asyncio.Queue()
+        self._held = 0
+        self._closing = False
+        self._flush_now = asyncio.Event()
+        self._flusher = asyncio.create_task(self._run())
+        logger.info(
+            "webhook.ingest.buffer_started",
+            extra={
+                "max_items": self._max_items,
+                "flush_interval_ms": self._flush_interval * 1000,
+                "max_batch": self._max_batch,
+            },
+        )
+
+    async def stop(self) -> None:
+        """Stop accepting payloads, write everything still buffered and stop the flusher."""
+        flusher = self._flusher
+        if flusher is None:
+            return
+        self._closing = True
+        self._pending.put_nowait(None)
+        self._flush_now.set()
+        await flusher
+        self._flusher = None
+        logger.info("webhook.ingest.buffer_stopped")
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._pending.get()
+            if item is None:
+                return
+            if self._pending.qsize() < self._max_batch - 1:
+                # Group commit: give a burst a moment to accumulate behind the first payload.
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._flush_now.wait(), self._flush_interval)
+            if not self._closing:
+                self._flush_now.clear()
+            batch = [item]
+            stopping = False
+            while len(batch) < self._max_batch and not self._pending.empty():
+                queued = self._pending.get_nowait()
+                if queued is None:
+                    stopping = True
+                    break
+                batch.append(queued)
+            try:
+                await self._write(batch)
+            finally:
+                self._held -= len(batch)
+            if stopping:
+                return
+
+    async def _insert(self, batch: list[BufferedIngest]) -> None:
+        async with self._session_maker() as session:
+            await session.exec(
+                insert(BoardWebhookPayload),
+                params=[_row(item.payload) for item in batch],
+            )
+            await session.exec(insert(BoardMemory), params=[_row(item.memory) for item in batch])
+            # Core inserts bypass the ORM flush hooks, so announce the memory rows here.
+            notifications = {
+                ChangeNotification(item.memory.board_id, ENTITY_BOARD_MEMORY, item.memory.id)
+                for item in batch
+            }
+            await session.run_sync(publish_changes, notifications)
+            await session.commit()
+
+    async def _write(self, batch: list[BufferedIngest]) -> None:
+        try:
+            await self._insert(batch)
+        except Exception as exc:
+            if len(batch) > 1:
+                # Retry row by row so one bad payload does not take the whole batch with it.
+                logger.warning(
+                    "webhook.ingest.flush_failed",
+                    extra={"count": len(batch), "error": str(exc)},
+                )
+                for item in batch:
+                    await self._write([item])
+                return
+            logger.exception(
+                "webhook.ingest.dropped",
+                extra={
+                    "payload_id": str(batch[0].payload.id),
+                    "board_id": str(batch[0].payload.board_id),
+                    "webhook_id": str(batch[0].payload.webhook_id),
+                },
+            )
+            # The request was already answered, so surface the loss in the queue stats.
+            await record_dropped(WEBHOOK_TASK_TYPE)
+            return
+        logger.info("webhook.ingest.flushed", extra={"count": len(batch)})
+        deliveries = [_delivery(item.payload) for item in batch]
+        results = await asyncio.gather(
+            *(enqueue_webhook_delivery_async(delivery) for delivery in deliveries),
+        )
+        for delivery, enqueued in zip(deliveries, results, strict=True):
+            if not enqueued:
+                await self._notify_directly(delivery)
+
+    async def _notify_directly(self, delivery: QueuedInboundDelivery) -> None:
+        # Like the synchronous path, still nudge the lead when dispatch could not be queued.
+        log_extra = {
+            "payload_id": str(delivery.payload_id),
+            "board_id": str(delivery.board_id),
+            "webhook_id": str(delivery.webhook_id),
+        }
+        logger.warning("webhook.ingest.enqueue_failed", extra=log_extra)
+        try:
+            await notify_webhook_delivery(delivery, session_maker=self._session_maker)
+        except Exception:
+            logger.exception("webhook.ingest.notify_failed", extra=log_extra)
+
+
+webhook_ingest_buffer = WebhookIngestBuffer(
+    max_items=settings.webhook_ingest_buffer_max_items,
+    flush_interval_seconds=settings.webhook_ingest_flush_interval_ms / 1000,
+    max_batch=settings.webhook_ingest_flush_max_batch,
+)
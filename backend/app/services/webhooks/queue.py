@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import UTC, datetime
 from typing import Any
 from uuid import UUID
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.services.queue import QueuedTask, dequeue_task, enqueue_task
+from app.services.queue import QueuedTask, dequeue_task, enqueue_task, enqueue_task_async
 from app.services.queue import requeue_if_failed as generic_requeue_if_failed
 
 logger = get_logger(__name__)
@@ -97,6 +97,27 @@ def enqueue_webhook_delivery(payload: QueuedInboundDelivery) -> bool:
         return False
 
 
+async def enqueue_webhook_delivery_async(payload: QueuedInboundDelivery) -> bool:
+    """Async variant of :func:`enqueue_webhook_delivery` used by the ingest endpoint."""
+    queued = _task_from_payload(payload)
+    ok = await enqueue_task_async(
+        queued,
+        settings.rq_queue_name,
+        redis_url=settings.rq_redis_url,
+    )
+    if ok:
+        logger.info(
+            "webhook.queue.enqueued",
+            extra={
+                "board_id": str(payload.board_id),
+                "webhook_id": str(payload.webhook_id),
+                "payload_id": str(payload.payload_id),
+                "attempt": payload.attempts,
+            },
+        )
+    return ok
+
+
 def dequeue_webhook_delivery(
     *,
     block: bool = False,
@@ -128,14 +149,16 @@ def requeue_if_failed(
     payload: QueuedInboundDelivery,
     *,
     delay_seconds: float = 0,
+    history: tuple[dict[str, Any], ...] = (),
 ) -> bool:
     """Requeue payload delivery with capped retries.
 
-    Returns True if requeued.
+    ``history`` carries the failure history of the original envelope so it survives the
+    retry and, once retries run out, lands in the dead-letter list. Returns True if requeued.
     """
     try:
         return generic_requeue_if_failed(
-            _task_from_payload(payload),
+            replace(_task_from_payload(payload), history=history),
             settings.rq_queue_name,
             max_retries=settings.rq_dispatch_max_retries,
             redis_url=settings.rq_redis_url,
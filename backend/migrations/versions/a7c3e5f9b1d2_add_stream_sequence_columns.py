@@ -0,0 +1,62 @@
+"""add stream sequence columns
+
+Revision ID: a7c3e5f9b1d2
+Revises: f1b2c3d4e5a6
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "a7c3e5f9b1d2"
+down_revision = "f1b2c3d4e5a6"
+branch_labels = None
+depends_on = None
+
+# Append-only tables only. Approval and agent streams emit updates to existing rows, which an
+# insert-time sequence cannot order, so those streams keep resuming from ``since``.
+STREAM_TABLES = ("activity_events", "board_memory", "board_group_memory")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in STREAM_TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "seq" in columns:
+            continue
+        sequence = f"{table}_seq_seq"
+        op.execute(f"CREATE SEQUENCE IF NOT EXISTS {sequence}")
+        op.add_column(table, sa.Column("seq", sa.BigInteger(), nullable=True))
+        # Number existing rows in creation order so resumed streams replay them in order.
+        op.execute(
+            f"""
+            UPDATE {table} AS target
+            SET seq = numbered.seq
+            FROM (
+                SELECT id, nextval('{sequence}') AS seq
+                FROM (SELECT id FROM {table} ORDER BY created_at, id) AS ordered
+            ) AS numbered
+            WHERE target.id = numbered.id
+            """,
+        )
+        op.alter_column(table, "seq", server_default=sa.text(f"nextval('{sequence}')"))
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.seq")
+        op.create_index(op.f(f"ix_{table}_seq"), table, ["seq"], unique=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in STREAM_TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "seq" not in columns:
+            continue
+        op.drop_index(op.f(f"ix_{table}_seq"), table_name=table)
+        # Dropping the column also drops the sequence it owns.
+        op.drop_column(table, "seq")
@@ -0,0 +1,43 @@
+"""add agent token lookup key
+
+Revision ID: b8d4f6a2c3e7
+Revises: a7c3e5f9b1d2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b8d4f6a2c3e7"
+down_revision = "a7c3e5f9b1d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    agent_columns = {column["name"] for column in inspector.get_columns("agents")}
+    if "agent_token_lookup" not in agent_columns:
+        # Existing tokens are only stored hashed; their keys are backfilled on first use.
+        op.add_column("agents", sa.Column("agent_token_lookup", sa.String(), nullable=True))
+        op.create_index(
+            op.f("ix_agents_agent_token_lookup"),
+            "agents",
+            ["agent_token_lookup"],
+            unique=True,
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    agent_columns = {column["name"] for column in inspector.get_columns("agents")}
+    if "agent_token_lookup" in agent_columns:
+        op.drop_index(op.f("ix_agents_agent_token_lookup"), table_name="agents")
+        op.drop_column("agents", "agent_token_lookup")
@@ -0,0 +1,141 @@
+"""Benchmark request latency while agent tokens are rotated in bulk.
+
+Rotates ``--agents`` agent tokens (as a gateway template sync does) while a probe issues
+no-op requests on the same event loop every ``--interval-ms`` and records how late each
+one completes. ``inline`` hashes on the event loop, like token minting did before the
+PBKDF2 work moved to a thread pool; ``offload`` uses ``mint_agent_token``. Reports the
+rotation time and the probe request p50/p99 latency for each mode.
+
+    python scripts/bench_agent_tokens.py --agents 200 --workers 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.core import agent_tokens  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.models.agents import Agent  # noqa: E402
+from app.services.openclaw.db_agent_state import mint_agent_token  # noqa: E402
+
+MODES = ("inline", "offload")
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Outcome of one rotation run."""
+
+    mode: str
+    agents: int
+    rotation_seconds: float
+    requests: int
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def _percentile(samples: list[float], quantile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+def _mint_inline(agent: Agent) -> str:
+    raw_token = agent_tokens.generate_agent_token()
+    agent.agent_token_hash = agent_tokens.hash_agent_token(raw_token)
+    agent.agent_token_lookup = agent_tokens.agent_token_lookup_key(raw_token)
+    return raw_token
+
+
+async def _probe(stop: asyncio.Event, interval: float, samples: list[float]) -> None:
+    while not stop.is_set():
+        issued = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - issued - interval) * 1000)
+
+
+async def run_benchmark(
+    mode: str,
+    *,
+    agents: int = 200,
+    interval_ms: float = 5.0,
+) -> BenchmarkResult:
+    """Rotate ``agents`` tokens in ``mode`` while probing event loop request latency."""
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r}; expected one of {', '.join(MODES)}")
+    rows = [Agent(name=f"bench-{index}", gateway_id=uuid4()) for index in range(agents)]
+    samples: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(stop, interval_ms / 1000, samples))
+    await asyncio.sleep(interval_ms / 1000)
+    started = time.perf_counter()
+    try:
+        for agent in rows:
+            if mode == "inline":
+                _mint_inline(agent)
+                # Rotation writes each agent back, yielding to the loop between agents.
+                await asyncio.sleep(0)
+            else:
+                await mint_agent_token(agent)
+        elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        await probe
+    return BenchmarkResult(
+        mode=mode,
+        agents=agents,
+        rotation_seconds=elapsed,
+        requests=len(samples),
+        p50_ms=_percentile(samples, 0.5),
+        p99_ms=_percentile(samples, 0.99),
+        max_ms=max(samples, default=0.0),
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--agents", type=int, default=200, help="agent tokens to rotate")
+    parser.add_argument("--interval-ms", type=float, default=5.0, help="probe request spacing")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="PBKDF2 threads (defaults to AGENT_TOKEN_HASH_WORKERS)",
+    )
+    parser.add_argument("--mode", choices=(*MODES, "both"), default="both")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the selected modes and print one report line each."""
+    args = parse_args()
+    if args.workers is not None:
+        settings.agent_token_hash_workers = args.workers
+    modes = MODES if args.mode == "both" else (args.mode,)
+    try:
+        for mode in modes:
+            result = asyncio.run(
+                run_benchmark(mode, agents=args.agents, interval_ms=args.interval_ms),
+            )
+            sys.stdout.write(
+                f"mode={result.mode} agents={result.agents} "
+                f"rotation={result.rotation_seconds:.3f}s requests={result.requests} "
+                f"request_p50={result.p50_ms:.3f}ms request_p99={result.p99_ms:.3f}ms "
+                f"request_max={result.max_ms:.3f}ms\n",
+            )
+    finally:
+        agent_tokens.shutdown_hash_executor()
+
+
+if __name__ == "__main__":
+    main()
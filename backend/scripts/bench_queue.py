@@ -0,0 +1,280 @@
+"""Benchmark queue worker throughput with stubbed handlers.
+
+Pushes synthetic webhook and lifecycle envelopes through ``flush_queue`` and reports
+tasks/sec plus p50/p99 dispatch latency (time spent dispatching one work unit: handler,
+acknowledgement and bookkeeping). Handlers only decode their payload and optionally sleep,
+so the numbers isolate worker and queue overhead. Runs in process by default; pass
+``--redis-url`` to measure the Redis backend on a throwaway queue instead.
+
+    python scripts/bench_queue.py --tasks 10000 --concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.services import queue_worker  # noqa: E402
+from app.services.openclaw.lifecycle_queue import TASK_TYPE as LIFECYCLE_TASK_TYPE  # noqa: E402
+from app.services.openclaw.lifecycle_queue import decode_lifecycle_task  # noqa: E402
+from app.services.queue import QueuedTask, _redis_client, lane_queue_name  # noqa: E402
+from app.services.queue_backend import (  # noqa: E402
+    InMemoryQueueBackend,
+    QueueBackend,
+    RedisQueueBackend,
+)
+from app.services.webhooks.queue import TASK_TYPE as WEBHOOK_TASK_TYPE  # noqa: E402
+from app.services.webhooks.queue import decode_webhook_task  # noqa: E402
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Outcome of one benchmark run."""
+
+    tasks: int
+    processed: int
+    units: int
+    elapsed_seconds: float
+    p50_ms: float
+    p99_ms: float
+
+    @property
+    def tasks_per_second(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+def _percentile(samples: list[float], quantile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+def synthetic_tasks(
+    count: int,
+    *,
+    webhook_share: float = 0.8,
+    boards: int = 50,
+    gateways: int = 10,
+) -> list[QueuedTask]:
+    """Build ``count`` webhook and lifecycle envelopes spread over boards and gateways."""
+    board_ids = [str(uuid4()) for _ in range(max(1, boards))]
+    gateway_ids = [str(uuid4()) for _ in range(max(1, gateways))]
+    webhook_every = max(1, round(1 / (1 - webhook_share))) if webhook_share < 1 else 0
+    now = datetime.now(UTC)
+    tasks: list[QueuedTask] = []
+    for index in range(count):
+        board_id = board_ids[index % len(board_ids)]
+        if webhook_every and index % webhook_every == 0:
+            tasks.append(
+                QueuedTask(
+                    task_type=LIFECYCLE_TASK_TYPE,
+                    payload={
+                        "agent_id": str(uuid4()),
+                        "gateway_id": gateway_ids[index % len(gateway_ids)],
+                        "board_id": board_id,
+                        "generation": 1,
+                        "checkin_deadline_at": now.isoformat(),
+                    },
+                    created_at=now,
+                ),
+            )
+            continue
+        tasks.append(
+            QueuedTask(
+                task_type=WEBHOOK_TASK_TYPE,
+                payload={
+                    "board_id": board_id,
+                    "webhook_id": str(uuid4()),
+                    "payload_id": str(uuid4()),
+                    "received_at": now.isoformat(),
+                },
+                created_at=now,
+            ),
+        )
+    return tasks
+
+
+@contextmanager
+def _overrides(target: Any, values: dict[str, Any]) -> Iterator[None]:
+    previous = {name: getattr(target, name) for name in values}
+    for name, value in values.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(target, name, value)
+
+
+def _stub_handlers(backend: QueueBackend, handler_seconds: float) -> dict[str, Any]:
+    async def _pause() -> None:
+        if handler_seconds > 0:
+            await asyncio.sleep(handler_seconds)
+
+    async def _webhook(task: QueuedTask) -> None:
+        decode_webhook_task(task)
+        await _pause()
+
+    async def _webhook_batch(tasks: list[QueuedTask]) -> None:
+        for task in tasks:
+            decode_webhook_task(task)
+        await _pause()
+
+    async def _lifecycle(task: QueuedTask) -> None:
+        decode_lifecycle_task(task)
+        await _pause()
+
+    def _requeue(queue_name: str) -> Callable[[QueuedTask, float], bool]:
+        return lambda task, delay: backend.enqueue(task, queue_name, delay_seconds=delay)
+
+    handlers: dict[str, Any] = {}
+    for task_type, handler in (
+        (WEBHOOK_TASK_TYPE, _webhook),
+        (LIFECYCLE_TASK_TYPE, _lifecycle),
+    ):
+        real = queue_worker._TASK_HANDLERS[task_type]
+        handlers[task_type] = queue_worker._TaskHandler(
+            handler=handler,
+            attempts_to_delay=real.attempts_to_delay,
+            requeue=_requeue(lane_queue_name(settings.rq_queue_name, real.lane)),
+            throttle_key=real.throttle_key,
+            batch_handler=_webhook_batch if real.batch_handler is not None else None,
+            lane=real.lane,
+        )
+    return handlers
+
+
+async def run_benchmark(
+    tasks: list[QueuedTask],
+    *,
+    backend: QueueBackend | None = None,
+    concurrency: int = 8,
+    batch_size: int | None = None,
+    throttle_seconds: float = 0,
+    handler_seconds: float = 0,
+    queue_name: str = "bench-queue",
+    stats_enabled: bool = False,
+) -> BenchmarkResult:
+    """Enqueue ``tasks``, drain them with ``flush_queue`` and time every work unit."""
+    backend = backend or InMemoryQueueBackend()
+    samples: list[float] = []
+    dispatch_unit = queue_worker._dispatch_unit
+
+    async def _timed_dispatch(unit: Any, unit_backend: QueueBackend) -> int:
+        started = time.perf_counter()
+        try:
+            return await dispatch_unit(unit, unit_backend)
+        finally:
+            samples.append((time.perf_counter() - started) * 1000)
+
+    setting_values: dict[str, Any] = {
+        "rq_queue_name": queue_name,
+        "rq_dispatch_throttle_seconds": throttle_seconds,
+        "rq_stats_enabled": stats_enabled,
+    }
+    if batch_size is not None:
+        setting_values["rq_dequeue_batch_size"] = batch_size
+    with _overrides(settings, setting_values):
+        handlers = _stub_handlers(backend, handler_seconds)
+        with _overrides(
+            queue_worker,
+            {"_dispatch_unit": _timed_dispatch, "_TASK_HANDLERS": handlers},
+        ):
+            for task in tasks:
+                backend.enqueue(task, lane_queue_name(queue_name, handlers[task.task_type].lane))
+            started = time.perf_counter()
+            processed = await queue_worker.flush_queue(concurrency=concurrency, backend=backend)
+            elapsed = time.perf_counter() - started
+    return BenchmarkResult(
+        tasks=len(tasks),
+        processed=processed,
+        units=len(samples),
+        elapsed_seconds=elapsed,
+        p50_ms=_percentile(samples, 0.5),
+        p99_ms=_percentile(samples, 0.99),
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--tasks", type=int, default=5000, help="envelopes to push")
+    parser.add_argument("--webhook-share", type=float, default=0.8)
+    parser.add_argument("--boards", type=int, default=50)
+    parser.add_argument("--gateways", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--handler-ms", type=float, default=0.0, help="simulated handler time")
+    parser.add_argument(
+        "--redis-url",
+        default=None,
+        help="benchmark the Redis backend at this URL instead of the in-process one",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="record queue stats and handler latency (needs Redis)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        help="log level while benchmarking (per-unit worker logs are INFO)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run one benchmark and print a one-line report."""
+    args = parse_args()
+    logging.getLogger().setLevel(args.log_level.upper())
+    queue_name = f"bench-queue-{uuid4().hex[:8]}"
+    backend: QueueBackend = (
+        RedisQueueBackend(redis_url=args.redis_url) if args.redis_url else InMemoryQueueBackend()
+    )
+    tasks = synthetic_tasks(
+        args.tasks,
+        webhook_share=args.webhook_share,
+        boards=args.boards,
+        gateways=args.gateways,
+    )
+    try:
+        result = asyncio.run(
+            run_benchmark(
+                tasks,
+                backend=backend,
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+                handler_seconds=args.handler_ms / 1000,
+                queue_name=queue_name,
+                stats_enabled=args.stats,
+            ),
+        )
+    finally:
+        if args.redis_url:
+            client = _redis_client(redis_url=args.redis_url)
+            for key in client.scan_iter(f"{queue_name}*"):
+                client.delete(key)
+    sys.stdout.write(
+        f"backend={'redis' if args.redis_url else 'memory'} tasks={result.tasks} "
+        f"processed={result.processed} units={result.units} "
+        f"elapsed={result.elapsed_seconds:.3f}s tasks/sec={result.tasks_per_second:.0f} "
+        f"dispatch_p50={result.p50_ms:.3f}ms dispatch_p99={result.p99_ms:.3f}ms\n",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# ruff: noqa: INP001
+"""Write-behind agent presence buffer tests."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import Request
+
+import app.services.openclaw.provisioning_db as provisioning_db
+from app.api import metrics as metrics_api
+from app.core import agent_auth
+from app.core.time import utcnow
+from app.models.agents import Agent
+from app.models.boards import Board
+from app.models.organizations import Organization
+from app.services.agent_presence import AgentPresenceBuffer, PresenceTouch, bulk_presence_update
+from app.services.openclaw.provisioning_db import AgentLifecycleService
+
+
+async def _make_engine() -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+def _request(method: str) -> Request:
+    return Request({"type": "http", "method": method, "headers": []})
+
+
+def test_bulk_update_writes_every_touch_in_one_statement() -> None:
+    now = utcnow()
+    batch = [PresenceTouch(uuid4(), None, now), PresenceTouch(uuid4(), None, now)]
+
+    sql = str(bulk_presence_update(batch, now=now).compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("UPDATE agents SET")
+    assert "FROM (VALUES" in sql
+    assert "AS presence (id, last_seen_at)" in sql
+    assert "agents.last_seen_at < presence.last_seen_at" in sql
+
+
+@pytest.mark.asyncio
+async def test_read_only_poll_is_buffered_and_flushed_later(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    buffer = AgentPresenceBuffer(flush_interval_seconds=3600, session_maker=session_maker)
+    monkeypatch.setattr(provisioning_db, "agent_presence_buffer", buffer)
+    stale = utcnow() - timedelta(hours=1)
+    polling = Agent(name="poller", gateway_id=uuid4(), status="offline", last_seen_at=stale)
+    updating = Agent(name="updating", gateway_id=uuid4(), status="updating")
+    buffer.start()
+    try:
+        async with session_maker() as session:
+            session.add_all([polling, updating])
+            await session.commit()
+
+            for agent in (polling, updating):
+                assert buffer.record(agent, utcnow())
+            assert len(buffer) == 2
+
+            await session.refresh(polling)
+            assert polling.last_seen_at == stale
+            computed = AgentLifecycleService.with_computed_status(polling)
+            assert computed.status == "online"
+            assert computed.last_seen_at == buffer.last_seen(polling.id)
+            # Reading merges presence into a copy; the tracked row is left for the flush.
+            assert computed is not polling
+            assert polling.last_seen_at == stale
+            assert polling not in session.dirty
+            await session.commit()
+
+        async with session_maker() as session:
+            stored = await session.get(Agent, polling.id)
+            assert stored is not None
+            assert stored.last_seen_at == stale
+
+        assert await buffer.flush() == 2
+        assert len(buffer) == 0
+        async with session_maker() as session:
+            stored = await session.get(Agent, polling.id)
+            assert stored is not None
+            assert stored.status == "online"
+            assert stored.last_seen_at is not None and stored.last_seen_at > stale
+            pinned = await session.get(Agent, updating.id)
+            assert pinned is not None
+            assert pinned.status == "updating"
+    finally:
+        await buffer.stop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_flush_does_not_move_last_seen_backwards() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    buffer = AgentPresenceBuffer(flush_interval_seconds=3600, session_maker=session_maker)
+    heartbeat_at = utcnow()
+    agent = Agent(name="agent", gateway_id=uuid4(), status="online", last_seen_at=heartbeat_at)
+    buffer.start()
+    try:
+        async with session_maker() as session:
+            session.add(agent)
+            await session.commit()
+        buffer.record(agent, heartbeat_at - timedelta(seconds=5))
+        await buffer.flush()
+        async with session_maker() as session:
+            stored = await session.get(Agent, agent.id)
+            assert stored is not None
+            assert stored.last_seen_at == heartbeat_at
+    finally:
+        await buffer.stop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_touch_skips_the_commit_while_buffer_runs(monkeypatch: pytest.MonkeyPatch) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    buffer = AgentPresenceBuffer(flush_interval_seconds=3600, session_maker=session_maker)
+    monkeypatch.setattr(agent_auth, "agent_presence_buffer", buffer)
+    agent = Agent(name="agent", gateway_id=uuid4(), status="offline")
+    try:
+        async with session_maker() as session:
+            session.add(agent)
+            await session.commit()
+
+            await agent_auth._touch_agent_presence(_request("GET"), session, agent)
+            assert agent.status == "online"
+            assert not session.dirty
+
+            agent.last_seen_at = None
+            agent.status = "offline"
+            await session.commit()
+            buffer.start()
+            await agent_auth._touch_agent_presence(_request("GET"), session, agent)
+            assert agent.status == "offline"
+            assert buffer.last_seen(agent.id) is not None
+            assert not session.dirty
+    finally:
+        await buffer.stop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_touches(monkeypatch: pytest.MonkeyPatch) -> None:
+    buffer = AgentPresenceBuffer(flush_interval_seconds=3600)
+    agent = Agent(name="agent", gateway_id=uuid4())
+
+    async def _fail(_batch: list[PresenceTouch]) -> None:
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(buffer, "_write", _fail)
+    buffer.start()
+    try:
+        buffer.record(agent, utcnow())
+        assert await buffer.flush() == 0
+        assert buffer.last_seen(agent.id) is not None
+    finally:
+        monkeypatch.undo()
+        buffer._pending.clear()
+        await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_active_agent_count_includes_unflushed_presence(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    buffer = AgentPresenceBuffer(flush_interval_seconds=3600, session_maker=session_maker)
+    monkeypatch.setattr(metrics_api, "agent_presence_buffer", buffer)
+    organization = Organization(name="org")
+    board = Board(organization_id=organization.id, name="board", slug="board")
+    now = utcnow()
+    seen = Agent(name="seen", gateway_id=uuid4(), board_id=board.id, last_seen_at=now)
+    polling = Agent(name="polling", gateway_id=uuid4(), board_id=board.id)
+    range_spec = metrics_api._resolve_range("24h")
+    buffer.start()
+    try:
+        async with session_maker() as session:
+            session.add_all([organization, board, seen, polling])
+            await session.commit()
+
+            assert await metrics_api._active_agents(session, range_spec, [board.id]) == 1
+            buffer.record(polling, now)
+            assert await metrics_api._active_agents(session, range_spec, [board.id]) == 2
+    finally:
+        buffer._pending.clear()
+        await buffer.stop()
+        await engine.dispose()
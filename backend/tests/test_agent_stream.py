@@ -0,0 +1,109 @@
+# ruff: noqa: INP001
+"""Agent SSE stream tests (shared hub feed, per-agent coalescing)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import timedelta
+from pathlib import Path
+from typing import cast
+from uuid import uuid4
+
+import pytest
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app.services.openclaw.provisioning_db as provisioning_db
+from app.core.time import utcnow
+from app.models.agents import Agent
+from app.models.boards import Board
+from app.models.organizations import Organization
+from app.services.change_bus import ENTITY_AGENT, ChangeNotification, change_bus
+from app.services.openclaw.provisioning_db import AgentLifecycleService
+from app.services.stream_hub import StreamHub
+
+
+async def _make_engine(path: Path) -> AsyncEngine:
+    # A file database: the hub's feed task reads on its own connection next to the test's.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+class _FakeRequest:
+    headers: dict[str, str] = {}
+
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def test_stream_events_name_one_version_and_coalesce_per_agent() -> None:
+    agent = Agent(name="agent", gateway_id=uuid4(), updated_at=utcnow())
+    first = AgentLifecycleService.agent_stream_event(agent)
+
+    assert AgentLifecycleService.agent_stream_event(agent).id == first.id
+    assert first.coalesce_key == ("agent", agent.id)
+    assert first.seq is None
+
+    agent.last_seen_at = agent.updated_at + timedelta(seconds=5)
+    heartbeat = AgentLifecycleService.agent_stream_event(agent)
+    assert heartbeat.id != first.id
+    assert heartbeat.created_at == agent.last_seen_at
+    assert heartbeat.coalesce_key == first.coalesce_key
+
+
+@pytest.mark.asyncio
+async def test_agent_streams_of_one_board_share_a_hub_feed(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    engine = await _make_engine(tmp_path / "agents.db")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    hub = StreamHub(queue_size=10)
+    monkeypatch.setattr(provisioning_db, "async_session_maker", session_maker)
+    monkeypatch.setattr(provisioning_db, "stream_hub", hub)
+    organization = Organization(name="org")
+    board = Board(organization_id=organization.id, name="board", slug="board")
+    agent = Agent(name="agent", gateway_id=uuid4(), board_id=board.id)
+    since = utcnow() - timedelta(minutes=1)
+    try:
+        async with session_maker() as session:
+            session.add_all([organization, board, agent])
+            await session.commit()
+            service = AgentLifecycleService(session)
+        streams = [
+            service.agent_events(
+                request=cast(Request, _FakeRequest()),
+                board_id=board.id,
+                since_dt=since,
+                allowed_ids={board.id},
+            )
+            for _ in range(2)
+        ]
+        backfilled = [await asyncio.wait_for(anext(stream), 2) for stream in streams]
+        assert hub.feed_count() == 1
+        assert all(message["event"] == "agent" for message in backfilled)
+        assert all("id" not in message for message in backfilled)
+
+        async with session_maker() as session:
+            agent.name = "renamed"
+            agent.updated_at = utcnow() + timedelta(seconds=1)
+            session.add(agent)
+            await session.commit()
+        change_bus.dispatch([ChangeNotification(board.id, ENTITY_AGENT, agent.id)])
+
+        updated = json.loads((await asyncio.wait_for(anext(streams[0]), 2))["data"])
+        assert updated["agent"]["id"] == str(agent.id)
+        assert updated["agent"]["name"] == "renamed"
+        for stream in streams:
+            await stream.aclose()
+        assert hub.feed_count() == 0
+    finally:
+        # Let the cancelled feed task release its connection before the engine goes away.
+        feeds = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*feeds, return_exceptions=True)
+        await engine.dispose()
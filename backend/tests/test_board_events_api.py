@@ -0,0 +1,147 @@
+# ruff: noqa: INP001
+"""Multiplexed board event stream parameter and cursor tests."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import Request
+
+from app.api import board_events
+from app.api.board_events import EVENT_TYPES, decode_cursor, encode_cursor, parse_event_types
+from app.api.deps import ActorContext
+from app.models.boards import Board
+from app.models.organization_members import OrganizationMember
+from app.models.organizations import Organization
+from app.models.users import User
+
+
+async def _make_engine() -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+def test_event_types_default_to_readable_types_in_canonical_order() -> None:
+    assert parse_event_types(None, agents_allowed=True) == list(EVENT_TYPES)
+    assert parse_event_types("", agents_allowed=False) == [
+        "tasks",
+        "approvals",
+        "memory",
+        "group_memory",
+    ]
+    assert parse_event_types(" agents, tasks ,", agents_allowed=False) == ["tasks", "agents"]
+
+
+def test_unknown_event_type_is_rejected() -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        parse_event_types("tasks,comments", agents_allowed=True)
+
+    assert exc_info.value.status_code == 422
+    assert "comments" in str(exc_info.value.detail)
+
+
+def test_cursor_round_trips_through_last_event_id() -> None:
+    cursor = {"tasks": 12, "memory": 5, "group_memory": 3}
+
+    assert encode_cursor(cursor) == "group_memory:3,memory:5,tasks:12"
+    assert decode_cursor(encode_cursor(cursor)) == cursor
+
+
+def test_cursor_ignores_foreign_last_event_ids() -> None:
+    # A bare sequence from a single-type stream cannot be attributed to one type.
+    assert decode_cursor("42") == {}
+    assert decode_cursor(None) == {}
+    assert decode_cursor("tasks:7,bogus:1,memory:x") == {"tasks": 7}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("role", "types", "expected"),
+    [
+        ("member", None, ["tasks", "approvals", "memory"]),
+        ("admin", None, ["tasks", "approvals", "memory", "agents"]),
+        ("admin", "agents", ["agents"]),
+    ],
+)
+async def test_default_stream_types_follow_the_callers_role(
+    monkeypatch: pytest.MonkeyPatch,
+    role: str,
+    types: str | None,
+    expected: list[str],
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    opened: list[str] = []
+
+    async def _capture(
+        streams: dict[str, AsyncGenerator[dict[str, str], None]],
+        _cursor: dict[str, int],
+    ) -> AsyncGenerator[dict[str, str], None]:
+        opened.extend(streams)
+        for stream in streams.values():
+            await stream.aclose()
+        return
+        yield
+
+    monkeypatch.setattr(board_events, "_board_events", _capture)
+    organization = Organization(name="org")
+    user = User(clerk_user_id="viewer", active_organization_id=organization.id)
+    member = OrganizationMember(organization_id=organization.id, user_id=user.id, role=role)
+    board = Board(organization_id=organization.id, name="board", slug="board")
+    try:
+        async with session_maker() as session:
+            session.add_all([organization, user, member, board])
+            await session.commit()
+
+            response = await board_events.stream_board_events(
+                Request({"type": "http", "method": "GET", "headers": []}),
+                board=board,
+                actor=ActorContext(actor_type="user", user=user),
+                session=session,
+                types=types,
+                since=None,
+                is_chat=None,
+                delta=False,
+            )
+            async for _event in response.body_iterator:
+                pass
+
+        assert opened == expected
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_explicit_agent_events_need_an_org_admin() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    organization = Organization(name="org")
+    user = User(clerk_user_id="viewer", active_organization_id=organization.id)
+    member = OrganizationMember(organization_id=organization.id, user_id=user.id, role="member")
+    board = Board(organization_id=organization.id, name="board", slug="board")
+    try:
+        async with session_maker() as session:
+            session.add_all([organization, user, member, board])
+            await session.commit()
+
+            with pytest.raises(HTTPException) as exc_info:
+                await board_events.stream_board_events(
+                    Request({"type": "http", "method": "GET", "headers": []}),
+                    board=board,
+                    actor=ActorContext(actor_type="user", user=user),
+                    session=session,
+                    types="tasks,agents",
+                    since=None,
+                    is_chat=None,
+                    delta=False,
+                )
+        assert exc_info.value.status_code == 403
+    finally:
+        await engine.dispose()
@@ -23,6 +23,8 @@ from app.models.board_webhooks import BoardWebhook
 from app.models.boards import Board
 from app.models.gateways import Gateway
 from app.models.organizations import Organization
+from app.services.webhooks import ingest_buffer
+from app.services.webhooks.ingest_buffer import BufferedIngest, WebhookIngestBuffer
 from app.services.webhooks.queue import QueuedInboundDelivery
 
 
@@ -129,7 +131,7 @@ async def test_ingest_board_webhook_stores_payload_and_enqueues_for_lead_dispatc
     async with session_maker() as session:
         board, webhook = await _seed_webhook(session, enabled=True)
 
-    def _fake_enqueue(payload: QueuedInboundDelivery) -> bool:
+    async def _fake_enqueue(payload: QueuedInboundDelivery) -> bool:
         enqueued.append(
             {
                 "board_id": str(payload.board_id),
@@ -161,7 +163,7 @@ async def test_ingest_board_webhook_stores_payload_and_enqueues_for_lead_dispatc
 
     monkeypatch.setattr(
         board_webhooks,
-        "enqueue_webhook_delivery",
+        "enqueue_webhook_delivery_async",
         _fake_enqueue,
     )
     monkeypatch.setattr(
@@ -288,3 +290,273 @@ async def test_ingest_board_webhook_rejects_disabled_endpoint(
         assert sent_messages == []
     finally:
         await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_buffered_ingest_returns_before_write_and_group_commits(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+    app = _build_test_app(session_maker)
+    buffer = WebhookIngestBuffer(
+        max_items=100,
+        flush_interval_seconds=60,
+        max_batch=50,
+        session_maker=session_maker,
+    )
+    enqueued: list[UUID] = []
+    batch_sizes: list[int] = []
+    insert_batch = buffer._insert
+
+    async def _fake_enqueue(payload: QueuedInboundDelivery) -> bool:
+        enqueued.append(payload.payload_id)
+        return True
+
+    async def _spy_insert(batch: list[BufferedIngest]) -> None:
+        batch_sizes.append(len(batch))
+        await insert_batch(batch)
+
+    async with session_maker() as session:
+        board, webhook = await _seed_webhook(session, enabled=True)
+
+    monkeypatch.setattr(ingest_buffer, "enqueue_webhook_delivery_async", _fake_enqueue)
+    monkeypatch.setattr(board_webhooks, "webhook_ingest_buffer", buffer)
+    monkeypatch.setattr(board_webhooks.settings, "webhook_ingest_buffered", True)
+    monkeypatch.setattr(buffer, "_insert", _spy_insert)
+
+    try:
+        buffer.start()
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://testserver",
+        ) as client:
+            responses = [
+                await client.post(
+                    f"/api/v1/boards/{board.id}/webhooks/{webhook.id}",
+                    json={"event": "deploy", "sequence": sequence},
+                )
+                for sequence in range(3)
+            ]
+
+        assert [response.status_code for response in responses] == [202, 202, 202]
+        payload_ids = [UUID(response.json()["payload_id"]) for response in responses]
+        async with session_maker() as session:
+            stored = (await session.exec(select(BoardWebhookPayload))).all()
+            assert stored == []
+
+        await buffer.stop()
+
+        assert batch_sizes == [3]
+        assert enqueued == payload_ids
+        async with session_maker() as session:
+            stored = (await session.exec(select(BoardWebhookPayload))).all()
+            assert sorted(payload.id for payload in stored) == sorted(payload_ids)
+            assert {payload.payload["sequence"] for payload in stored} == {0, 1, 2}
+            memory_items = (
+                await session.exec(
+                    select(BoardMemory).where(col(BoardMemory.board_id) == board.id),
+                )
+            ).all()
+            assert len(memory_items) == 3
+            assert all(item.source == "webhook" for item in memory_items)
+    finally:
+        await buffer.stop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_buffered_ingest_falls_back_to_direct_write_when_buffer_is_full(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+    app = _build_test_app(session_maker)
+    buffer = WebhookIngestBuffer(
+        max_items=1,
+        flush_interval_seconds=60,
+        max_batch=50,
+        session_maker=session_maker,
+    )
+    enqueued: list[UUID] = []
+
+    async def _fake_enqueue(payload: QueuedInboundDelivery) -> bool:
+        enqueued.append(payload.payload_id)
+        return True
+
+    async with session_maker() as session:
+        board, webhook = await _seed_webhook(session, enabled=True)
+
+    monkeypatch.setattr(ingest_buffer, "enqueue_webhook_delivery_async", _fake_enqueue)
+    monkeypatch.setattr(board_webhooks, "enqueue_webhook_delivery_async", _fake_enqueue)
+    monkeypatch.setattr(board_webhooks, "webhook_ingest_buffer", buffer)
+    monkeypatch.setattr(board_webhooks.settings, "webhook_ingest_buffered", True)
+
+    try:
+        buffer.start()
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://testserver",
+        ) as client:
+            buffered, direct = [
+                await client.post(
+                    f"/api/v1/boards/{board.id}/webhooks/{webhook.id}",
+                    json={"event": "deploy"},
+                )
+                for _ in range(2)
+            ]
+
+        direct_id = UUID(direct.json()["payload_id"])
+        async with session_maker() as session:
+            stored = (await session.exec(select(BoardWebhookPayload))).all()
+            assert [payload.id for payload in stored] == [direct_id]
+        assert enqueued == [direct_id]
+
+        await buffer.stop()
+
+        assert enqueued == [direct_id, UUID(buffered.json()["payload_id"])]
+    finally:
+        await buffer.stop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_buffered_ingest_notifies_lead_directly_when_dispatch_cannot_be_queued(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+    app = _build_test_app(session_maker)
+    buffer = WebhookIngestBuffer(
+        max_items=100,
+        flush_interval_seconds=60,
+        max_batch=50,
+        session_maker=session_maker,
+    )
+    sent_messages: list[dict[str, str]] = []
+
+    async def _failing_enqueue(payload: QueuedInboundDelivery) -> bool:
+        del payload
+        return False
+
+    async def _fake_try_send_agent_message(
+        self: board_webhooks.GatewayDispatchService,
+        *,
+        session_key: str,
+        config: object,
+        agent_name: str,
+        message: str,
+        deliver: bool = False,
+    ) -> None:
+        del self, config, agent_name, deliver
+        sent_messages.append({"session_id": session_key, "message": message})
+        return None
+
+    async with session_maker() as session:
+        board, webhook = await _seed_webhook(session, enabled=True)
+
+    monkeypatch.setattr(ingest_buffer, "enqueue_webhook_delivery_async", _failing_enqueue)
+    monkeypatch.setattr(board_webhooks, "webhook_ingest_buffer", buffer)
+    monkeypatch.setattr(board_webhooks.settings, "webhook_ingest_buffered", True)
+    monkeypatch.setattr(
+        board_webhooks.GatewayDispatchService,
+        "try_send_agent_message",
+        _fake_try_send_agent_message,
+    )
+
+    try:
+        buffer.start()
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://testserver",
+        ) as client:
+            response = await client.post(
+                f"/api/v1/boards/{board.id}/webhooks/{webhook.id}",
+                json={"event": "deploy"},
+            )
+        assert response.status_code == 202
+
+        await buffer.stop()
+
+        payload_id = response.json()["payload_id"]
+        assert [message["session_id"] for message in sent_messages] == ["lead:session:key"]
+        assert f"Payload ID: {payload_id}" in sent_messages[0]["message"]
+    finally:
+        await buffer.stop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_buffered_ingest_counts_payloads_it_could_not_store(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+    app = _build_test_app(session_maker)
+    buffer = WebhookIngestBuffer(
+        max_items=100,
+        flush_interval_seconds=60,
+        max_batch=50,
+        session_maker=session_maker,
+    )
+    enqueued: list[UUID] = []
+    dropped: list[str] = []
+
+    async def _fake_enqueue(payload: QueuedInboundDelivery) -> bool:
+        enqueued.append(payload.payload_id)
+        return True
+
+    async def _failing_insert(batch: list[BufferedIngest]) -> None:
+        del batch
+        raise RuntimeError("insert failed")
+
+    async def _fake_record_dropped(task_type: str, count: int = 1) -> None:
+        dropped.extend([task_type] * count)
+
+    async with session_maker() as session:
+        board, webhook = await _seed_webhook(session, enabled=True)
+
+    monkeypatch.setattr(ingest_buffer, "enqueue_webhook_delivery_async", _fake_enqueue)
+    monkeypatch.setattr(ingest_buffer, "record_dropped", _fake_record_dropped)
+    monkeypatch.setattr(board_webhooks, "webhook_ingest_buffer", buffer)
+    monkeypatch.setattr(board_webhooks.settings, "webhook_ingest_buffered", True)
+    monkeypatch.setattr(buffer, "_insert", _failing_insert)
+
+    try:
+        buffer.start()
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://testserver",
+        ) as client:
+            responses = [
+                await client.post(
+                    f"/api/v1/boards/{board.id}/webhooks/{webhook.id}",
+                    json={"event": "deploy", "sequence": sequence},
+                )
+                for sequence in range(2)
+            ]
+        assert [response.status_code for response in responses] == [202, 202]
+
+        await buffer.stop()
+
+        assert dropped == ["webhook_delivery", "webhook_delivery"]
+        assert enqueued == []
+    finally:
+        await buffer.stop()
+        await engine.dispose()
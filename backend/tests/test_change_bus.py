@@ -0,0 +1,221 @@
+# ruff: noqa: INP001
+"""Stream change-notification bus tests.
+
+The Redis backplane test runs against ``QUEUE_TEST_REDIS_URL`` and is skipped when it cannot
+be reached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from uuid import uuid4
+
+import pytest
+import redis
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.activity_events import ActivityEvent
+from app.models.board_memory import BoardMemory
+from app.models.tasks import Task
+from app.services import change_bus as change_bus_module
+from app.services.change_bus import (
+    ENTITY_ACTIVITY,
+    ENTITY_APPROVAL,
+    ENTITY_BOARD_MEMORY,
+    ChangeBus,
+    ChangeNotification,
+    change_bus,
+)
+from app.services.queue import close_async_redis_clients
+
+_REDIS_URL = os.environ.get("QUEUE_TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+async def _make_engine() -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+def test_notification_round_trips_through_json() -> None:
+    notification = ChangeNotification(uuid4(), ENTITY_APPROVAL, uuid4())
+
+    assert ChangeNotification.from_json(notification.to_json()) == notification
+
+
+@pytest.mark.asyncio
+async def test_subscription_wakes_only_for_its_boards_and_entities() -> None:
+    bus = ChangeBus()
+    board_id = uuid4()
+    with (
+        bus.subscribe(board_ids={board_id}, entities={ENTITY_APPROVAL}) as watched,
+        bus.subscribe(board_ids=None, entities={ENTITY_BOARD_MEMORY}) as everywhere,
+    ):
+        bus.dispatch(
+            [
+                ChangeNotification(uuid4(), ENTITY_APPROVAL),
+                ChangeNotification(board_id, ENTITY_BOARD_MEMORY),
+            ],
+        )
+        assert await watched.wait(0.01) is False
+        assert await everywhere.wait(0.01) is True
+
+        everywhere.clear()
+        bus.dispatch([ChangeNotification(board_id, ENTITY_APPROVAL)])
+        assert await watched.wait(0.01) is True
+        assert await everywhere.wait(0.01) is False
+
+    watched.clear()
+    bus.dispatch([ChangeNotification(board_id, ENTITY_APPROVAL)])
+    assert await watched.wait(0.01) is False
+
+
+@pytest.mark.asyncio
+async def test_commit_wakes_local_stream_without_listener() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    board_id = uuid4()
+    try:
+        with change_bus.subscribe(board_ids={board_id}, entities={ENTITY_BOARD_MEMORY}) as changes:
+            async with session_maker() as session:
+                session.add(BoardMemory(board_id=board_id, content="hello"))
+                await session.flush()
+                # Flushed but not committed: streams must not fetch yet.
+                assert await changes.wait(0.01) is False
+                await session.commit()
+
+            started = time.monotonic()
+            assert await changes.wait(5) is True
+            assert time.monotonic() - started < 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_rollback_discards_pending_notifications() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    board_id = uuid4()
+    try:
+        with change_bus.subscribe(board_ids={board_id}, entities={ENTITY_BOARD_MEMORY}) as changes:
+            async with session_maker() as session:
+                session.add(BoardMemory(board_id=board_id, content="discarded"))
+                await session.flush()
+                await session.rollback()
+
+            assert await changes.wait(0.01) is False
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_activity_event_notifies_the_board_of_its_task() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    board_id = uuid4()
+    try:
+        async with session_maker() as session:
+            task = Task(board_id=board_id, title="stream me")
+            session.add(task)
+            await session.commit()
+
+        with change_bus.subscribe(board_ids={board_id}, entities={ENTITY_ACTIVITY}) as changes:
+            # A fresh session has no Task in its identity map, so the board is looked up.
+            async with session_maker() as session:
+                session.add(ActivityEvent(event_type="task.comment", task_id=task.id))
+                await session.commit()
+
+            assert await changes.wait(0.01) is True
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_redis_backplane_carries_commits_between_processes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    try:
+        redis.Redis.from_url(_REDIS_URL, socket_connect_timeout=0.5).ping()
+    except redis.RedisError:
+        pytest.skip(f"local Redis not reachable at {_REDIS_URL}")
+    monkeypatch.setattr(settings, "rq_redis_url", _REDIS_URL)
+    monkeypatch.setattr(settings, "stream_redis_backplane_enabled", True)
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    # Stands in for another replica: it only hears about the commit through Redis.
+    replica = ChangeBus()
+    board_id = uuid4()
+    replica.start()
+    try:
+        for _ in range(100):
+            if replica.listening:
+                break
+            await asyncio.sleep(0.01)
+        assert replica.listening
+        with replica.subscribe(board_ids={board_id}, entities={ENTITY_BOARD_MEMORY}) as changes:
+            async with session_maker() as session:
+                session.add(BoardMemory(board_id=board_id, content="across replicas"))
+                await session.commit()
+
+            started = time.monotonic()
+            assert await changes.wait(5) is True
+            assert time.monotonic() - started < 1
+    finally:
+        await replica.stop()
+        await engine.dispose()
+        await close_async_redis_clients()
+
+
+@pytest.mark.asyncio
+async def test_failed_notify_rolls_back_only_the_notification() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    board_id = uuid4()
+    memory = BoardMemory(board_id=board_id, content="kept")
+    try:
+        async with session_maker() as session:
+            session.add(memory)
+            await session.flush()
+            # SQLite has no pg_notify, so the statement fails like a full Postgres queue.
+            sent = await session.run_sync(
+                lambda sync_session: change_bus_module.notify_in_savepoint(
+                    sync_session.connection(),
+                    {ChangeNotification(board_id, ENTITY_BOARD_MEMORY, memory.id)},
+                ),
+            )
+            assert sent is False
+            await session.commit()
+
+        async with session_maker() as session:
+            assert await session.get(BoardMemory, memory.id) is not None
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_unsent_notifications_are_resent_after_commit(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    resent: list[set[ChangeNotification]] = []
+    monkeypatch.setattr(change_bus_module, "_notifies_in_transaction", lambda _session: True)
+    monkeypatch.setattr(change_bus, "notify", lambda notifications: resent.append(notifications))
+    board_id = uuid4()
+    memory = BoardMemory(board_id=board_id, content="kept")
+    try:
+        with change_bus.subscribe(board_ids={board_id}, entities={ENTITY_BOARD_MEMORY}) as changes:
+            async with session_maker() as session:
+                session.add(memory)
+                await session.commit()
+
+            assert await changes.wait(0.01) is True
+        assert resent == [{ChangeNotification(board_id, ENTITY_BOARD_MEMORY, memory.id)}]
+    finally:
+        await engine.dispose()
@@ -0,0 +1,177 @@
+# ruff: noqa: INP001
+"""In-process Clerk session token verification tests."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import Iterator, Mapping
+from types import SimpleNamespace
+from typing import Any
+
+import jwt
+import pytest
+from clerk_backend_api.security.types import (
+    AuthErrorReason,
+    AuthStatus,
+    TokenVerificationError,
+    TokenVerificationErrorReason,
+)
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.core import auth, clerk_tokens
+from app.core.clerk_tokens import clerk_jwks, verified_clerk_claims
+
+_KEYS = {kid: rsa.generate_private_key(public_exponent=65537, key_size=2048) for kid in "ab"}
+
+
+def _jwk(kid: str) -> dict[str, Any]:
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(_KEYS[kid].public_key()))
+    return {**jwk, "kid": kid, "alg": "RS256", "use": "sig"}
+
+
+def _token(
+    kid: str = "a",
+    *,
+    sub: str = "user_123",
+    exp_in: float = 60,
+    signed_by: str | None = None,
+) -> str:
+    now = int(time.time())
+    claims = {"sub": sub, "iat": now, "nbf": now, "exp": now + int(exp_in)}
+    return jwt.encode(claims, _KEYS[signed_by or kid], algorithm="RS256", headers={"kid": kid})
+
+
+class _JWKSServer:
+    def __init__(self, *kids: str) -> None:
+        self.kids = list(kids)
+        self.fetches = 0
+        self.fail = False
+
+    async def fetch(self) -> Mapping[str, Any]:
+        self.fetches += 1
+        if self.fail:
+            raise TokenVerificationError(TokenVerificationErrorReason.JWK_FAILED_TO_LOAD)
+        return {"keys": [_jwk(kid) for kid in self.kids]}
+
+
+@pytest.fixture
+def jwks_server(monkeypatch: pytest.MonkeyPatch) -> Iterator[_JWKSServer]:
+    server = _JWKSServer("a")
+    monkeypatch.setattr(clerk_jwks, "_fetch", server.fetch)
+    clerk_jwks.clear()
+    verified_clerk_claims.clear()
+    yield server
+    clerk_jwks.clear()
+    verified_clerk_claims.clear()
+
+
+def _count_decodes(monkeypatch: pytest.MonkeyPatch) -> dict[str, int]:
+    calls = {"n": 0}
+    decode = clerk_tokens._decode
+
+    def _counting_decode(token: str, key: Any) -> dict[str, Any]:
+        calls["n"] += 1
+        return decode(token, key)
+
+    monkeypatch.setattr(clerk_tokens, "_decode", _counting_decode)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_valid_token_is_verified_once_and_keys_fetched_once(
+    jwks_server: _JWKSServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    decodes = _count_decodes(monkeypatch)
+    token = _token()
+
+    for _ in range(3):
+        claims = await clerk_tokens.verify_clerk_session_token(token)
+        assert claims["sub"] == "user_123"
+    assert await clerk_tokens.verify_clerk_session_token(_token(sub="user_456"))
+
+    assert jwks_server.fetches == 1
+    assert decodes["n"] == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("token_factory", "reason"),
+    [
+        (lambda: _token(exp_in=-60), TokenVerificationErrorReason.TOKEN_EXPIRED),
+        (lambda: "not-a-jwt", TokenVerificationErrorReason.TOKEN_INVALID),
+        (lambda: _token("a", signed_by="b"), TokenVerificationErrorReason.TOKEN_INVALID_SIGNATURE),
+    ],
+)
+async def test_invalid_tokens_are_rejected(
+    jwks_server: _JWKSServer,
+    token_factory: Any,
+    reason: TokenVerificationErrorReason,
+) -> None:
+    with pytest.raises(TokenVerificationError) as excinfo:
+        await clerk_tokens.verify_clerk_session_token(token_factory())
+    assert excinfo.value.reason == reason
+    assert len(verified_clerk_claims) == 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refetches_keys_at_most_once_per_interval(
+    jwks_server: _JWKSServer,
+) -> None:
+    assert await clerk_tokens.verify_clerk_session_token(_token("a"))
+    with pytest.raises(TokenVerificationError):
+        await clerk_tokens.verify_clerk_session_token(_token("b"))
+    assert jwks_server.fetches == 1
+
+    # Clerk rotated its signing key.
+    jwks_server.kids = ["a", "b"]
+    clerk_jwks._attempted_at -= clerk_tokens._MIN_REFETCH_INTERVAL
+    assert await clerk_tokens.verify_clerk_session_token(_token("b"))
+    assert jwks_server.fetches == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_keys_are_used_while_refreshing_in_background(
+    jwks_server: _JWKSServer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(clerk_jwks, "_ttl_seconds", 0.0)
+    assert await clerk_tokens.verify_clerk_session_token(_token())
+    clerk_jwks._attempted_at -= clerk_tokens._MIN_REFETCH_INTERVAL
+    jwks_server.fail = True
+
+    verified_clerk_claims.clear()
+    assert await clerk_tokens.verify_clerk_session_token(_token())
+    await asyncio.sleep(0)
+    assert jwks_server.fetches == 2
+
+    verified_clerk_claims.clear()
+    assert await clerk_tokens.verify_clerk_session_token(_token())
+
+
+@pytest.mark.asyncio
+async def test_authenticate_clerk_request_reads_bearer_and_session_cookie(
+    jwks_server: _JWKSServer,
+) -> None:
+    token = _token()
+
+    for headers in ({"Authorization": f"Bearer {token}"}, {"cookie": f"__session={token}"}):
+        state = await auth._authenticate_clerk_request(  # type: ignore[arg-type]
+            SimpleNamespace(headers=headers),
+        )
+        assert state.status == AuthStatus.SIGNED_IN
+        assert state.payload is not None and state.payload["sub"] == "user_123"
+
+    missing = await auth._authenticate_clerk_request(  # type: ignore[arg-type]
+        SimpleNamespace(headers={}),
+    )
+    assert missing.status == AuthStatus.SIGNED_OUT
+    assert missing.reason == AuthErrorReason.SESSION_TOKEN_MISSING
+
+    expired = await auth._authenticate_clerk_request(  # type: ignore[arg-type]
+        SimpleNamespace(headers={"Authorization": f"Bearer {_token(exp_in=-60)}"}),
+    )
+    assert expired.status == AuthStatus.SIGNED_OUT
+    assert expired.reason == TokenVerificationErrorReason.TOKEN_EXPIRED
@@ -27,17 +27,21 @@ def test_enqueue_lifecycle_reconcile_uses_delayed_enqueue(
         task: QueuedTask,
         queue_name: str,
         *,
+        dedup_key: str,
+        version: int,
         delay_seconds: float,
         redis_url: str | None = None,
     ) -> bool:
         captured["task"] = task
         captured["queue_name"] = queue_name
+        captured["dedup_key"] = dedup_key
+        captured["version"] = version
         captured["delay_seconds"] = delay_seconds
         captured["redis_url"] = redis_url
         return True
 
     monkeypatch.setattr(
-        "app.services.openclaw.lifecycle_queue.enqueue_task_with_delay",
+        "app.services.openclaw.lifecycle_queue.enqueue_keyed_task_with_delay",
         _fake_enqueue_with_delay,
     )
 
@@ -55,6 +59,8 @@ def test_enqueue_lifecycle_reconcile_uses_delayed_enqueue(
     assert isinstance(task, QueuedTask)
     assert task.task_type == "agent_lifecycle_reconcile"
     assert float(captured["delay_seconds"]) > 0
+    assert captured["dedup_key"] == f"agent_lifecycle_reconcile:{payload.agent_id}"
+    assert captured["version"] == 7
 
 
 def test_defer_lifecycle_reconcile_keeps_attempt_count(
@@ -66,17 +72,23 @@ def test_defer_lifecycle_reconcile_keeps_attempt_count(
         task: QueuedTask,
         queue_name: str,
         *,
+        dedup_key: str,
+        version: int,
         delay_seconds: float,
         redis_url: str | None = None,
+        count_enqueued: bool = True,
     ) -> bool:
         captured["task"] = task
         captured["queue_name"] = queue_name
+        captured["dedup_key"] = dedup_key
+        captured["version"] = version
         captured["delay_seconds"] = delay_seconds
         captured["redis_url"] = redis_url
+        captured["count_enqueued"] = count_enqueued
         return True
 
     monkeypatch.setattr(
-        "app.services.openclaw.lifecycle_queue.enqueue_task_with_delay",
+        "app.services.openclaw.lifecycle_queue.enqueue_keyed_task_with_delay",
         _fake_enqueue_with_delay,
     )
     deadline = utcnow() + timedelta(minutes=1)
@@ -97,6 +109,8 @@ def test_defer_lifecycle_reconcile_keeps_attempt_count(
     assert isinstance(deferred_task, QueuedTask)
     assert deferred_task.attempts == 2
     assert float(captured["delay_seconds"]) == 12
+    assert captured["version"] == 3
+    assert captured["count_enqueued"] is False
 
 
 def test_decode_lifecycle_task_roundtrip() -> None:
@@ -0,0 +1,257 @@
+# ruff: noqa: INP001
+"""Organization membership and board access cache tests."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.boards import Board
+from app.models.organization_members import OrganizationMember
+from app.models.organizations import Organization
+from app.models.users import User
+from app.schemas.organizations import OrganizationBoardAccessSpec, OrganizationMemberAccessUpdate
+from app.services import organizations
+from app.services.organization_access_cache import organization_access_cache
+
+
+async def _make_engine() -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+def _count_selects(engine: AsyncEngine) -> dict[str, int]:
+    calls = {"n": 0}
+
+    def _before_cursor_execute(*args: Any) -> None:
+        if str(args[2]).lstrip().upper().startswith("SELECT"):
+            calls["n"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    return calls
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> Iterator[None]:
+    organization_access_cache.clear()
+    yield
+    organization_access_cache.clear()
+
+
+async def _seed(
+    session: AsyncSession,
+    *,
+    all_boards: bool = False,
+) -> tuple[User, OrganizationMember, Board, Board]:
+    organization = Organization(name=f"org-{uuid4()}")
+    user = User(clerk_user_id=f"user-{uuid4()}", active_organization_id=organization.id)
+    member = OrganizationMember(
+        organization_id=organization.id,
+        user_id=user.id,
+        role="member",
+        all_boards_read=all_boards,
+        all_boards_write=all_boards,
+    )
+    first = Board(organization_id=organization.id, name="first", slug="first")
+    second = Board(organization_id=organization.id, name="second", slug="second")
+    session.add_all([organization, user, member, first, second])
+    await session.commit()
+    return user, member, first, second
+
+
+@pytest.mark.asyncio
+async def test_repeated_lookups_are_served_from_the_cache() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with session_maker() as session:
+            user, member, first, _second = await _seed(session, all_boards=True)
+        selects = _count_selects(engine)
+
+        async with session_maker() as session:
+            resolved = await organizations.get_active_membership(session, user)
+            assert resolved is not None and resolved.id == member.id
+            ids = await organizations.list_accessible_board_ids(
+                session,
+                member=resolved,
+                write=False,
+            )
+            assert first.id in ids
+        first_request = selects["n"]
+        assert first_request > 0
+
+        async with session_maker() as session:
+            for _ in range(3):
+                resolved = await organizations.get_active_membership(session, user)
+                assert resolved is not None and resolved.id == member.id
+                assert resolved in session
+                ids = await organizations.list_accessible_board_ids(
+                    session,
+                    member=resolved,
+                    write=False,
+                )
+                assert first.id in ids
+        assert selects["n"] == first_request
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_access_update_and_role_change_invalidate_cached_entries() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with session_maker() as session:
+            user, member, first, second = await _seed(session)
+
+        async with session_maker() as session:
+            cached = await organizations.get_member(
+                session,
+                user_id=user.id,
+                organization_id=member.organization_id,
+            )
+            assert cached is not None
+            assert not await organizations.has_board_access(
+                session,
+                member=cached,
+                board=first,
+                write=False,
+            )
+            assert (
+                await organizations.list_accessible_board_ids(
+                    session,
+                    member=cached,
+                    write=False,
+                )
+                == []
+            )
+
+            await organizations.apply_member_access_update(
+                session,
+                member=cached,
+                update=OrganizationMemberAccessUpdate(
+                    board_access=[OrganizationBoardAccessSpec(board_id=second.id)],
+                ),
+            )
+            # Visible within the request before the commit, and to later requests.
+            assert await organizations.list_accessible_board_ids(
+                session,
+                member=cached,
+                write=False,
+            ) == [second.id]
+            cached.role = "admin"
+            session.add(cached)
+            await session.commit()
+
+        async with session_maker() as session:
+            updated = await organizations.get_member(
+                session,
+                user_id=user.id,
+                organization_id=member.organization_id,
+            )
+            assert updated is not None and updated.role == "admin"
+            assert await organizations.has_board_access(
+                session,
+                member=updated,
+                board=second,
+                write=False,
+            )
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_new_board_is_visible_to_all_boards_members() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with session_maker() as session:
+            _user, member, _first, _second = await _seed(session, all_boards=True)
+            ids = await organizations.list_accessible_board_ids(
+                session,
+                member=member,
+                write=True,
+            )
+            assert len(ids) == 2
+
+        async with session_maker() as session:
+            board = Board(organization_id=member.organization_id, name="third", slug="third")
+            session.add(board)
+            await session.commit()
+
+        async with session_maker() as session:
+            ids = await organizations.list_accessible_board_ids(
+                session,
+                member=member,
+                write=True,
+            )
+            assert board.id in ids
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_lookup_racing_an_invalidation_is_not_cached() -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with session_maker() as session:
+            user, member, _first, _second = await _seed(session)
+
+        async with session_maker() as session:
+            generation = organization_access_cache.snapshot()
+            organization_access_cache.invalidate(user_id=user.id)
+            organization_access_cache.put_member(session, generation, member)
+            assert len(organization_access_cache) == 0
+            assert (
+                await organization_access_cache.member(
+                    session,
+                    user_id=user.id,
+                    organization_id=member.organization_id,
+                )
+                is None
+            )
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_between_flush_and_commit_is_dropped_on_commit(tmp_path: Path) -> None:
+    # A file database, so the reader sees only committed rows, as it would on Postgres.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'access.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with session_maker() as session:
+            user, member, _first, _second = await _seed(session)
+
+        async with session_maker() as writer:
+            stored = await writer.get(OrganizationMember, member.id)
+            assert stored is not None
+            stored.role = "admin"
+            await writer.flush()
+
+            async with session_maker() as reader:
+                resolved = await organizations.get_active_membership(reader, user)
+                assert resolved is not None and resolved.role == "member"
+            assert len(organization_access_cache) > 0
+
+            await writer.commit()
+
+        assert len(organization_access_cache) == 0
+        async with session_maker() as session:
+            resolved = await organizations.get_active_membership(session, user)
+            assert resolved is not None and resolved.role == "admin"
+    finally:
+        await engine.dispose()
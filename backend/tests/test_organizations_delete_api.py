@@ -20,6 +20,7 @@ from app.services.organizations import OrganizationContext
 class _FakeSession:
     executed: list[object] = field(default_factory=list)
     committed: int = 0
+    info: dict[str, object] = field(default_factory=dict)
 
     async def exec(self, statement: object) -> None:
         self.executed.append(statement)
@@ -56,6 +56,7 @@ class _FakeSession:
     rolled_back: int = 0
     flushed: int = 0
     refreshed: list[Any] = field(default_factory=list)
+    info: dict[str, Any] = field(default_factory=dict)
 
     async def exec(self, _statement: Any) -> Any:
         is_dml = _statement.__class__.__name__ in {"Delete", "Update", "Insert"}
@@ -4,16 +4,25 @@
 from __future__ import annotations
 
 import json
+from dataclasses import replace
 from datetime import UTC, datetime
 
 import pytest
 
-from app.services.queue import QueuedTask, dequeue_task, enqueue_task, requeue_if_failed
+from app.services import queue
+from app.services.queue import (
+    QueuedTask,
+    QueueWriteError,
+    dequeue_task,
+    enqueue_task,
+    requeue_if_failed,
+)
 
 
 class _FakeRedis:
     def __init__(self) -> None:
         self.values: list[str] = []
+        self.dead_letters: list[str] = []
 
     def lpush(self, key: str, value: str) -> None:
         del key
@@ -25,6 +34,29 @@ class _FakeRedis:
             return None
         return self.values.pop()
 
+    def pipeline(self, *, transaction: bool = True) -> _FakePipeline:
+        del transaction
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    """Collects the dead-letter push; the fake keeps dead letters apart from the queue."""
+
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._pushed: list[str] = []
+
+    def lpush(self, key: str, value: str) -> None:
+        del key
+        self._pushed.insert(0, value)
+
+    def ltrim(self, key: str, start: int, end: int) -> None:
+        del key, start, end
+
+    def execute(self) -> list[object]:
+        self._redis.dead_letters[:0] = self._pushed
+        return []
+
 
 @pytest.mark.parametrize("attempts", [0, 1, 2])
 def test_generic_queue_roundtrip(monkeypatch: pytest.MonkeyPatch, attempts: int) -> None:
@@ -67,6 +99,7 @@ def test_generic_requeue_respects_retry_cap(monkeypatch: pytest.MonkeyPatch, att
     if attempts >= 3:
         assert requeue_if_failed(payload, "generic-queue", max_retries=3) is False
         assert fake.values == []
+        assert len(fake.dead_letters) == 1
     else:
         assert requeue_if_failed(payload, "generic-queue", max_retries=3) is True
         requeued = dequeue_task("generic-queue")
@@ -74,6 +107,32 @@ def test_generic_requeue_respects_retry_cap(monkeypatch: pytest.MonkeyPatch, att
         assert requeued.attempts == attempts + 1
 
 
+@pytest.mark.parametrize(("attempts", "delay_seconds"), [(0, 0), (0, 5), (3, 0)])
+def test_generic_requeue_raises_when_redis_takes_no_write(
+    monkeypatch: pytest.MonkeyPatch,
+    attempts: int,
+    delay_seconds: float,
+) -> None:
+    def _unreachable(*, redis_url: str | None = None) -> _FakeRedis:
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr("app.services.queue._redis_client", _unreachable)
+    payload = QueuedTask(
+        task_type="generic-task",
+        payload={},
+        created_at=datetime.now(UTC),
+        attempts=attempts,
+    )
+
+    with pytest.raises(QueueWriteError):
+        requeue_if_failed(
+            payload,
+            "generic-queue",
+            max_retries=3,
+            delay_seconds=delay_seconds,
+        )
+
+
 def test_dequeue_task_tolerates_legacy_payload_without_envelope(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
@@ -103,3 +162,129 @@ def test_dequeue_task_tolerates_legacy_payload_without_envelope(
     assert task.task_type == "legacy"
     assert task.attempts == 2
     assert task.payload["board_id"] == "6f3ab1ec-3ef6-4f4d-a6a7-e2d6e5d6f7a8"
+
+
+def test_redis_client_is_pooled_and_sized_from_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(queue, "_sync_clients", {})
+    monkeypatch.setattr(queue.settings, "rq_redis_max_connections", 7)
+    monkeypatch.setattr(queue.settings, "rq_redis_health_check_interval_seconds", 11)
+
+    first = queue._redis_client(redis_url="redis://localhost:6379/3")
+    second = queue._redis_client(redis_url="redis://localhost:6379/3")
+    other = queue._redis_client(redis_url="redis://localhost:6379/4")
+
+    assert first is second
+    assert other is not first
+    pool = first.connection_pool
+    assert pool.max_connections == 7
+    assert pool.connection_kwargs["health_check_interval"] == 11
+    assert pool.connection_kwargs["retry"] is not None
+
+    queue.close_redis_clients()
+    assert queue._sync_clients == {}
+
+
+@pytest.mark.asyncio
+async def test_async_redis_client_is_reused_within_event_loop() -> None:
+    first = queue._async_redis_client(redis_url="redis://localhost:6379/3")
+    second = queue._async_redis_client(redis_url="redis://localhost:6379/3")
+
+    assert first is second
+    await queue.close_async_redis_clients()
+    assert queue._async_redis_client(redis_url="redis://localhost:6379/3") is not first
+    await queue.close_async_redis_clients()
+
+
+class _FakeAsyncRedis:
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self.scheduled: dict[str, float] = {}
+
+    async def lpush(self, key: str, value: str) -> None:
+        del key
+        self.values.insert(0, value)
+
+    async def zadd(self, key: str, mapping: dict[str, float]) -> None:
+        del key
+        self.scheduled.update(mapping)
+
+
+@pytest.mark.asyncio
+async def test_async_enqueue_uses_async_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = _FakeAsyncRedis()
+
+    def _fake_async_redis(*, redis_url: str | None = None) -> _FakeAsyncRedis:
+        return fake
+
+    monkeypatch.setattr("app.services.queue._async_redis_client", _fake_async_redis)
+    task = QueuedTask(
+        task_type="generic-task",
+        payload={"name": "webhook.delivery"},
+        created_at=datetime.now(UTC),
+    )
+
+    assert await queue.enqueue_task_async(task, "generic-queue")
+    assert await queue.enqueue_task_with_delay_async(task, "generic-queue", delay_seconds=30)
+
+    assert [json.loads(value)["task_type"] for value in fake.values] == ["generic-task"]
+    assert len(fake.scheduled) == 1
+
+
+class _FakeBatchRedis(_FakeRedis):
+    def evalsha(self, *args: object) -> list[int]:
+        del args
+        return [0]
+
+    def rpop(self, key: str, count: int | None = None) -> str | list[str] | None:
+        if count is None:
+            return super().rpop(key)
+        popped: list[str] = []
+        while len(popped) < count and self.values:
+            popped.append(self.values.pop())
+        return popped or None
+
+
+def test_dequeue_tasks_pops_batch_and_skips_corrupt_envelopes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    fake = _FakeBatchRedis()
+
+    def _fake_redis(*, redis_url: str | None = None) -> _FakeBatchRedis:
+        return fake
+
+    monkeypatch.setattr("app.services.queue._redis_client", _fake_redis)
+    for index in range(4):
+        enqueue_task(
+            QueuedTask(
+                task_type="generic-task",
+                payload={"index": index},
+                created_at=datetime.now(UTC),
+            ),
+            "generic-queue",
+        )
+    fake.values.insert(1, "not-json")
+
+    tasks = queue.dequeue_tasks("generic-queue", max_items=10)
+
+    assert [task.payload["index"] for task in tasks] == [0, 1, 2, 3]
+    assert fake.values == []
+    assert queue.dequeue_tasks("generic-queue", max_items=10) == []
+
+
+def test_failure_history_is_bounded_and_survives_the_envelope() -> None:
+    task = QueuedTask(
+        task_type="generic-task",
+        payload={"name": "webhook.delivery"},
+        created_at=datetime.now(UTC),
+    )
+    plain = json.loads(task.to_json())
+    assert "history" not in plain
+
+    for attempt in range(12):
+        task = queue.with_failure(replace(task, attempts=attempt), f"boom {attempt}")
+
+    assert len(task.history) == 10
+    assert task.history[0]["attempt"] == 2
+    decoded = queue._decode_task(task.to_json(), "generic-queue")
+    assert decoded.history == task.history
+    assert decoded.history[-1]["error"] == "boom 11"
@@ -0,0 +1,87 @@
+# ruff: noqa: INP001
+"""In-process queue backend and queue benchmark tests."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from app.services.queue import QueuedTask
+from app.services.queue_backend import InMemoryQueueBackend
+from scripts.bench_queue import run_benchmark, synthetic_tasks
+
+
+def _task(index: int) -> QueuedTask:
+    return QueuedTask(task_type="bench", payload={"index": index}, created_at=datetime.now(UTC))
+
+
+def test_in_memory_backend_pops_fifo_batches_from_first_non_empty_lane() -> None:
+    backend = InMemoryQueueBackend()
+    for index in range(5):
+        backend.enqueue(_task(index), "bench:low")
+    backend.enqueue(_task(99), "bench:high")
+
+    high = backend.dequeue(["bench:high", "bench:low"], max_items=10)
+    low = backend.dequeue(["bench:high", "bench:low"], max_items=3)
+
+    assert [task.payload["index"] for task in high] == [99]
+    assert [task.payload["index"] for task in low] == [0, 1, 2]
+    assert backend.depth("bench:low") == 2
+
+
+def test_in_memory_backend_holds_delayed_tasks_until_due() -> None:
+    backend = InMemoryQueueBackend()
+    backend.enqueue(_task(1), "bench", delay_seconds=0.05)
+
+    assert backend.dequeue("bench", max_items=1) == []
+    assert backend.depth("bench") == 1
+    started = time.monotonic()
+    tasks = backend.dequeue("bench", max_items=1, block=True, block_timeout=1)
+
+    assert [task.payload["index"] for task in tasks] == [1]
+    assert time.monotonic() - started < 0.5
+
+
+def test_in_memory_backend_keeps_one_pending_entry_per_dedup_key() -> None:
+    backend = InMemoryQueueBackend()
+    backend.enqueue(_task(1), "bench", dedup_key="agent:a", version=1)
+    backend.enqueue(_task(2), "bench", dedup_key="agent:a", version=2)
+    backend.enqueue(_task(3), "bench", dedup_key="agent:a", version=1)
+
+    assert backend.depth("bench") == 1
+    assert [task.payload["index"] for task in backend.dequeue("bench", max_items=5)] == [2]
+
+    # Promotion forgets the version, so the key accepts a fresh entry afterwards.
+    backend.enqueue(_task(4), "bench", dedup_key="agent:a", version=1)
+    assert [task.payload["index"] for task in backend.dequeue("bench", max_items=5)] == [4]
+
+
+def test_in_memory_backend_blocking_dequeue_wakes_on_enqueue() -> None:
+    backend = InMemoryQueueBackend()
+    timer = threading.Timer(0.05, lambda: backend.enqueue(_task(7), "bench"))
+    timer.start()
+    try:
+        tasks = backend.dequeue("bench", max_items=5, block=True, block_timeout=2)
+    finally:
+        timer.cancel()
+
+    assert [task.payload["index"] for task in tasks] == [7]
+    assert backend.dequeue("bench", max_items=1, block=True, block_timeout=0.01) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [1, 4])
+async def test_benchmark_drains_synthetic_webhook_and_lifecycle_tasks(concurrency: int) -> None:
+    tasks = synthetic_tasks(500, webhook_share=0.8, boards=10, gateways=3)
+
+    result = await run_benchmark(tasks, concurrency=concurrency, batch_size=20)
+
+    assert {task.task_type for task in tasks} == {"webhook_delivery", "agent_lifecycle_reconcile"}
+    assert result.processed == 500
+    # Webhooks for the same board in one batch share a work unit; lifecycle checks do not.
+    assert 100 < result.units < 500
+    assert result.tasks_per_second > 0
+    assert 0 < result.p50_ms <= result.p99_ms
@@ -0,0 +1,192 @@
+# ruff: noqa: INP001
+"""Dead-letter list, inspection and replay tests against a real local Redis.
+
+Set ``QUEUE_TEST_REDIS_URL`` to point at a disposable Redis instance; the tests are
+skipped when it cannot be reached.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+import redis
+from fastapi import FastAPI
+from fastapi_pagination import add_pagination
+from httpx import ASGITransport, AsyncClient
+
+from app.api import queue_dead_letters as dead_letters_api
+from app.api.deps import require_admin_auth
+from app.services import queue, queue_dead_letters
+from app.services.queue import QueuedTask, lane_queue_name, requeue_if_failed, with_failure
+
+_REDIS_URL = os.environ.get("QUEUE_TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest.fixture
+def queue_name(monkeypatch: pytest.MonkeyPatch) -> str:
+    client = redis.Redis.from_url(_REDIS_URL, socket_connect_timeout=0.5)
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip(f"local Redis not reachable at {_REDIS_URL}")
+    monkeypatch.setattr(queue, "_sync_clients", {})
+    name = f"test-dead-{uuid4().hex}"
+    yield name
+    queue.close_redis_clients()
+    keys = list(client.scan_iter(f"{name}*"))
+    if keys:
+        client.delete(*keys)
+    client.close()
+
+
+def _exhaust(queue_name: str, task_type: str, board_id: str, error: str) -> None:
+    task = QueuedTask(
+        task_type=task_type,
+        payload={"board_id": board_id},
+        created_at=datetime.now(UTC),
+        attempts=3,
+    )
+    assert not requeue_if_failed(
+        with_failure(task, error),
+        queue_name,
+        max_retries=3,
+        redis_url=_REDIS_URL,
+    )
+
+
+def test_exhausted_tasks_are_dead_lettered_with_history_and_filterable(queue_name: str) -> None:
+    board = str(uuid4())
+    _exhaust(queue_name, "webhook_delivery", board, "gateway unreachable")
+    _exhaust(queue_name, "webhook_delivery", str(uuid4()), "timeout")
+    _exhaust(lane_queue_name(queue_name, "high"), "agent_lifecycle_reconcile", board, "boom")
+
+    letters = queue_dead_letters.list_dead_letters(queue_name=queue_name, redis_url=_REDIS_URL)
+    assert [letter.task.task_type for letter in letters] == [
+        "agent_lifecycle_reconcile",
+        "webhook_delivery",
+        "webhook_delivery",
+    ]
+    assert letters[0].queue_name == lane_queue_name(queue_name, "high")
+    assert letters[-1].last_error == "gateway unreachable"
+    assert letters[-1].task.history[-1]["attempt"] == 3
+
+    by_board = queue_dead_letters.list_dead_letters(
+        queue_name=queue_name,
+        board_id=board,
+        task_type="webhook_delivery",
+        redis_url=_REDIS_URL,
+    )
+    assert [letter.last_error for letter in by_board] == ["gateway unreachable"]
+
+
+def test_dead_letter_list_is_bounded(
+    queue_name: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(queue.settings, "rq_dead_letter_max_items", 2)
+    for index in range(4):
+        _exhaust(queue_name, "webhook_delivery", str(uuid4()), f"error {index}")
+
+    letters = queue_dead_letters.list_dead_letters(queue_name=queue_name, redis_url=_REDIS_URL)
+    assert [letter.last_error for letter in letters] == ["error 3", "error 2"]
+
+
+def test_unfiltered_pages_read_only_the_requested_slice(
+    queue_name: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    for index in range(5):
+        _exhaust(queue_name, "webhook_delivery", str(uuid4()), f"error {index}")
+
+    def _no_full_scan(**_kwargs: object) -> list[queue_dead_letters.DeadLetter]:
+        raise AssertionError("an unfiltered page must not scan the whole list")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(queue_dead_letters, "list_dead_letters", _no_full_scan)
+        letters, total = queue_dead_letters.page_dead_letters(
+            offset=1,
+            limit=2,
+            queue_name=queue_name,
+            redis_url=_REDIS_URL,
+        )
+    assert total == 5
+    assert [letter.last_error for letter in letters] == ["error 3", "error 2"]
+
+    board = str(uuid4())
+    _exhaust(queue_name, "agent_lifecycle_reconcile", board, "filtered")
+    letters, total = queue_dead_letters.page_dead_letters(
+        offset=0,
+        limit=2,
+        board_id=board,
+        queue_name=queue_name,
+        redis_url=_REDIS_URL,
+    )
+    assert total == 1
+    assert [letter.last_error for letter in letters] == ["filtered"]
+
+
+@pytest.mark.asyncio
+async def test_list_endpoint_pages_with_the_list_length_as_total(
+    queue_name: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(queue_dead_letters.settings, "rq_redis_url", _REDIS_URL)
+    monkeypatch.setattr(queue_dead_letters.settings, "rq_queue_name", queue_name)
+    for index in range(3):
+        _exhaust(queue_name, "webhook_delivery", str(uuid4()), f"error {index}")
+    app = FastAPI()
+    app.include_router(dead_letters_api.router)
+    app.dependency_overrides[require_admin_auth] = lambda: None
+    add_pagination(app)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://testserver",
+    ) as client:
+        response = await client.get("/queue/dead-letters", params={"limit": 1, "offset": 1})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert [item["last_error"] for item in body["items"]] == ["error 1"]
+
+
+def test_replay_staggers_envelopes_back_onto_their_lane(queue_name: str) -> None:
+    high = lane_queue_name(queue_name, "high")
+    for index in range(3):
+        _exhaust(high, "agent_lifecycle_reconcile", str(uuid4()), f"error {index}")
+    _exhaust(queue_name, "webhook_delivery", str(uuid4()), "kept")
+    started = time.time()
+
+    replayed = queue_dead_letters.replay_dead_letters(
+        rate_per_second=2,
+        task_type="agent_lifecycle_reconcile",
+        queue_name=queue_name,
+        redis_url=_REDIS_URL,
+    )
+
+    assert replayed == 3
+    client = redis.Redis.from_url(_REDIS_URL)
+    scheduled = client.zrange(queue._scheduled_queue_name(high), 0, -1, withscores=True)
+    client.close()
+    tasks = [queue._decode_task(raw, high) for raw, _ in scheduled]
+    scores = [score for _, score in scheduled]
+    assert [task.history[-1]["error"] for task in tasks] == ["error 0", "error 1", "error 2"]
+    assert all(task.attempts == 0 for task in tasks)
+    assert scores[0] >= started
+    assert scores[2] - scores[0] == pytest.approx(1.0)
+    remaining = queue_dead_letters.list_dead_letters(queue_name=queue_name, redis_url=_REDIS_URL)
+    assert [letter.last_error for letter in remaining] == ["kept"]
+    assert (
+        queue_dead_letters.replay_dead_letters(
+            rate_per_second=2,
+            task_type="agent_lifecycle_reconcile",
+            queue_name=queue_name,
+            redis_url=_REDIS_URL,
+        )
+        == 0
+    )
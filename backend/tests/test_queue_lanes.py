@@ -0,0 +1,126 @@
+# ruff: noqa: INP001
+"""Priority lane routing and weighted fair dequeue tests."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+import app.services.openclaw.lifecycle_queue as lifecycle_queue
+from app.core.time import utcnow
+from app.services import queue_worker
+from app.services.queue import QUEUE_LANE_DEFAULT, QUEUE_LANE_HIGH, QueuedTask, lane_queue_name
+from app.services.queue_backend import InMemoryQueueBackend
+
+
+def test_lane_queue_names_keep_default_lane_backward_compatible() -> None:
+    assert lane_queue_name("default") == "default"
+    assert lane_queue_name("default", QUEUE_LANE_DEFAULT) == "default"
+    assert lane_queue_name("default", QUEUE_LANE_HIGH) == "default:lane:high"
+
+
+def test_lifecycle_reconcile_is_enqueued_on_high_lane(monkeypatch: pytest.MonkeyPatch) -> None:
+    captured: list[str] = []
+
+    def _fake_enqueue_with_delay(task: QueuedTask, queue_name: str, **kwargs: object) -> bool:
+        del task, kwargs
+        captured.append(queue_name)
+        return True
+
+    monkeypatch.setattr(
+        lifecycle_queue,
+        "enqueue_keyed_task_with_delay",
+        _fake_enqueue_with_delay,
+    )
+
+    assert lifecycle_queue.enqueue_lifecycle_reconcile(
+        lifecycle_queue.QueuedAgentLifecycleReconcile(
+            agent_id=uuid4(),
+            gateway_id=uuid4(),
+            board_id=None,
+            generation=1,
+            checkin_deadline_at=utcnow() + timedelta(seconds=30),
+        ),
+    )
+    assert captured == [lane_queue_name(lifecycle_queue.settings.rq_queue_name, "high")]
+    assert queue_worker._TASK_HANDLERS[lifecycle_queue.TASK_TYPE].lane == QUEUE_LANE_HIGH
+
+
+def _install_lanes(
+    monkeypatch: pytest.MonkeyPatch,
+    lanes: dict[str, list[QueuedTask]],
+) -> tuple[list[str], InMemoryQueueBackend]:
+    dispatched: list[str] = []
+    backend = InMemoryQueueBackend()
+    for lane, tasks in lanes.items():
+        for task in tasks:
+            backend.enqueue(task, lane_queue_name("bench-queue", lane))
+
+    async def _handler(task: QueuedTask) -> None:
+        dispatched.append(task.task_type)
+
+    for task_type, lane in (("urgent", QUEUE_LANE_HIGH), ("bulk", QUEUE_LANE_DEFAULT)):
+        monkeypatch.setitem(
+            queue_worker._TASK_HANDLERS,
+            task_type,
+            queue_worker._TaskHandler(
+                handler=_handler,
+                attempts_to_delay=lambda attempts: 0,
+                requeue=lambda task, delay: True,
+                lane=lane,
+            ),
+        )
+    monkeypatch.setattr(queue_worker.settings, "rq_queue_name", "bench-queue")
+    monkeypatch.setattr(queue_worker.settings, "rq_dequeue_batch_size", 50)
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 0)
+    monkeypatch.setattr(queue_worker.settings, "rq_lane_weights", {"high": 4, "default": 1})
+    return dispatched, backend
+
+
+def _tasks(task_type: str, count: int) -> list[QueuedTask]:
+    return [
+        QueuedTask(task_type=task_type, payload={}, created_at=datetime.now(UTC))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_high_lane_is_not_stuck_behind_default_backlog(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    lanes = {QUEUE_LANE_DEFAULT: _tasks("bulk", 200), QUEUE_LANE_HIGH: []}
+    dispatched, backend = _install_lanes(monkeypatch, lanes)
+    # Pre-buffer a big default batch, then let urgent work arrive behind it.
+    scheduler = queue_worker._LaneScheduler(queue_worker.settings.rq_lane_weights, backend)
+    first = scheduler.next_unit(block=False, block_timeout=0)
+    assert first is not None and first.tasks[0].task_type == "bulk"
+    for task in _tasks("urgent", 8):
+        backend.enqueue(task, lane_queue_name("bench-queue", QUEUE_LANE_HIGH))
+
+    order: list[str] = []
+    while (unit := scheduler.next_unit(block=False, block_timeout=0)) is not None:
+        order.append(unit.tasks[0].task_type)
+
+    urgent_positions = [index for index, task_type in enumerate(order) if task_type == "urgent"]
+    assert len(urgent_positions) == 8
+    # Weights 4:1 let at most one bulk unit in per rotation while urgent work is pending.
+    assert max(urgent_positions) < 11
+    assert order.count("bulk") == 199
+    assert dispatched == []
+
+
+@pytest.mark.asyncio
+async def test_default_lane_still_progresses_under_high_lane_flood(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    lanes = {QUEUE_LANE_HIGH: _tasks("urgent", 100), QUEUE_LANE_DEFAULT: _tasks("bulk", 3)}
+    dispatched, backend = _install_lanes(monkeypatch, lanes)
+
+    processed = await queue_worker.flush_queue(concurrency=1, backend=backend)
+
+    assert processed == 103
+    bulk_positions = [index for index, task_type in enumerate(dispatched) if task_type == "bulk"]
+    # Smooth weighted round-robin interleaves one bulk unit per five picks.
+    assert bulk_positions == [2, 7, 12]
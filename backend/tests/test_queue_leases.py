@@ -0,0 +1,262 @@
+# ruff: noqa: INP001
+"""Lease-based (at-least-once) dequeue tests against a real local Redis.
+
+Set ``QUEUE_TEST_REDIS_URL`` to point at a disposable Redis instance; the tests are
+skipped when it cannot be reached.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+import redis
+
+from app.services import queue, queue_leases, queue_worker
+from app.services.queue import QueuedTask, enqueue_task
+
+_REDIS_URL = os.environ.get("QUEUE_TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest.fixture
+def redis_client() -> redis.Redis:
+    client = redis.Redis.from_url(_REDIS_URL, socket_connect_timeout=0.5)
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip(f"local Redis not reachable at {_REDIS_URL}")
+    return client
+
+
+@pytest.fixture
+def queue_name(redis_client: redis.Redis, monkeypatch: pytest.MonkeyPatch) -> str:
+    monkeypatch.setattr(queue, "_sync_clients", {})
+    name = f"test-leases-{uuid4().hex}"
+    yield name
+    queue.close_redis_clients()
+    keys = list(redis_client.scan_iter(f"{name}*"))
+    if keys:
+        redis_client.delete(*keys)
+
+
+def _push(queue_name: str, *indexes: int) -> None:
+    for index in indexes:
+        enqueue_task(
+            QueuedTask(task_type="bench", payload={"index": index}, created_at=datetime.now(UTC)),
+            queue_name,
+            redis_url=_REDIS_URL,
+        )
+
+
+def _indexes(redis_client: redis.Redis, key: str) -> list[int]:
+    # Consumption order: the ready list is consumed from the right.
+    raw_items = reversed(redis_client.lrange(key, 0, -1))
+    return [queue._decode_task(raw, key).payload["index"] for raw in raw_items]
+
+
+def test_leased_tasks_stay_in_processing_until_acknowledged(
+    redis_client: redis.Redis,
+    queue_name: str,
+) -> None:
+    _push(queue_name, 0, 1, 2)
+
+    tasks = queue_leases.dequeue_tasks_leased(
+        queue_name,
+        max_items=2,
+        owner="worker-a",
+        redis_url=_REDIS_URL,
+    )
+
+    assert [task.payload["index"] for task in tasks] == [0, 1]
+    processing = queue_leases.processing_key(queue_name, "worker-a")
+    assert redis_client.llen(processing) == 2
+    assert redis_client.zscore(queue_leases.leases_key(queue_name), "worker-a") is not None
+    assert queue_leases.ack_tasks(tasks, redis_url=_REDIS_URL) == 2
+    assert redis_client.llen(processing) == 0
+    assert _indexes(redis_client, queue_name) == [2]
+
+
+def test_expired_leases_are_requeued_oldest_first(
+    redis_client: redis.Redis,
+    queue_name: str,
+) -> None:
+    _push(queue_name, 0, 1, 2, 3)
+    crashed = queue_leases.dequeue_tasks_leased(
+        queue_name,
+        max_items=3,
+        owner="worker-a",
+        redis_url=_REDIS_URL,
+    )
+    assert len(crashed) == 3
+    queue_leases.renew_leases(queue_name, owner="worker-b", redis_url=_REDIS_URL)
+
+    # worker-a's lease is still live, so nothing is reaped yet.
+    assert queue_leases.reap_expired_leases(queue_name, redis_url=_REDIS_URL) == 0
+    redis_client.zadd(queue_leases.leases_key(queue_name), {"worker-a": 1})
+    assert queue_leases.reap_expired_leases(queue_name, redis_url=_REDIS_URL) == 3
+
+    assert _indexes(redis_client, queue_name) == [0, 1, 2, 3]
+    assert redis_client.zrange(queue_leases.leases_key(queue_name), 0, -1) == [b"worker-b"]
+    # A late ack from the crashed worker finds nothing to remove.
+    assert queue_leases.ack_tasks(crashed, redis_url=_REDIS_URL) == 0
+
+
+def test_release_leases_hands_back_inflight_tasks(
+    redis_client: redis.Redis,
+    queue_name: str,
+) -> None:
+    _push(queue_name, 0, 1)
+    queue_leases.dequeue_tasks_leased(
+        queue_name,
+        max_items=5,
+        owner="worker-a",
+        redis_url=_REDIS_URL,
+    )
+
+    assert queue_leases.release_leases(queue_name, owner="worker-a", redis_url=_REDIS_URL) == 2
+    assert _indexes(redis_client, queue_name) == [0, 1]
+
+
+def test_blocking_leased_dequeue_times_out_and_wakes(queue_name: str) -> None:
+    assert (
+        queue_leases.dequeue_tasks_leased(
+            queue_name,
+            max_items=5,
+            owner="worker-a",
+            redis_url=_REDIS_URL,
+            block=True,
+            block_timeout=0.1,
+        )
+        == []
+    )
+    _push(queue_name, 0)
+    tasks = queue_leases.dequeue_tasks_leased(
+        [queue_name],
+        max_items=5,
+        owner="worker-a",
+        redis_url=_REDIS_URL,
+        block=True,
+        block_timeout=0.1,
+    )
+    assert [task.payload["index"] for task in tasks] == [0]
+
+
+@pytest.mark.asyncio
+async def test_worker_acknowledges_leased_tasks_after_success_and_failure(
+    redis_client: redis.Redis,
+    queue_name: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    handled: list[int] = []
+    requeued: list[QueuedTask] = []
+
+    async def _handler(task: QueuedTask) -> None:
+        handled.append(task.payload["index"])
+        if task.payload["index"] == 1:
+            raise RuntimeError("gateway down")
+
+    def _requeue(task: QueuedTask, delay: float) -> bool:
+        del delay
+        requeued.append(task)
+        return True
+
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "bench",
+        queue_worker._TaskHandler(
+            handler=_handler,
+            attempts_to_delay=lambda attempts: 0,
+            requeue=_requeue,
+        ),
+    )
+    monkeypatch.setattr(queue_worker.settings, "rq_queue_name", queue_name)
+    monkeypatch.setattr(queue_worker.settings, "rq_redis_url", _REDIS_URL)
+    monkeypatch.setattr(queue_worker.settings, "rq_reliable_dequeue", True)
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 0)
+    _push(queue_name, 0, 1, 2)
+
+    assert await queue_worker.flush_queue(concurrency=1) == 2
+
+    assert sorted(handled) == [0, 1, 2]
+    assert [task.payload["index"] for task in requeued] == [1]
+    processing = queue_leases.processing_key(queue_name, queue_leases.worker_id())
+    assert redis_client.llen(processing) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_requeue_leaves_only_that_task_leased(
+    redis_client: redis.Redis,
+    queue_name: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def _single(task: QueuedTask) -> None:
+        del task
+        raise RuntimeError("gateway down")
+
+    async def _batch(batch: list[QueuedTask]) -> None:
+        del batch
+        raise RuntimeError("gateway down")
+
+    def _requeue(task: QueuedTask, delay: float) -> bool:
+        if task.payload["index"] == 0:
+            raise queue.QueueWriteError("redis down")
+        return queue.requeue_if_failed(
+            task,
+            queue_name,
+            max_retries=3,
+            redis_url=_REDIS_URL,
+            delay_seconds=delay + 60,
+        )
+
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "bench",
+        queue_worker._TaskHandler(
+            handler=_single,
+            attempts_to_delay=lambda attempts: 0,
+            requeue=_requeue,
+            throttle_key=lambda task: "target",
+            batch_handler=_batch,
+        ),
+    )
+    monkeypatch.setattr(queue_worker.settings, "rq_queue_name", queue_name)
+    monkeypatch.setattr(queue_worker.settings, "rq_redis_url", _REDIS_URL)
+    monkeypatch.setattr(queue_worker.settings, "rq_reliable_dequeue", True)
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 0)
+    _push(queue_name, 0, 1, 2)
+
+    assert await queue_worker.flush_queue(concurrency=1) == 0
+
+    processing = queue_leases.processing_key(queue_name, queue_leases.worker_id())
+    assert _indexes(redis_client, processing) == [0]
+    scheduled = redis_client.zrange(queue._scheduled_queue_name(queue_name), 0, -1)
+    assert sorted(queue._decode_task(raw, queue_name).payload["index"] for raw in scheduled) == [
+        1,
+        2,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_worker_dead_letters_unknown_task_types_instead_of_holding_them(
+    redis_client: redis.Redis,
+    queue_name: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(queue_worker.settings, "rq_queue_name", queue_name)
+    monkeypatch.setattr(queue_worker.settings, "rq_redis_url", _REDIS_URL)
+    monkeypatch.setattr(queue_worker.settings, "rq_reliable_dequeue", True)
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 0)
+    enqueue_task(
+        QueuedTask(task_type="retired_task_type", payload={}, created_at=datetime.now(UTC)),
+        queue_name,
+        redis_url=_REDIS_URL,
+    )
+
+    assert await queue_worker.flush_queue(concurrency=1) == 0
+
+    processing = queue_leases.processing_key(queue_name, queue_leases.worker_id())
+    assert redis_client.llen(processing) == 0
+    assert redis_client.llen(queue_name) == 0
+    assert redis_client.llen(queue.dead_letter_key(queue_name)) == 1
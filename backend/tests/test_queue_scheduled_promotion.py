@@ -0,0 +1,170 @@
+# ruff: noqa: INP001
+"""Scheduled-task promotion tests that run against a real local Redis.
+
+Set ``QUEUE_TEST_REDIS_URL`` to point at a disposable Redis instance; the tests are
+skipped when it cannot be reached.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+import redis
+
+from app.services import queue
+
+_REDIS_URL = os.environ.get("QUEUE_TEST_REDIS_URL", "redis://localhost:6379/15")
+_DRAINER_COUNT = 16
+_TASK_COUNT = 600
+
+
+@pytest.fixture
+def redis_client() -> redis.Redis:
+    client = redis.Redis.from_url(_REDIS_URL, socket_connect_timeout=0.5)
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip(f"local Redis not reachable at {_REDIS_URL}")
+    return client
+
+
+@pytest.fixture
+def queue_name(redis_client: redis.Redis) -> str:
+    name = f"test-promotion-{uuid4().hex}"
+    yield name
+    redis_client.delete(
+        name,
+        queue._scheduled_queue_name(name),
+        queue._keyed_payloads_name(name),
+        queue._keyed_versions_name(name),
+    )
+
+
+def _keyed_task(generation: int) -> queue.QueuedTask:
+    return queue.QueuedTask(
+        task_type="keyed-task",
+        payload={"generation": generation},
+        created_at=datetime.now(UTC),
+    )
+
+
+def test_concurrent_drainers_promote_each_task_exactly_once(
+    redis_client: redis.Redis,
+    queue_name: str,
+) -> None:
+    due_at = time.time() - 1
+    members = {f"task-{index}": due_at - index / 1000 for index in range(_TASK_COUNT)}
+    redis_client.zadd(queue._scheduled_queue_name(queue_name), members)
+    barrier = threading.Barrier(_DRAINER_COUNT)
+    errors: list[BaseException] = []
+
+    def _drain() -> None:
+        client = redis.Redis.from_url(_REDIS_URL)
+        try:
+            barrier.wait()
+            while client.zcard(queue._scheduled_queue_name(queue_name)):
+                queue._drain_ready_scheduled_tasks(client, queue_name, max_items=7)
+        except BaseException as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=_drain) for _ in range(_DRAINER_COUNT)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert errors == []
+    promoted = [value.decode("utf-8") for value in redis_client.lrange(queue_name, 0, -1)]
+    assert len(promoted) == _TASK_COUNT
+    assert set(promoted) == set(members)
+    assert redis_client.zcard(queue._scheduled_queue_name(queue_name)) == 0
+
+
+def test_drain_promotes_only_due_items_and_reports_next_due(
+    redis_client: redis.Redis,
+    queue_name: str,
+) -> None:
+    now = time.time()
+    redis_client.zadd(
+        queue._scheduled_queue_name(queue_name),
+        {"due-first": now - 10, "due-second": now - 5, "later": now + 30.25},
+    )
+
+    next_delay = queue._drain_ready_scheduled_tasks(redis_client, queue_name)
+
+    # Earliest-due tasks are popped first from the right end of the ready list.
+    assert redis_client.rpop(queue_name) == b"due-first"
+    assert redis_client.rpop(queue_name) == b"due-second"
+    assert redis_client.rpop(queue_name) is None
+    assert next_delay is not None
+    assert 29 < next_delay <= 30.25
+    assert queue._drain_ready_scheduled_tasks(redis_client, queue_name) <= next_delay
+
+
+def test_drain_reports_no_next_due_when_schedule_is_empty(
+    redis_client: redis.Redis,
+    queue_name: str,
+) -> None:
+    assert queue._drain_ready_scheduled_tasks(redis_client, queue_name) is None
+
+
+def test_keyed_schedule_coalesces_and_drops_superseded_versions(
+    redis_client: redis.Redis,
+    queue_name: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(queue, "_sync_clients", {})
+    for generation in (1, 3, 3, 2):
+        assert queue.enqueue_keyed_task_with_delay(
+            _keyed_task(generation),
+            queue_name,
+            dedup_key="agent-a",
+            version=generation,
+            delay_seconds=60,
+            redis_url=_REDIS_URL,
+        )
+    # Re-scheduling the current version moves its due time; other keys stay independent.
+    queue.enqueue_keyed_task_with_delay(
+        _keyed_task(3),
+        queue_name,
+        dedup_key="agent-a",
+        version=3,
+        delay_seconds=0,
+        redis_url=_REDIS_URL,
+    )
+    queue.enqueue_keyed_task_with_delay(
+        _keyed_task(1),
+        queue_name,
+        dedup_key="agent-b",
+        version=1,
+        delay_seconds=60,
+        redis_url=_REDIS_URL,
+    )
+
+    assert redis_client.zcard(queue._scheduled_queue_name(queue_name)) == 2
+    queue._drain_ready_scheduled_tasks(redis_client, queue_name)
+
+    ready = [queue._decode_task(raw, queue_name) for raw in redis_client.lrange(queue_name, 0, -1)]
+    assert [task.payload["generation"] for task in ready] == [3]
+    assert redis_client.hkeys(queue._keyed_payloads_name(queue_name)) == [b"agent-b"]
+    # Promotion forgets the key's version, so the hashes only hold pending keys.
+    assert redis_client.hkeys(queue._keyed_versions_name(queue_name)) == [b"agent-b"]
+
+    # A late enqueue of an older generation is scheduled again; the consumer skips it.
+    queue.enqueue_keyed_task_with_delay(
+        _keyed_task(2),
+        queue_name,
+        dedup_key="agent-a",
+        version=2,
+        delay_seconds=0,
+        redis_url=_REDIS_URL,
+    )
+    queue.close_redis_clients()
+    assert redis_client.zcard(queue._scheduled_queue_name(queue_name)) == 2
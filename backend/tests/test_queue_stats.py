@@ -0,0 +1,123 @@
+# ruff: noqa: INP001
+"""Queue stats counters, latency histograms and snapshot tests.
+
+The snapshot test runs against ``QUEUE_TEST_REDIS_URL`` and is skipped when it cannot be
+reached.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+import redis
+
+from app.services import queue, queue_stats
+from app.services.queue import QUEUE_LANE_HIGH, QueuedTask, lane_queue_name
+from app.services.queue_backend import RedisQueueBackend
+
+_REDIS_URL = os.environ.get("QUEUE_TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+def test_stats_keys_are_shared_across_lanes() -> None:
+    assert queue.stats_key("default", "enqueued") == "default:stats:enqueued"
+    assert queue.stats_key(lane_queue_name("default", QUEUE_LANE_HIGH), "enqueued", 7) == (
+        "default:stats:enqueued:7"
+    )
+
+
+def test_latency_histogram_reports_cumulative_buckets_and_percentiles() -> None:
+    fields = {
+        queue_stats._bucket_field(3.0): 50,
+        queue_stats._bucket_field(40.0): 49,
+        queue_stats._bucket_field(120_000.0): 1,
+    }
+    assert set(fields) == {"le:5", "le:50", "le:inf"}
+    raw = {**fields, "count": 100, "failed": 2, "sum_ms": "2500.5"}
+
+    latency = queue_stats._latency_from_hash(raw)
+
+    assert latency is not None
+    assert latency.p50_ms == 5
+    assert latency.p99_ms == 50
+    assert latency.buckets[-1].le_ms is None
+    assert latency.buckets[-1].count == 100
+    assert latency.failed == 2
+    assert queue_stats._latency_from_hash({}) is None
+
+
+def _task(task_type: str) -> QueuedTask:
+    return QueuedTask(task_type=task_type, payload={}, created_at=datetime.now(UTC))
+
+
+@pytest.mark.asyncio
+async def test_collect_queue_stats_reports_depth_lag_rates_and_outcomes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = redis.Redis.from_url(_REDIS_URL, socket_connect_timeout=0.5)
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip(f"local Redis not reachable at {_REDIS_URL}")
+    name = f"test-stats-{uuid4().hex}"
+    monkeypatch.setattr(queue, "_sync_clients", {})
+    try:
+        for task_type in ("alpha", "alpha", "alpha", "beta"):
+            assert queue.enqueue_task(_task(task_type), name, redis_url=_REDIS_URL)
+        high = lane_queue_name(name, QUEUE_LANE_HIGH)
+        client.zadd(queue._scheduled_queue_name(high), {"overdue": time.time() - 30})
+        assert len(queue.dequeue_tasks(name, max_items=2, redis_url=_REDIS_URL)) == 2
+        assert queue.requeue_if_failed(_task("alpha"), name, max_retries=3, redis_url=_REDIS_URL)
+        assert queue.requeue_if_failed(
+            _task("alpha"), name, max_retries=3, redis_url=_REDIS_URL, delay_seconds=60
+        )
+        assert not queue.requeue_if_failed(_task("beta"), name, max_retries=0, redis_url=_REDIS_URL)
+        # A worker deferral of a keyed task is a put-back, not a fresh enqueue.
+        assert RedisQueueBackend(redis_url=_REDIS_URL).enqueue(
+            _task("alpha"),
+            name,
+            delay_seconds=60,
+            dedup_key="alpha:1",
+            version=1,
+            count_enqueued=False,
+        )
+        await queue_stats.record_handler_latency(
+            "alpha", 0.02, failed=False, queue_name=name, redis_url=_REDIS_URL
+        )
+        # Read one interval later; a two-interval window still covers every counter above if
+        # they straddled an interval boundary.
+        monkeypatch.setattr(
+            queue_stats, "_now_seconds", lambda: time.time() + queue.STATS_INTERVAL_SECONDS
+        )
+
+        stats = await queue_stats.collect_queue_stats(
+            queue_name=name,
+            lanes=["high", "default"],
+            rate_window_seconds=120,
+            redis_url=_REDIS_URL,
+        )
+    finally:
+        await queue.close_async_redis_clients()
+        queue.close_redis_clients()
+        keys = list(client.scan_iter(f"{name}*"))
+        if keys:
+            client.delete(*keys)
+        client.close()
+
+    lanes = {lane.lane: lane for lane in stats.lanes}
+    assert lanes["default"].ready_depth == 3
+    assert lanes["high"].scheduled_size == 1
+    assert lanes["high"].oldest_due_lag_seconds >= 30
+    by_type = {item.task_type: item for item in stats.task_types}
+    # Retries count as retried only, not as fresh enqueues.
+    assert by_type["alpha"].enqueued_total == 3
+    assert by_type["alpha"].dequeued_total == 2
+    assert by_type["alpha"].retried_total == 2
+    assert by_type["beta"].dropped_total == 1
+    assert by_type["alpha"].enqueue_rate_per_second == pytest.approx(3 / 120)
+    assert by_type["alpha"].latency is not None
+    assert by_type["alpha"].latency.p50_ms == 25
+    assert by_type["beta"].latency is None
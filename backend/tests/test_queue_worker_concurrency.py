@@ -0,0 +1,330 @@
+# ruff: noqa: INP001
+"""Concurrent queue worker mode tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+from dataclasses import replace
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+
+from app.services import queue_worker
+from app.services.queue import QueuedTask, TaskReceipt
+from app.services.queue_backend import InMemoryQueueBackend
+
+
+def _task(task_type: str, **payload: object) -> QueuedTask:
+    return QueuedTask(task_type=task_type, payload=payload, created_at=datetime.now(UTC))
+
+
+def _backend(tasks: list[QueuedTask]) -> InMemoryQueueBackend:
+    backend = InMemoryQueueBackend()
+    for task in tasks:
+        backend.enqueue(task, queue_worker.settings.rq_queue_name)
+    return backend
+
+
+class _RecordingBackend(InMemoryQueueBackend):
+    def __init__(self) -> None:
+        super().__init__()
+        self.deferred: list[tuple[QueuedTask, float, str | None, bool]] = []
+
+    def enqueue(
+        self,
+        task: QueuedTask,
+        queue_name: str,
+        *,
+        delay_seconds: float = 0,
+        dedup_key: str | None = None,
+        version: int = 0,
+        count_enqueued: bool = True,
+    ) -> bool:
+        if delay_seconds > 0:
+            self.deferred.append((task, delay_seconds, dedup_key, count_enqueued))
+        return super().enqueue(
+            task,
+            queue_name,
+            delay_seconds=delay_seconds,
+            dedup_key=dedup_key,
+            version=version,
+            count_enqueued=count_enqueued,
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_flush_runs_up_to_n_handlers_at_once(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    backend = _backend([_task("bench", board_id=str(uuid4())) for _ in range(12)])
+    running = 0
+    peak = 0
+
+    async def _handler(task: QueuedTask) -> None:
+        nonlocal running, peak
+        del task
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "bench",
+        queue_worker._TaskHandler(
+            handler=_handler,
+            attempts_to_delay=lambda attempts: 0,
+            requeue=lambda task, delay: True,
+            throttle_key=queue_worker._payload_target("board", "board_id"),
+        ),
+    )
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 15)
+
+    processed = await queue_worker.flush_queue(concurrency=4, backend=backend)
+
+    assert processed == 12
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_flush_throttles_per_target_not_globally(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    hot_board = str(uuid4())
+    cold_board = str(uuid4())
+    tasks = [
+        _task("bench", board_id=hot_board),
+        _task("bench", board_id=hot_board),
+        _task("bench", board_id=cold_board),
+    ]
+    backend = _RecordingBackend()
+    for task in tasks:
+        backend.enqueue(task, queue_worker.settings.rq_queue_name)
+    handled: list[str] = []
+
+    async def _handler(task: QueuedTask) -> None:
+        handled.append(str(task.payload["board_id"]))
+
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "bench",
+        queue_worker._TaskHandler(
+            handler=_handler,
+            attempts_to_delay=lambda attempts: 0,
+            requeue=lambda task, delay: True,
+            throttle_key=queue_worker._payload_target("board", "board_id"),
+        ),
+    )
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 15)
+
+    processed = await queue_worker.flush_queue(concurrency=2, backend=backend)
+
+    assert processed == 2
+    assert sorted(handled) == sorted([hot_board, cold_board])
+    assert len(backend.deferred) == 1
+    assert backend.deferred[0][0].payload["board_id"] == hot_board
+    assert 14 < backend.deferred[0][1] <= 15
+    assert backend.deferred[0][2:] == (None, False)
+    assert backend.depth(queue_worker.settings.rq_queue_name) == 1
+
+
+@pytest.mark.asyncio
+async def test_throttled_keyed_task_is_deferred_under_its_dedup_key(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    board_id = str(uuid4())
+    backend = _RecordingBackend()
+    for generation in (1, 1):
+        backend.enqueue(
+            _task("bench", board_id=board_id, generation=generation),
+            queue_worker.settings.rq_queue_name,
+        )
+
+    async def _handler(task: QueuedTask) -> None:
+        del task
+
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "bench",
+        queue_worker._TaskHandler(
+            handler=_handler,
+            attempts_to_delay=lambda attempts: 0,
+            requeue=lambda task, delay: True,
+            throttle_key=queue_worker._payload_target("board", "board_id"),
+            dedup=lambda task: (f"bench:{task.payload['board_id']}", task.payload["generation"]),
+        ),
+    )
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 15)
+
+    processed = await queue_worker.flush_queue(concurrency=2, backend=backend)
+
+    assert processed == 1
+    assert [entry[2:] for entry in backend.deferred] == [(f"bench:{board_id}", False)]
+    # A newer check scheduled for the key supersedes the deferred one.
+    backend.enqueue(
+        _task("bench", board_id=board_id, generation=2),
+        queue_worker.settings.rq_queue_name,
+        dedup_key=f"bench:{board_id}",
+        version=2,
+    )
+    assert backend.depth(queue_worker.settings.rq_queue_name) == 1
+
+
+def test_target_throttle_spaces_claims_per_key() -> None:
+    throttle = queue_worker._TargetThrottle(10)
+
+    assert throttle.claim("board:a") == 0
+    assert throttle.claim("board:b") == 0
+    assert 9 < throttle.claim("board:a") <= 10
+    assert throttle.claim(None) == 0
+    assert queue_worker._TargetThrottle(0).claim("board:a") == 0
+
+
+def test_builtin_handlers_throttle_by_board_and_gateway() -> None:
+    board_id = str(uuid4())
+    gateway_id = str(uuid4())
+    webhook = queue_worker._TASK_HANDLERS[queue_worker.WEBHOOK_TASK_TYPE]
+    lifecycle = queue_worker._TASK_HANDLERS[queue_worker.LIFECYCLE_RECONCILE_TASK_TYPE]
+
+    assert webhook.throttle_key(_task("webhook_delivery", board_id=board_id)) == (
+        f"board:{board_id}"
+    )
+    assert lifecycle.throttle_key(
+        _task("agent_lifecycle_reconcile", gateway_id=gateway_id, board_id=board_id)
+    ) == (f"gateway:{gateway_id}")
+
+
+@pytest.mark.asyncio
+async def test_flush_batches_tasks_per_target_when_handler_supports_it(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    board_a = str(uuid4())
+    board_b = str(uuid4())
+    tasks = [_task("bench", board_id=board_a) for _ in range(5)]
+    tasks += [_task("bench", board_id=board_b), _task("other", board_id=board_a)]
+    backend = _backend(tasks)
+    batches: list[list[str]] = []
+    singles: list[str] = []
+
+    async def _single(task: QueuedTask) -> None:
+        singles.append(f"{task.task_type}:{task.payload['board_id']}")
+
+    async def _batch(batch: list[QueuedTask]) -> None:
+        batches.append([str(task.payload["board_id"]) for task in batch])
+
+    handler_kwargs = {
+        "attempts_to_delay": lambda attempts: 0,
+        "requeue": lambda task, delay: True,
+        "throttle_key": queue_worker._payload_target("board", "board_id"),
+    }
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "bench",
+        queue_worker._TaskHandler(handler=_single, batch_handler=_batch, **handler_kwargs),
+    )
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "other",
+        queue_worker._TaskHandler(handler=_single, **handler_kwargs),
+    )
+    monkeypatch.setattr(queue_worker.settings, "rq_dequeue_batch_size", 50)
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 0)
+
+    processed = await queue_worker.flush_queue(concurrency=1, backend=backend)
+
+    assert processed == 7
+    assert batches == [[board_a] * 5]
+    assert sorted(singles) == sorted([f"bench:{board_b}", f"other:{board_a}"])
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_requeues_every_task(monkeypatch: pytest.MonkeyPatch) -> None:
+    board_id = str(uuid4())
+    tasks = [_task("bench", board_id=board_id) for _ in range(3)]
+    backend = _backend(tasks)
+    requeued: list[QueuedTask] = []
+
+    async def _single(task: QueuedTask) -> None:
+        del task
+
+    async def _batch(batch: list[QueuedTask]) -> None:
+        del batch
+        raise RuntimeError("db down")
+
+    def _requeue(task: QueuedTask, delay: float) -> bool:
+        del delay
+        requeued.append(task)
+        return True
+
+    monkeypatch.setitem(
+        queue_worker._TASK_HANDLERS,
+        "bench",
+        queue_worker._TaskHandler(
+            handler=_single,
+            attempts_to_delay=lambda attempts: 0,
+            requeue=_requeue,
+            throttle_key=queue_worker._payload_target("board", "board_id"),
+            batch_handler=_batch,
+        ),
+    )
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 0)
+
+    assert await queue_worker.flush_queue(concurrency=2, backend=backend) == 0
+    assert [task.payload for task in requeued] == [task.payload for task in tasks]
+    assert all(task.history[-1]["error"] == "db down" for task in requeued)
+
+
+class _LeasingBackend(InMemoryQueueBackend):
+    """Tracks dequeued envelopes as leased until they are acknowledged."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.processing: list[str] = []
+
+    def dequeue(
+        self,
+        queue_name: str | Sequence[str],
+        *,
+        max_items: int,
+        block: bool = False,
+        block_timeout: float = 0,
+    ) -> list[QueuedTask]:
+        tasks = super().dequeue(
+            queue_name,
+            max_items=max_items,
+            block=block,
+            block_timeout=block_timeout,
+        )
+        leased = [
+            replace(task, receipt=TaskReceipt("processing", task.to_json())) for task in tasks
+        ]
+        self.processing.extend(task.to_json() for task in tasks)
+        return leased
+
+    def ack(self, tasks: Sequence[QueuedTask]) -> int:
+        acked = 0
+        for task in tasks:
+            if task.receipt is not None and task.receipt.raw in self.processing:
+                self.processing.remove(task.receipt.raw)
+                acked += 1
+        return acked
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [1, 4])
+async def test_unknown_task_types_are_dead_lettered_and_acknowledged(
+    monkeypatch: pytest.MonkeyPatch,
+    concurrency: int,
+) -> None:
+    monkeypatch.setattr(queue_worker.settings, "rq_dispatch_throttle_seconds", 0)
+    backend = _LeasingBackend()
+    backend.enqueue(_task("retired_task_type", index=0), queue_worker.settings.rq_queue_name)
+
+    assert await queue_worker.flush_queue(concurrency=concurrency, backend=backend) == 0
+
+    assert backend.processing == []
+    [dead] = backend.dead_letters(queue_worker.settings.rq_queue_name)
+    assert dead.task_type == "retired_task_type"
+    assert dead.history[-1]["error"] == "unknown task type: retired_task_type"
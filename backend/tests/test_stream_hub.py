@@ -0,0 +1,342 @@
+# ruff: noqa: INP001
+"""Shared SSE fan-out hub tests."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncGenerator, AsyncIterator
+from datetime import datetime, timedelta
+from typing import Any, cast
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import Request
+
+from app.core.time import utcnow
+from app.services.change_bus import ENTITY_BOARD_MEMORY, ChangeNotification, change_bus
+from app.services.stream_hub import (
+    RESYNC_EVENT,
+    SETTLE_SECONDS,
+    HubSubscription,
+    StreamCursor,
+    StreamEvent,
+    StreamHub,
+    last_event_id,
+    multiplex,
+)
+
+
+class _FakeRequest:
+    def __init__(self, last_event_id: str | None = None) -> None:
+        self.disconnected = False
+        self.headers = {"last-event-id": last_event_id} if last_event_id is not None else {}
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+class _FakeRows:
+    """Stand-in for the database rows behind a stream."""
+
+    def __init__(self) -> None:
+        self.events: list[StreamEvent] = []
+
+    def add(
+        self,
+        created_at: datetime | None = None,
+        *,
+        seq: int | None = None,
+        coalesce_key: str | None = None,
+    ) -> StreamEvent:
+        event = StreamEvent(
+            id=uuid4(),
+            seq=seq if seq is not None else len(self.events) + 1,
+            created_at=created_at or utcnow(),
+            event="memory",
+            data=f'{{"n": {len(self.events)}}}',
+            coalesce_key=coalesce_key,
+        )
+        self.events.append(event)
+        return event
+
+    async def fetch(self, cursor: StreamCursor) -> list[StreamEvent]:
+        if cursor.after_seq is not None:
+            after_seq = cursor.after_seq
+            return sorted(
+                (event for event in self.events if (event.seq or 0) > after_seq),
+                key=lambda event: event.seq or 0,
+            )
+        assert cursor.since is not None
+        since = cursor.since
+        return [event for event in self.events if event.created_at >= since]
+
+
+def _stream(
+    hub: StreamHub,
+    rows: _FakeRows,
+    board_id: UUID,
+    *,
+    since: datetime,
+    request: _FakeRequest | None = None,
+) -> AsyncIterator[dict[str, str]]:
+    request = request or _FakeRequest()
+    return hub.stream(
+        cast(Request, request),
+        ("board_memory", board_id),
+        fetch=rows.fetch,
+        since=since,
+        resume_after=last_event_id(cast(Request, request)),
+        board_ids={board_id},
+        entities={ENTITY_BOARD_MEMORY},
+        poll_seconds=0.05,
+    )
+
+
+async def _next(stream: AsyncIterator[dict[str, str]]) -> dict[str, str]:
+    return await asyncio.wait_for(anext(stream), 2)
+
+
+@pytest.mark.asyncio
+async def test_subscribers_of_one_board_share_a_single_fetch_loop() -> None:
+    hub = StreamHub(queue_size=10)
+    rows = _FakeRows()
+    board_id = uuid4()
+    old = rows.add(utcnow() - timedelta(minutes=5))
+    first = _stream(hub, rows, board_id, since=old.created_at)
+    second = _stream(hub, rows, board_id, since=utcnow())
+
+    # Backfill honours each subscriber's own ``since``.
+    assert (await _next(first))["data"] == old.data
+    pending_second = asyncio.ensure_future(_next(second))
+    await asyncio.sleep(0.01)
+    assert hub.feed_count() == 1
+    assert hub.subscriber_count(("board_memory", board_id)) == 2
+
+    fresh = rows.add()
+    change_bus.dispatch([ChangeNotification(board_id, ENTITY_BOARD_MEMORY, fresh.id)])
+    received: list[dict[str, Any]] = [await _next(first), await pending_second]
+
+    assert [item["data"] for item in received] == [fresh.data, fresh.data]
+
+    await first.aclose()
+    assert hub.subscriber_count(("board_memory", board_id)) == 1
+    await second.aclose()
+    assert hub.feed_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_subscriber_that_falls_behind_is_disconnected() -> None:
+    hub = StreamHub(queue_size=2)
+    rows = _FakeRows()
+    board_id = uuid4()
+    slow = _stream(hub, rows, board_id, since=utcnow())
+    fast = _stream(hub, rows, board_id, since=utcnow())
+    pending_slow = asyncio.ensure_future(_next(slow))
+    fast_received: list[str] = []
+
+    async def _drain_fast() -> None:
+        async for item in fast:
+            fast_received.append(item["data"])
+
+    drain = asyncio.ensure_future(_drain_fast())
+    await asyncio.sleep(0.01)
+    first = rows.add()
+    change_bus.dispatch([ChangeNotification(board_id, ENTITY_BOARD_MEMORY)])
+    assert (await pending_slow)["data"] == first.data
+
+    # ``slow`` stops reading: two events fill its queue, the third overflows it.
+    queued = [rows.add(), rows.add()]
+    change_bus.dispatch([ChangeNotification(board_id, ENTITY_BOARD_MEMORY)])
+    await asyncio.sleep(0.05)
+    last = rows.add()
+    change_bus.dispatch([ChangeNotification(board_id, ENTITY_BOARD_MEMORY)])
+    await asyncio.sleep(0.05)
+
+    # It drains what was queued, then its stream ends with a hint so the client reconnects.
+    drained = [item async for item in slow]
+    assert [item["data"] for item in drained[:2]] == [queued[0].data, queued[1].data]
+    assert drained[2]["event"] == RESYNC_EVENT
+    assert json.loads(drained[2]["data"])["last_event_id"] == str(queued[1].seq)
+    assert fast_received == [first.data, queued[0].data, queued[1].data, last.data]
+    assert hub.subscriber_count(("board_memory", board_id)) == 1
+    drain.cancel()
+    await asyncio.gather(drain, return_exceptions=True)
+    assert hub.feed_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_when_client_disconnects() -> None:
+    hub = StreamHub(queue_size=10)
+    rows = _FakeRows()
+    board_id = uuid4()
+    request = _FakeRequest()
+    stream = _stream(hub, rows, board_id, since=utcnow(), request=request)
+    pending = asyncio.ensure_future(anext(stream, None))
+    await asyncio.sleep(0.01)
+    assert hub.feed_count() == 1
+
+    request.disconnected = True
+
+    assert await asyncio.wait_for(pending, 2) is None
+    assert hub.feed_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_reconnect_resumes_after_last_event_id() -> None:
+    hub = StreamHub(queue_size=10)
+    rows = _FakeRows()
+    board_id = uuid4()
+    now = utcnow()
+    # Same timestamp: a ``since`` cursor cannot tell these apart, a sequence can.
+    delivered = rows.add(now)
+    missed = rows.add(now)
+    stream = _stream(hub, rows, board_id, since=now, request=_FakeRequest(str(delivered.seq)))
+
+    message = await _next(stream)
+
+    assert message == {"id": str(missed.seq), "event": "memory", "data": missed.data}
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_feed_delivers_lower_sequence_committed_late() -> None:
+    hub = StreamHub(queue_size=10)
+    rows = _FakeRows()
+    board_id = uuid4()
+    stream = _stream(hub, rows, board_id, since=utcnow())
+    pending = asyncio.ensure_future(_next(stream))
+    await asyncio.sleep(0.01)
+
+    later = rows.add(seq=11)
+    change_bus.dispatch([ChangeNotification(board_id, ENTITY_BOARD_MEMORY)])
+    assert (await pending)["id"] == str(later.seq)
+
+    # Sequence 10 was assigned first but its transaction committed after 11.
+    earlier = rows.add(seq=10)
+    change_bus.dispatch([ChangeNotification(board_id, ENTITY_BOARD_MEMORY)])
+    assert (await _next(stream))["data"] == earlier.data
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_feed_without_sequence_numbers_rereads_only_the_settle_window() -> None:
+    hub = StreamHub(queue_size=10)
+    board_id = uuid4()
+    events: list[StreamEvent] = []
+    cursors: list[StreamCursor] = []
+
+    async def fetch(cursor: StreamCursor) -> list[StreamEvent]:
+        assert cursor.after_seq is None and cursor.since is not None
+        cursors.append(cursor)
+        since = cursor.since
+        return [event for event in events if event.created_at >= since]
+
+    def _version(data: str, created_at: datetime) -> StreamEvent:
+        event = StreamEvent(
+            id=uuid4(),
+            seq=None,
+            created_at=created_at,
+            event="agent",
+            data=data,
+            coalesce_key="agent-a",
+        )
+        events.append(event)
+        return event
+
+    stream = hub.stream(
+        cast(Request, _FakeRequest()),
+        ("agents", board_id),
+        fetch=fetch,
+        since=utcnow(),
+        resume_after=None,
+        board_ids={board_id},
+        entities={ENTITY_BOARD_MEMORY},
+        poll_seconds=0.05,
+    )
+    pending = asyncio.ensure_future(_next(stream))
+    await asyncio.sleep(0.01)
+
+    _version("v1", utcnow() + timedelta(seconds=10))
+    change_bus.dispatch([ChangeNotification(board_id, ENTITY_BOARD_MEMORY)])
+    assert await pending == {"event": "agent", "data": "v1"}
+    latest = _version("v2", utcnow() + timedelta(seconds=20))
+    change_bus.dispatch([ChangeNotification(board_id, ENTITY_BOARD_MEMORY)])
+
+    # Earlier versions are re-read within the window but never sent twice.
+    assert (await _next(stream))["data"] == "v2"
+    await asyncio.sleep(0.1)
+    assert cursors[-1].since == latest.created_at - timedelta(seconds=SETTLE_SECONDS)
+    await stream.aclose()
+
+
+async def _messages(*items: dict[str, str]) -> AsyncGenerator[dict[str, str], None]:
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+@pytest.mark.asyncio
+async def test_multiplex_tags_messages_and_stops_with_the_first_stream() -> None:
+    endless_closed = asyncio.Event()
+
+    async def _endless() -> AsyncGenerator[dict[str, str], None]:
+        try:
+            yield {"data": "a"}
+            await asyncio.sleep(60)
+        finally:
+            endless_closed.set()
+
+    received = [
+        item
+        async for item in multiplex(
+            {
+                "tasks": _endless(),
+                "memory": _messages({"data": "1"}, {"data": "2"}),
+            },
+        )
+    ]
+
+    assert sorted(received, key=lambda item: item[0]) == [
+        ("memory", {"data": "1"}),
+        ("memory", {"data": "2"}),
+        ("tasks", {"data": "a"}),
+    ]
+    assert endless_closed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_pending_updates_to_one_entity_are_coalesced() -> None:
+    rows = _FakeRows()
+    subscription = HubSubscription(max_items=2)
+    first = rows.add(coalesce_key="task-a")
+    other = rows.add(coalesce_key="task-b")
+    latest = rows.add(coalesce_key="task-a")
+
+    for event in (first, other, latest):
+        subscription.offer(event)
+
+    # The newer update replaces the pending one instead of overflowing the buffer.
+    assert not subscription.overflowed
+    assert subscription.coalesced == 1
+    assert await subscription.next(0.01) == other
+    assert await subscription.next(0.01) == latest
+    assert await subscription.next(0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_backfill_sends_only_the_latest_update_per_entity() -> None:
+    hub = StreamHub(queue_size=10)
+    rows = _FakeRows()
+    board_id = uuid4()
+    since = utcnow()
+    rows.add(since, coalesce_key="task-a")
+    comment = rows.add(since)
+    latest = rows.add(since, coalesce_key="task-a")
+    stream = _stream(hub, rows, board_id, since=since)
+
+    assert [(await _next(stream))["data"], (await _next(stream))["data"]] == [
+        comment.data,
+        latest.data,
+    ]
+    await stream.aclose()
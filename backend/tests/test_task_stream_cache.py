@@ -0,0 +1,213 @@
+# ruff: noqa: INP001
+"""Task stream hydration cache tests."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api import tasks as tasks_api
+from app.core.time import utcnow
+from app.models.activity_events import ActivityEvent
+from app.models.boards import Board
+from app.models.organizations import Organization
+from app.models.tag_assignments import TagAssignment
+from app.models.tags import Tag
+from app.models.task_dependencies import TaskDependency
+from app.models.tasks import Task
+from app.services.change_bus import ENTITY_TASK_STATE, ChangeNotification, change_bus
+from app.services.stream_hub import StreamCursor
+from app.services.task_stream_cache import TaskStreamCache, task_stream_cache
+
+
+async def _make_engine() -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+def test_entries_are_keyed_by_task_and_updated_at() -> None:
+    cache = TaskStreamCache(max_entries=10)
+    board_id, task_id = uuid4(), uuid4()
+    updated_at = utcnow()
+    cache.put(
+        cache.snapshot(board_id),
+        board_id=board_id,
+        task_id=task_id,
+        updated_at=updated_at,
+        payload={"title": "cached"},
+    )
+
+    assert cache.get(task_id, updated_at) == {"title": "cached"}
+    assert cache.get(task_id, updated_at + timedelta(seconds=1)) is None
+
+
+def test_task_state_notifications_invalidate_entries() -> None:
+    cache = TaskStreamCache(max_entries=10)
+    board_id, other_board_id = uuid4(), uuid4()
+    updated_at = utcnow()
+    task_ids = [uuid4(), uuid4()]
+    for task_id, board in zip(task_ids, (board_id, other_board_id), strict=True):
+        cache.put(
+            cache.snapshot(board),
+            board_id=board,
+            task_id=task_id,
+            updated_at=updated_at,
+            payload={},
+        )
+
+    cache.changes_received([ChangeNotification(board_id, ENTITY_TASK_STATE)])
+
+    assert cache.get(task_ids[0], updated_at) is None
+    assert cache.get(task_ids[1], updated_at) == {}
+
+
+def test_put_after_concurrent_invalidation_is_dropped() -> None:
+    cache = TaskStreamCache(max_entries=10)
+    board_id, task_id = uuid4(), uuid4()
+    updated_at = utcnow()
+    snapshot = cache.snapshot(board_id)
+
+    # A tag rename commits while the fetch is still reading the old tag.
+    cache.changes_received([ChangeNotification(board_id, ENTITY_TASK_STATE, task_id)])
+    cache.put(snapshot, board_id=board_id, task_id=task_id, updated_at=updated_at, payload={})
+
+    assert cache.get(task_id, updated_at) is None
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = TaskStreamCache(max_entries=2)
+    board_id = uuid4()
+    updated_at = utcnow()
+    task_ids = [uuid4(), uuid4(), uuid4()]
+    for task_id in task_ids:
+        cache.put(
+            cache.snapshot(board_id),
+            board_id=board_id,
+            task_id=task_id,
+            updated_at=updated_at,
+            payload={},
+        )
+
+    assert len(cache) == 2
+    assert cache.get(task_ids[0], updated_at) is None
+
+
+@pytest.mark.asyncio
+async def test_stream_fetch_reuses_hydrated_task_until_tag_renamed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(tasks_api, "async_session_maker", session_maker)
+    hydrated: list[UUID] = []
+    stream_task_state = tasks_api._stream_task_state
+
+    async def _counting_stream_task_state(*args: Any, **kwargs: Any) -> Any:
+        hydrated.extend({task.id for _event, task in kwargs["rows"] if task is not None})
+        return await stream_task_state(*args, **kwargs)
+
+    monkeypatch.setattr(tasks_api, "_stream_task_state", _counting_stream_task_state)
+    task_stream_cache.clear()
+    organization = Organization(name="org")
+    board = Board(organization_id=organization.id, name="board", slug="board")
+    tag = Tag(organization_id=organization.id, name="old", slug="old")
+    task = Task(board_id=board.id, title="cached task")
+    since = utcnow() - timedelta(seconds=1)
+    try:
+        async with session_maker() as session:
+            session.add_all([organization, board, tag, task])
+            await session.flush()
+            session.add(TagAssignment(task_id=task.id, tag_id=tag.id))
+            session.add(ActivityEvent(event_type="task.created", task_id=task.id))
+            await session.commit()
+
+        fetch = tasks_api._task_stream_fetch(board.id)
+        first = await fetch(StreamCursor(since=since))
+        assert hydrated == [task.id]
+
+        async with session_maker() as session:
+            session.add(ActivityEvent(event_type="task.updated", task_id=task.id))
+            await session.commit()
+        second = await fetch(StreamCursor(since=since))
+        assert len(second) == 2
+        assert second[0].data == first[0].data
+        assert hydrated == [task.id]
+
+        with change_bus.subscribe(board_ids={board.id}, entities={ENTITY_TASK_STATE}) as changes:
+            async with session_maker() as session:
+                renamed = await session.get(Tag, tag.id)
+                assert renamed is not None
+                renamed.name = "new"
+                session.add(renamed)
+                await session.commit()
+            assert await changes.wait(0.01) is True
+
+        third = await fetch(StreamCursor(since=since))
+        assert '"name": "new"' in third[-1].data
+        assert hydrated == [task.id, task.id]
+    finally:
+        task_stream_cache.clear()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_completing_a_dependency_streams_dependent_unblocked(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = await _make_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(tasks_api, "async_session_maker", session_maker)
+    task_stream_cache.clear()
+    organization = Organization(name="org")
+    board = Board(organization_id=organization.id, name="board", slug="board")
+    dependency = Task(board_id=board.id, title="dependency")
+    dependent = Task(board_id=board.id, title="dependent")
+    since = utcnow() - timedelta(seconds=1)
+    try:
+        async with session_maker() as session:
+            session.add_all([organization, board, dependency, dependent])
+            await session.flush()
+            session.add(
+                TaskDependency(
+                    board_id=board.id,
+                    task_id=dependent.id,
+                    depends_on_task_id=dependency.id,
+                ),
+            )
+            session.add(ActivityEvent(event_type="task.created", task_id=dependent.id))
+            await session.commit()
+
+        fetch = tasks_api._task_stream_fetch(board.id)
+        first = await fetch(StreamCursor(since=since))
+        assert first[-1].payload["task"]["is_blocked"] is True
+
+        async with session_maker() as session:
+            done = await session.get(Task, dependency.id)
+            assert done is not None
+            done.status = "done"
+            session.add(done)
+            await tasks_api._reconcile_dependents_for_dependency_toggle(
+                session,
+                board_id=board.id,
+                dependency_task=done,
+                previous_status="inbox",
+                actor_agent_id=None,
+            )
+            await session.commit()
+
+        second = await fetch(StreamCursor(since=since))
+        unblocked = second[-1].payload["task"]
+        assert unblocked["id"] == str(dependent.id)
+        assert unblocked["is_blocked"] is False
+        assert unblocked["blocked_by_task_ids"] == []
+    finally:
+        task_stream_cache.clear()
+        await engine.dispose()
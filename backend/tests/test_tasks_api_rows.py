@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
 from uuid import uuid4
 
 import pytest
 
-from app.api.tasks import _coerce_task_event_rows, _task_event_payload
+from app.api.tasks import TaskDeltaEncoder, _coerce_task_event_rows, _task_event_payload
+from app.core.time import utcnow
 from app.models.activity_events import ActivityEvent
 from app.models.tasks import Task
+from app.services.stream_hub import StreamEvent
 
 
 @dataclass
@@ -115,3 +118,44 @@ def test_task_event_payload_includes_activity_for_non_comment_event() -> None:
     assert isinstance(task_payload, dict)
     assert task_payload["id"] == str(task.id)
     assert task_payload["is_blocked"] is False
+
+
+def _task_stream_event(task: dict[str, object]) -> StreamEvent:
+    payload: dict[str, object] = {"type": "task.updated", "activity": {}, "task": task}
+    return StreamEvent(
+        id=uuid4(),
+        seq=None,
+        created_at=utcnow(),
+        event="task",
+        data=json.dumps(payload),
+        payload=payload,
+    )
+
+
+def test_task_delta_encoder_sends_full_task_then_changed_fields() -> None:
+    encoder = TaskDeltaEncoder()
+    first = {"id": "t1", "status": "inbox", "description": "long", "updated_at": "v1"}
+    second = {**first, "status": "in_progress", "updated_at": "v2"}
+
+    full = json.loads(encoder(_task_stream_event(first))["data"])
+    delta = json.loads(encoder(_task_stream_event(second))["data"])
+
+    assert full["task"] == first
+    assert "task" not in delta
+    assert delta["task_delta"] == {
+        "id": "t1",
+        "version": "v2",
+        "base_version": "v1",
+        "fields": {"status": "in_progress", "updated_at": "v2"},
+    }
+
+
+def test_task_delta_encoder_resends_forgotten_tasks_in_full() -> None:
+    encoder = TaskDeltaEncoder(max_tasks=1)
+    first = {"id": "t1", "updated_at": "v1"}
+    encoder(_task_stream_event(first))
+    encoder(_task_stream_event({"id": "t2", "updated_at": "v1"}))
+
+    message = json.loads(encoder(_task_stream_event({**first, "updated_at": "v2"}))["data"])
+
+    assert message["task"]["updated_at"] == "v2"
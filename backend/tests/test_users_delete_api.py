@@ -3,7 +3,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 from uuid import uuid4
 
@@ -18,6 +18,7 @@ from app.models.users import User
 @dataclass
 class _FakeSession:
     committed: int = 0
+    info: dict[str, Any] = field(default_factory=dict)
 
     async def commit(self) -> None:
         self.committed += 1
@@ -9,10 +9,20 @@ from types import SimpleNamespace
 from uuid import UUID, uuid4
 
 import pytest
-
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.agents import Agent
+from app.models.board_webhook_payloads import BoardWebhookPayload
+from app.models.board_webhooks import BoardWebhook
+from app.models.boards import Board
+from app.models.gateways import Gateway
+from app.models.organizations import Organization
 from app.services.webhooks import dispatch
 from app.services.webhooks.queue import (
     QueuedInboundDelivery,
+    _task_from_payload,
     dequeue_webhook_delivery,
     enqueue_webhook_delivery,
     requeue_if_failed,
@@ -22,6 +32,7 @@ from app.services.webhooks.queue import (
 class _FakeRedis:
     def __init__(self) -> None:
         self.values: list[str] = []
+        self.dead_letters: list[str] = []
 
     def lpush(self, key: str, value: str) -> None:
         self.values.insert(0, value)
@@ -31,6 +42,29 @@ class _FakeRedis:
             return None
         return self.values.pop()
 
+    def pipeline(self, *, transaction: bool = True) -> _FakePipeline:
+        del transaction
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    """Collects the dead-letter push; the fake keeps dead letters apart from the queue."""
+
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._pushed: list[str] = []
+
+    def lpush(self, key: str, value: str) -> None:
+        del key
+        self._pushed.insert(0, value)
+
+    def ltrim(self, key: str, start: int, end: int) -> None:
+        del key, start, end
+
+    def execute(self) -> list[object]:
+        self._redis.dead_letters[:0] = self._pushed
+        return []
+
 
 @pytest.mark.parametrize("attempts", [0, 1, 2])
 def test_webhook_queue_roundtrip(monkeypatch: pytest.MonkeyPatch, attempts: int) -> None:
@@ -113,6 +147,7 @@ def test_requeue_respects_retry_cap(monkeypatch: pytest.MonkeyPatch, attempts: i
     if attempts >= 3:
         assert requeue_if_failed(payload) is False
         assert fake.values == []
+        assert len(fake.dead_letters) == 1
     else:
         assert requeue_if_failed(payload) is True
         requeued = dequeue_webhook_delivery()
@@ -356,3 +391,132 @@ def test_dispatch_run_entrypoint_calls_async_flush(monkeypatch: pytest.MonkeyPat
     dispatch.run_flush_webhook_delivery_queue()
 
     assert called == [True]
+
+
+@pytest.mark.asyncio
+async def test_batch_delivery_sends_one_digest_per_board_and_agent(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.connect() as conn, conn.begin():
+        await conn.run_sync(SQLModel.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    organization_id = uuid4()
+    gateway_id = uuid4()
+    board = Board(
+        id=uuid4(),
+        organization_id=organization_id,
+        gateway_id=gateway_id,
+        name="CI board",
+        slug="ci-board",
+    )
+    lead = Agent(
+        id=uuid4(),
+        board_id=board.id,
+        gateway_id=gateway_id,
+        name="Lead Agent",
+        openclaw_session_id="lead:session",
+        is_board_lead=True,
+    )
+    mapped = Agent(
+        id=uuid4(),
+        board_id=board.id,
+        gateway_id=gateway_id,
+        name="Mapped Agent",
+        openclaw_session_id="mapped:session",
+    )
+    ci_webhook = BoardWebhook(id=uuid4(), board_id=board.id, description="CI results")
+    mapped_webhook = BoardWebhook(
+        id=uuid4(),
+        board_id=board.id,
+        agent_id=mapped.id,
+        description="Alerts",
+    )
+    ci_payloads = [
+        BoardWebhookPayload(
+            id=uuid4(),
+            board_id=board.id,
+            webhook_id=ci_webhook.id,
+            payload={"build": index},
+        )
+        for index in range(3)
+    ]
+    alert_payload = BoardWebhookPayload(
+        id=uuid4(),
+        board_id=board.id,
+        webhook_id=mapped_webhook.id,
+        payload={"alert": "cpu"},
+    )
+    async with session_maker() as session:
+        session.add(Organization(id=organization_id, name="org"))
+        session.add(
+            Gateway(
+                id=gateway_id,
+                organization_id=organization_id,
+                name="gateway",
+                url="https://gateway.example.local",
+                workspace_root="/tmp/workspace",
+            ),
+        )
+        session.add_all([board, lead, mapped, ci_webhook, mapped_webhook, alert_payload])
+        session.add_all(ci_payloads)
+        await session.commit()
+
+    sent: list[dict[str, str]] = []
+
+    class _FakeDispatchService:
+        def __init__(self, session: object) -> None:
+            del session
+
+        async def optional_gateway_config_for_board(self, board: object) -> object:
+            del board
+            return object()
+
+        async def try_send_agent_message(
+            self,
+            *,
+            session_key: str,
+            config: object,
+            agent_name: str,
+            message: str,
+            deliver: bool = False,
+        ) -> None:
+            del config, agent_name, deliver
+            sent.append({"session_key": session_key, "message": message})
+
+    monkeypatch.setattr(dispatch, "async_session_maker", session_maker)
+    monkeypatch.setattr(dispatch, "GatewayDispatchService", _FakeDispatchService)
+
+    items = [
+        QueuedInboundDelivery(
+            board_id=board.id,
+            webhook_id=payload.webhook_id,
+            payload_id=payload.id,
+            received_at=datetime.now(UTC),
+        )
+        for payload in [*ci_payloads, alert_payload]
+    ]
+    items.append(
+        QueuedInboundDelivery(
+            board_id=board.id,
+            webhook_id=ci_webhook.id,
+            payload_id=uuid4(),
+            received_at=datetime.now(UTC),
+        ),
+    )
+    try:
+        await dispatch.process_webhook_queue_batch(
+            [_task_from_payload(item) for item in items],
+        )
+    finally:
+        await engine.dispose()
+
+    by_session = {entry["session_key"]: entry["message"] for entry in sent}
+    assert len(sent) == 2
+    digest = by_session["lead:session"]
+    assert digest.startswith("WEBHOOK EVENTS RECEIVED (3)")
+    for payload in ci_payloads:
+        assert f"Payload ID: {payload.id}" in digest
+    assert by_session["mapped:session"].startswith("WEBHOOK EVENT RECEIVED\n")
+    assert f"Payload ID: {alert_payload.id}" in by_session["mapped:session"]
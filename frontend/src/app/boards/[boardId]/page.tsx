@@ -1351,6 +1351,8 @@ export default function BoardDetailPage() {
     const abortController = new AbortController();
     const backoff = createExponentialBackoff(SSE_RECONNECT_BACKOFF);
     let reconnectTimeout: number | undefined;
+    // Sequence id of the last event received; the server resumes right after it.
+    let lastEventId: string | null = null;
 
     const connect = async () => {
       try {
@@ -1361,7 +1363,10 @@ export default function BoardDetailPage() {
             boardId,
             params,
             {
-              headers: { Accept: "text/event-stream" },
+              headers: {
+                Accept: "text/event-stream",
+                ...(lastEventId ? { "Last-Event-ID": lastEventId } : {}),
+              },
               signal: abortController.signal,
             },
           );
@@ -1398,6 +1403,8 @@ export default function BoardDetailPage() {
                 eventType = line.slice(6).trim();
               } else if (line.startsWith("data:")) {
                 data += line.slice(5).trim();
+              } else if (line.startsWith("id:")) {
+                lastEventId = line.slice(3).trim() || lastEventId;
               }
             }
             if (eventType === "memory" && data) {
@@ -1655,6 +1662,8 @@ export default function BoardDetailPage() {
     const abortController = new AbortController();
     const backoff = createExponentialBackoff(SSE_RECONNECT_BACKOFF);
     let reconnectTimeout: number | undefined;
+    // Sequence id of the last event received; the server resumes right after it.
+    let lastEventId: string | null = null;
 
     const connect = async () => {
       try {
@@ -1663,7 +1672,10 @@ export default function BoardDetailPage() {
           boardId,
           since ? { since } : undefined,
           {
-            headers: { Accept: "text/event-stream" },
+            headers: {
+              Accept: "text/event-stream",
+              ...(lastEventId ? { "Last-Event-ID": lastEventId } : {}),
+            },
             signal: abortController.signal,
           },
         );
@@ -1698,6 +1710,8 @@ export default function BoardDetailPage() {
                 eventType = line.slice(6).trim();
               } else if (line.startsWith("data:")) {
                 data += line.slice(5).trim();
+              } else if (line.startsWith("id:")) {
+                lastEventId = line.slice(3).trim() || lastEventId;
               }
             }
             if (eventType === "task" && data) {